@@ -4,6 +4,7 @@ from rest_framework import mixins
 
 from nodeconductor.core.models import SynchronizableMixin, SynchronizationStates
 from nodeconductor.core.exceptions import IncorrectStateException
+from nodeconductor.core.serializers import get_requested_fields
 
 
 class ListModelMixin(mixins.ListModelMixin):
@@ -33,3 +34,42 @@ class UpdateOnlyStableMixin(object):
                         'Modification allowed in stable states only.')
 
         return super(UpdateOnlyStableMixin, self).initial(request, *args, **kwargs)
+
+
+class EagerLoadingMixin(object):
+    """
+    Fetch related objects rendered by serializer along with the queryset.
+
+    `select_related_fields` and `prefetch_related_fields` are sequences of pairs
+    of a lookup and names of serializer fields which render it. Lookups are applied
+    in declared order. If sparse fieldset is requested with `field` query parameters,
+    lookups of omitted fields are skipped.
+
+    Example:
+        select_related_fields = (
+            ('customer', ('customer', 'customer_name')),
+        )
+        prefetch_related_fields = (
+            ('project_groups', ('project_groups',)),
+        )
+    """
+    select_related_fields = ()
+    prefetch_related_fields = ()
+
+    def get_queryset(self):
+        queryset = super(EagerLoadingMixin, self).get_queryset()
+        requested_fields = get_requested_fields(self.request)
+
+        def get_lookups(related_fields):
+            return [lookup for lookup, field_names in related_fields
+                    if requested_fields is None or requested_fields.intersection(field_names)]
+
+        select_related = get_lookups(self.select_related_fields)
+        if select_related:
+            queryset = queryset.select_related(*select_related)
+
+        prefetch_related = get_lookups(self.prefetch_related_fields)
+        if prefetch_related:
+            queryset = queryset.prefetch_related(*prefetch_related)
+
+        return queryset
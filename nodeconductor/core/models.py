@@ -220,6 +220,10 @@ class SynchronizableMixin(models.Model):
     def schedule_syncing(self):
         pass
 
+    @transition(field=state, source=SynchronizationStates.ERRED, target=SynchronizationStates.SYNCING_SCHEDULED)
+    def schedule_recovery(self):
+        pass
+
     @transition(field=state, source=SynchronizationStates.SYNCING, target=SynchronizationStates.IN_SYNC)
     def set_in_sync(self):
         pass
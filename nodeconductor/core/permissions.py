@@ -153,18 +153,73 @@ class FilteredCollaboratorsPermissionLogic(PermissionLogic):
             # object permission without obj should return True
             # Ref: https://code.djangoproject.com/wiki/RowLevelPermissions
             return self.is_permission_allowed(perm)
-        elif user_obj.is_active:
-            # if the user is staff, allow everything
-            if user_obj.is_staff:
-                return True
 
+        return self.has_perm_bulk(user_obj, perm, [obj])[obj.pk]
+
+    def has_perm_bulk(self, user_obj, perm, objs):
+        """
+        Check if user has permission for each of the objects
+
+        Objects are resolved with a single query per collaborators query
+        regardless of their number. Within a request results are memoized
+        in the permission context shared with queryset filtering, so that
+        repeated checks of the same object do not hit the database.
+
+        Parameters
+        ----------
+        user_obj : django user model instance
+            A django user model instance which be checked
+        perm : string
+            `app_label.codename` formatted permission string
+        objs : iterable of django model instances
+            Objects of the model this logic is assigned to
+
+        Returns
+        -------
+        dict
+            Mapping of object primary keys to whether the user has specified
+            permission of the object.
+        """
+        objs = list(objs)
+        if not objs:
+            return {}
+
+        pks = set(obj.pk for obj in objs)
+        if not user_obj.is_authenticated():
+            return dict.fromkeys(pks, False)
+        # if the user is staff, allow everything
+        if user_obj.is_active and user_obj.is_staff:
+            return dict.fromkeys(pks, True)
+        if not self.is_permission_allowed(perm):
+            return dict.fromkeys(pks, False)
+
+        model = objs[0]._meta.model
+        collaborated_pks = self._get_collaborated_pks(user_obj, model, pks)
+        return dict((pk, pk in collaborated_pks) for pk in pks)
+
+    def _get_collaborated_pks(self, user_obj, model, pks):
+        from nodeconductor.structure.middleware import get_permission_context
+
+        permission_context = get_permission_context()
+        if permission_context is not None:
+            collaborated, unknown = permission_context.get_collaborated_pks(user_obj, model, self, pks)
+        else:
+            collaborated, unknown = set(), set(pks)
+
+        resolved = set()
         for query, filt in zip(self.collaborators_queries, self.collaborators_filters):
-            kwargs = {query: user_obj, 'pk': obj.pk}
+            if not unknown - resolved:
+                break
+
+            kwargs = {query: user_obj, 'pk__in': unknown - resolved}
             kwargs.update(filt)
 
-            if obj._meta.model._default_manager.filter(**kwargs).exists():
-                return self.is_permission_allowed(perm)
-        return False
+            resolved.update(model._default_manager.filter(**kwargs).values_list('pk', flat=True))
+
+        if permission_context is not None:
+            permission_context.set_collaborated_pks(user_obj, model, self, unknown, resolved)
+
+        return collaborated | resolved
 
 
 class StaffPermissionLogic(PermissionLogic):
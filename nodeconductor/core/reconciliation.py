@@ -0,0 +1,104 @@
+from __future__ import unicode_literals
+
+import collections
+import logging
+
+from django.db import transaction
+from django.db.models import ProtectedError
+
+
+logger = logging.getLogger(__name__)
+
+# Keep IN lists and bulk inserts below backend specific parameter limits, e.g. 999 for SQLite
+BATCH_SIZE = 500
+
+ReconciliationResult = collections.namedtuple('ReconciliationResult', ('created', 'updated', 'deleted', 'stale'))
+
+
+def _chunks(items, size=BATCH_SIZE):
+    for index in range(0, len(items), size):
+        yield items[index:index + size]
+
+
+def reconcile(model, backend_values, db_objects, key_field='backend_id', defaults=None, delete_stale=True):
+    """
+    Make database rows of a model match the backend with as few queries as possible.
+
+    :param backend_values: {key: {field: value}} desired field values of every backend object
+    :param db_objects: {key: model instance} rows currently stored in the database
+    :param key_field: model field holding the key, it is set on created rows
+    :param defaults: field values common for all created rows, e.g. a foreign key to the parent
+    :param delete_stale: delete rows missing on backend, otherwise just report them
+
+    New rows are inserted with a single bulk_create. Only changed fields of existing rows are
+    written, rows that need the same change are updated with one query. Stale rows that cannot
+    be deleted due to protected relations are kept and reported.
+
+    Note that bulk writes bypass model save() and pre/post save signals.
+
+    Returns ReconciliationResult with numbers of created, updated and deleted rows
+    and a list of stale instances left in the database.
+    """
+    backend_keys = set(backend_values.keys())
+    db_keys = set(db_objects.keys())
+
+    # Create new rows, the ones that are not yet in the database
+    new_objects = []
+    for key in backend_keys - db_keys:
+        values = dict(defaults or {}, **backend_values[key])
+        values[key_field] = key
+        new_objects.append(model(**values))
+
+    # Group matching rows by the set of changes required to bring them in sync
+    changes = collections.defaultdict(list)
+    for key in backend_keys & db_keys:
+        obj = db_objects[key]
+        diff = tuple(sorted(
+            (field, value) for field, value in backend_values[key].items()
+            if getattr(obj, field) != value
+        ))
+        if diff:
+            changes[diff].append(obj.pk)
+
+    stale_objects = [db_objects[key] for key in db_keys - backend_keys]
+
+    deleted = 0
+    with transaction.atomic():
+        if new_objects:
+            model.objects.bulk_create(new_objects, batch_size=BATCH_SIZE)
+
+        for diff, pks in changes.items():
+            for pks_chunk in _chunks(pks):
+                model.objects.filter(pk__in=pks_chunk).update(**dict(diff))
+
+        if delete_stale and stale_objects:
+            stale_objects, deleted = _delete(model, stale_objects)
+
+    updated = sum(len(pks) for pks in changes.values())
+    logger.debug('Reconciled %s: %d created, %d updated, %d deleted, %d stale',
+                 model._meta.model_name, len(new_objects), updated, deleted, len(stale_objects))
+
+    return ReconciliationResult(len(new_objects), updated, deleted, stale_objects)
+
+
+def _delete(model, objects):
+    """ Delete objects in bulk, falling back to one by one deletion if some of them are protected """
+    try:
+        with transaction.atomic():
+            for objects_chunk in _chunks(objects):
+                model.objects.filter(pk__in=[obj.pk for obj in objects_chunk]).delete()
+        return [], len(objects)
+    except ProtectedError:
+        pass
+
+    protected = []
+    for obj in objects:
+        try:
+            with transaction.atomic():
+                obj.delete()
+        except ProtectedError:
+            logger.info('Skipped deletion of stale %s %s due to protected relations',
+                        model._meta.model_name, obj.pk)
+            protected.append(obj)
+
+    return protected, len(objects) - len(protected)
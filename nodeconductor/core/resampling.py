@@ -0,0 +1,82 @@
+from __future__ import unicode_literals
+
+
+class Aggregations(object):
+    SUM = 'sum'
+    AVG = 'avg'
+    MAX = 'max'
+    # Latest known value, carried forward over segments without values
+    LAST = 'last'
+
+    CHOICES = (SUM, AVG, MAX, LAST)
+
+
+def resample(time_and_value_list, segments_count, start_timestamp, end_timestamp,
+             aggregation=Aggregations.SUM, default=0):
+    """
+    Aggregate values into equal time segments in a single pass over the values.
+
+    :param time_and_value_list: iterable of (timestamp, value) pairs, not necessarily sorted
+    :param segments_count: number of segments the range is split to
+    :param aggregation: one of Aggregations.CHOICES
+    :param default: value of segments without values,
+                    for LAST aggregation it is used only until the first known value
+    :return: [{'from': timestamp, 'to': timestamp, 'value': value}, ...]
+
+    Values before start_timestamp are taken into account by LAST aggregation only,
+    values at or after the end of the last segment are ignored.
+    """
+    if aggregation not in Aggregations.CHOICES:
+        raise ValueError('Unknown aggregation %s, it has to be one of %s' % (aggregation, Aggregations.CHOICES))
+
+    time_step = (end_timestamp - start_timestamp) / segments_count
+    sums = [0] * segments_count
+    counts = [0] * segments_count
+    maximums = [None] * segments_count
+    lasts = [(None, None)] * segments_count
+    preceding = (None, None)
+
+    for time, value in time_and_value_list:
+        if time < start_timestamp:
+            if preceding[0] is None or time >= preceding[0]:
+                preceding = (time, value)
+            continue
+        if time_step <= 0:
+            continue
+
+        index = int((time - start_timestamp) // time_step)
+        if index >= segments_count:
+            continue
+
+        sums[index] += value
+        counts[index] += 1
+        if maximums[index] is None or value > maximums[index]:
+            maximums[index] = value
+        if lasts[index][0] is None or time >= lasts[index][0]:
+            lasts[index] = (time, value)
+
+    segment_list = []
+    carried_value = preceding[1] if preceding[0] is not None else default
+    for index in range(segments_count):
+        segment_start_timestamp = start_timestamp + time_step * index
+
+        if aggregation == Aggregations.LAST:
+            if counts[index]:
+                carried_value = lasts[index][1]
+            value = carried_value
+        elif not counts[index]:
+            value = default
+        elif aggregation == Aggregations.SUM:
+            value = sums[index]
+        elif aggregation == Aggregations.AVG:
+            value = sums[index] / counts[index]
+        else:
+            value = maximums[index]
+
+        segment_list.append({
+            'from': segment_start_timestamp,
+            'to': segment_start_timestamp + time_step,
+            'value': value,
+        })
+
+    return segment_list
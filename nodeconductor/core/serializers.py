@@ -1,4 +1,5 @@
 import base64
+from collections import OrderedDict
 
 from django.core import validators
 from django.core.exceptions import ImproperlyConfigured, ValidationError
@@ -141,6 +142,16 @@ class GenericRelatedField(Field):
         return obj
 
 
+def get_requested_fields(request):
+    """
+    Return names of fields requested with `field` query parameters
+    or None if all fields have to be rendered.
+    """
+    if request.method not in ('GET', 'HEAD'):
+        return None
+    return set(request.query_params.getlist('field')) or None
+
+
 class AugmentedSerializerMixin(object):
     """
     This mixing provides several extensions to stock Serializer class:
@@ -224,12 +235,33 @@ class AugmentedSerializerMixin(object):
                     fields = ('url', 'uuid', 'name', 'customer')
                     protected_fields = ('customer',)
 
+    4.  Render only fields requested by client (sparse fieldset).
+
+        Example:
+            GET /api/projects/?field=uuid&field=name
+
+        Only "uuid" and "name" fields are built and rendered, other declared and
+        model fields are not even instantiated. Unknown field names
+        are ignored. Fieldset is applied to the serializer rendered by view only,
+        nested serializers render all their fields.
+
     """
 
     def get_fields(self):
+        requested_fields = self._get_requested_fields()
+        if requested_fields is not None:
+            # Declared fields are copied for every serializer instance, copy only requested ones
+            self._declared_fields = OrderedDict(
+                (name, field) for name, field in self._declared_fields.items() if name in requested_fields)
+
         fields = super(AugmentedSerializerMixin, self).get_fields()
         pre_serializer_fields.send(sender=self.__class__, fields=fields)
 
+        if requested_fields is not None:
+            # Drop fields added by signal handlers
+            for field_name in set(fields) - requested_fields:
+                del fields[field_name]
+
         try:
             protected_fields = self.Meta.protected_fields
         except AttributeError:
@@ -246,6 +278,27 @@ class AugmentedSerializerMixin(object):
 
         return fields
 
+    def get_field_names(self, declared_fields, info):
+        field_names = super(AugmentedSerializerMixin, self).get_field_names(declared_fields, info)
+
+        requested_fields = self._get_requested_fields()
+        if requested_fields is not None:
+            field_names = [name for name in field_names if name in requested_fields]
+
+        return field_names
+
+    def _get_requested_fields(self):
+        try:
+            view = self.context['view']
+            serializer_class = view.get_serializer_class()
+        except (KeyError, AttributeError):
+            return None
+
+        if type(self) is not serializer_class:
+            return None
+
+        return get_requested_fields(view.request)
+
     def _get_related_paths(self):
         try:
             related_paths = self.Meta.related_paths
@@ -2,6 +2,8 @@ from __future__ import unicode_literals
 
 import functools
 import logging
+import time
+import uuid
 
 from django.db import transaction, IntegrityError, DatabaseError
 from django.conf import settings
@@ -180,8 +182,15 @@ class Throttle(object):
         :param key: an additional key to be used with task name
         :param concurrency: a number of tasks running at once
         :param retry_delay: a time in seconds before the next try
+        :param poll_delay: a time in seconds before the next try of a task which is next in the queue
         :param timeout: a time in seconds to keep a lock
 
+        Locks are kept in Redis as a semaphore: every holder owns a token with its
+        own expiration time, so a lock of a crashed worker is freed after the timeout
+        without affecting the others. Tasks waiting for a lock are queued and get it
+        in the order of their first attempt. Token of a task is its id, therefore
+        retried task keeps its place in the queue.
+
         Concurrency and other options can be set via django settings:
 
         .. code-block:: python
@@ -200,22 +209,77 @@ class Throttle(object):
     DEFAULT_OPTIONS = {
         'concurrency': 1,
         'retry_delay': 30,
+        'poll_delay': 5,
         'timeout': 3600,
     }
 
+    # KEYS: holders, queue, waiters last attempt time
+    # ARGV: token, now, timeout, concurrency, time after which silent waiter is dropped
+    # Returns {1, 0} if lock is acquired, {0, position in the queue} otherwise
+    ACQUIRE_SCRIPT = """
+        local holders, queue, seen = KEYS[1], KEYS[2], KEYS[3]
+        local token = ARGV[1]
+        local now = tonumber(ARGV[2])
+        local timeout = tonumber(ARGV[3])
+        local concurrency = tonumber(ARGV[4])
+        local stale_after = tonumber(ARGV[5])
+
+        redis.call('ZREMRANGEBYSCORE', holders, '-inf', now)
+        for _, waiter in ipairs(redis.call('ZRANGEBYSCORE', seen, '-inf', now - stale_after)) do
+            redis.call('ZREM', queue, waiter)
+            redis.call('ZREM', seen, waiter)
+        end
+
+        local result
+        if redis.call('ZSCORE', holders, token) then
+            redis.call('ZADD', holders, now + timeout, token)
+            result = {1, 0}
+        else
+            if not redis.call('ZSCORE', queue, token) then
+                redis.call('ZADD', queue, now, token)
+            end
+            redis.call('ZADD', seen, now, token)
+
+            local position = redis.call('ZRANK', queue, token)
+            local free = concurrency - redis.call('ZCARD', holders)
+            if position < free then
+                redis.call('ZREM', queue, token)
+                redis.call('ZREM', seen, token)
+                redis.call('ZADD', holders, now + timeout, token)
+                result = {1, 0}
+            else
+                result = {0, position}
+            end
+        end
+
+        for _, key in ipairs(KEYS) do
+            redis.call('EXPIRE', key, math.ceil(timeout))
+        end
+        return result
+    """
+
     def __init__(self, key='*', **kwargs):
         self.set_options(**kwargs)
         self.task_name = None
         self.task_key = key
+        self.token = None
 
     def __enter__(self):
-        if self.acquire_lock():
+        self.token = (current_task and current_task.request.id) or uuid.uuid4().hex
+        acquired, position = self.acquire_lock()
+        if acquired:
             return self
 
+        # Tasks next in the queue are waiting just for a holder to finish
+        if position < int(self.opt('concurrency')):
+            countdown = self.opt('poll_delay')
+        else:
+            countdown = self.opt('retry_delay')
+
         try:
             # max_retries should be big enough to retry until lock expired
             # this guaranties that task will be executed rather than failed
-            current_task.retry(countdown=self.opt('retry_delay'), max_retries=10000)
+            current_task.retry(countdown=countdown, max_retries=10000)
         except MaxRetriesExceededError as e:
             six.reraise(Throttled, e)
 
@@ -253,26 +317,34 @@ class Throttle(object):
     def redis(self):
         return current_app.backend.client
 
+    @property
+    def keys(self):
+        return [self.key + ':holders', self.key + ':queue', self.key + ':seen']
+
     def acquire_lock(self):
-        concurrency = self.opt('concurrency')
-        currently_running = self.redis.get(self.key) or 0
-        if int(currently_running) >= int(concurrency):
-            logger.debug('Tasks limit exceed for %s, limit: %s', self.key, concurrency)
-            return False
-
-        pipe = self.redis.pipeline()
-        pipe.incr(self.key)
-        pipe.expire(self.key, self.opt('timeout'))
-        pipe.execute()
-        logger.debug('Acquire lock for %s, total: %s', self.key, currently_running)
-        return True
+        """ Atomically take a free slot or join the queue of waiters.
+            Returns a pair of acquired flag and position in the queue.
+        """
+        concurrency = int(self.opt('concurrency'))
+        timeout = float(self.opt('timeout'))
+        # Waiters that have not retried for a few delays are considered gone
+        stale_after = 3 * float(self.opt('retry_delay'))
+
+        acquire = self.redis.register_script(self.ACQUIRE_SCRIPT)
+        acquired, position = acquire(
+            keys=self.keys, args=[self.token, time.time(), timeout, concurrency, stale_after])
+
+        if acquired:
+            logger.debug('Acquire lock for %s, token: %s', self.key, self.token)
+        else:
+            logger.debug('Tasks limit exceed for %s, limit: %s, position in queue: %s',
+                         self.key, concurrency, position)
+        return bool(acquired), int(position)
 
     def release_lock(self):
-        pipe = self.redis.pipeline()
-        pipe.decr(self.key)
-        pipe.expire(self.key, self.opt('timeout'))
-        pipe.execute()
-        logger.debug('Release lock for %s, remaining: %s', self.key, self.redis.get(self.key))
+        holders = self.keys[0]
+        self.redis.zrem(holders, self.token)
+        logger.debug('Release lock for %s, token: %s', self.key, self.token)
         return True
 
 
@@ -1,5 +1,7 @@
 from __future__ import unicode_literals
 
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 from rest_framework import test, status
 
 
@@ -119,3 +121,55 @@ class ListPermissionsTest(test.APITransactionTestCase):
             for actual, expected in zip(response.data, expected_results):
                 for key, value in expected.iteritems():
                     self.assertEqual(actual[key], value)
+
+
+class ListQueriesCountTest(test.APITransactionTestCase):
+    """
+    Abstract class that tests that number of queries issued by list endpoint
+    does not grow with number of objects on the page.
+
+    Methods `get_user` and `create_object` have to be overridden.
+    Field `url` have to be defined as class attribute or property.
+    """
+    url = None
+    query_params = {}
+    objects_count = 3
+
+    def get_user(self):
+        """
+        Return user which receives all created objects in list
+        """
+        raise NotImplementedError()
+
+    def create_object(self):
+        """
+        Create object which is listed by endpoint along with all related
+        objects that are rendered in its representation
+        """
+        raise NotImplementedError()
+
+    def get_queries_count(self):
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(self.url, data=self.query_params)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return len(context), len(response.data)
+
+    def test_list_queries_count_does_not_depend_on_number_of_objects(self):
+        self.client.force_authenticate(user=self.get_user())
+        self.create_object()
+        # warm up caches that are filled once per process, e.g. content types
+        self.get_queries_count()
+        queries_count, objects_count = self.get_queries_count()
+
+        for _ in range(self.objects_count):
+            self.create_object()
+
+        new_queries_count, new_objects_count = self.get_queries_count()
+        self.assertEqual(
+            new_objects_count, objects_count + self.objects_count,
+            'Url %s has to list all created objects. Expected: %s, received %s'
+            % (self.url, objects_count + self.objects_count, new_objects_count))
+        self.assertEqual(
+            new_queries_count, queries_count,
+            'Url %s issues %s queries for %s objects and %s queries for %s objects'
+            % (self.url, queries_count, objects_count, new_queries_count, new_objects_count))
@@ -3,8 +3,10 @@ from __future__ import unicode_literals
 import unittest
 
 from rest_framework import serializers
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
 
-from nodeconductor.core.serializers import Base64Field
+from nodeconductor.core.serializers import AugmentedSerializerMixin, Base64Field
 
 
 class Base64Serializer(serializers.Serializer):
@@ -35,3 +37,60 @@ class Base64FieldTest(unittest.TestCase):
                       'There should be errors for content field')
         self.assertIn('This field should a be valid Base64 encoded string.',
                       serializer.errors['content'])
+
+
+class CountingField(serializers.CharField):
+    instances_count = 0
+
+    def __init__(self, *args, **kwargs):
+        CountingField.instances_count += 1
+        super(CountingField, self).__init__(*args, **kwargs)
+
+
+class SparseSerializer(AugmentedSerializerMixin, serializers.Serializer):
+    uuid = serializers.CharField()
+    name = serializers.CharField()
+    description = CountingField()
+
+
+class SparseFieldsetTest(unittest.TestCase):
+    def setUp(self):
+        self.instance = {'uuid': '1', 'name': 'name', 'description': 'description'}
+
+    def get_serializer_data(self, method, url, serializer_class=SparseSerializer):
+        request = Request(getattr(APIRequestFactory(), method)(url))
+        view = type(str('View'), (object,), {
+            'request': request,
+            'get_serializer_class': lambda self: SparseSerializer,
+        })()
+        return serializer_class(instance=self.instance, context={'view': view, 'request': request}).data
+
+    def test_only_requested_fields_are_rendered(self):
+        data = self.get_serializer_data('get', '/?field=uuid&field=name&field=unknown')
+
+        self.assertEqual(set(data.keys()), {'uuid', 'name'})
+
+    def test_omitted_fields_are_not_built(self):
+        instances_count = CountingField.instances_count
+
+        self.get_serializer_data('get', '/?field=uuid')
+
+        self.assertEqual(CountingField.instances_count, instances_count)
+
+    def test_all_fields_are_rendered_if_fields_are_not_requested(self):
+        data = self.get_serializer_data('get', '/')
+
+        self.assertEqual(set(data.keys()), {'uuid', 'name', 'description'})
+
+    def test_requested_fields_are_ignored_for_modifying_requests(self):
+        data = self.get_serializer_data('post', '/?field=uuid')
+
+        self.assertEqual(set(data.keys()), {'uuid', 'name', 'description'})
+
+    def test_requested_fields_are_ignored_for_serializers_not_rendered_by_view(self):
+        class OtherSparseSerializer(SparseSerializer):
+            pass
+
+        data = self.get_serializer_data('get', '/?field=uuid', serializer_class=OtherSparseSerializer)
+
+        self.assertEqual(set(data.keys()), {'uuid', 'name', 'description'})
@@ -0,0 +1,96 @@
+from __future__ import unicode_literals
+
+from django.test import TestCase
+
+from nodeconductor.core.permissions import FilteredCollaboratorsPermissionLogic
+from nodeconductor.structure import models
+from nodeconductor.structure.middleware import PermissionContextMiddleware, reset_permission_context
+from nodeconductor.structure.tests import factories
+
+
+class FilteredCollaboratorsPermissionLogicTest(TestCase):
+
+    def setUp(self):
+        self.logic = FilteredCollaboratorsPermissionLogic(
+            collaborators_query=[
+                'customer__roles__permission_group__user',
+                'roles__permission_group__user',
+            ],
+            collaborators_filter=[
+                {'customer__roles__role_type': models.CustomerRole.OWNER},
+                {'roles__role_type': models.ProjectRole.ADMINISTRATOR},
+            ],
+            change_permission=True,
+        )
+        self.logic.model = models.Project
+        self.perm = 'structure.change_project'
+
+        self.user = factories.UserFactory()
+        self.customer = factories.CustomerFactory()
+        self.customer.add_user(self.user, models.CustomerRole.OWNER)
+        self.owned_projects = factories.ProjectFactory.create_batch(3, customer=self.customer)
+        self.administered_project = factories.ProjectFactory()
+        self.administered_project.add_user(self.user, models.ProjectRole.ADMINISTRATOR)
+        self.foreign_project = factories.ProjectFactory()
+
+        self.projects = self.owned_projects + [self.administered_project, self.foreign_project]
+
+    def start_request(self):
+        PermissionContextMiddleware().process_request(None)
+        self.addCleanup(reset_permission_context)
+
+    def test_objects_are_resolved_with_one_query_per_collaborators_query(self):
+        with self.assertNumQueries(2):
+            result = self.logic.has_perm_bulk(self.user, self.perm, self.projects)
+
+        expected = dict((project.pk, True) for project in self.projects)
+        expected[self.foreign_project.pk] = False
+        self.assertEqual(result, expected)
+
+    def test_object_check_agrees_with_bulk_check(self):
+        result = self.logic.has_perm_bulk(self.user, self.perm, self.projects)
+
+        for project in self.projects:
+            self.assertEqual(self.logic.has_perm(self.user, self.perm, project), result[project.pk])
+
+    def test_permission_not_given_to_collaborators_is_denied_without_queries(self):
+        with self.assertNumQueries(0):
+            result = self.logic.has_perm_bulk(self.user, 'structure.delete_project', self.projects)
+
+        self.assertFalse(any(result.values()))
+
+    def test_staff_is_allowed_without_queries(self):
+        staff = factories.UserFactory(is_staff=True)
+
+        with self.assertNumQueries(0):
+            result = self.logic.has_perm_bulk(staff, self.perm, self.projects)
+
+        self.assertTrue(all(result.values()))
+
+    def test_checks_are_memoized_within_request(self):
+        self.start_request()
+        self.logic.has_perm_bulk(self.user, self.perm, self.projects)
+
+        with self.assertNumQueries(0):
+            for project in self.projects:
+                self.logic.has_perm(self.user, self.perm, project)
+
+    def test_role_revoke_within_request_is_taken_into_account(self):
+        self.start_request()
+        self.assertTrue(self.logic.has_perm(self.user, self.perm, self.administered_project))
+        self.administered_project.remove_user(self.user)
+
+        self.assertFalse(self.logic.has_perm(self.user, self.perm, self.administered_project))
+
+    def test_memoized_checks_are_not_shared_by_logics_of_the_same_model(self):
+        owner_logic = FilteredCollaboratorsPermissionLogic(
+            collaborators_query=['customer__roles__permission_group__user'],
+            collaborators_filter=[{'customer__roles__role_type': models.CustomerRole.OWNER}],
+            change_permission=True,
+        )
+        owner_logic.model = models.Project
+
+        self.start_request()
+        self.assertTrue(self.logic.has_perm(self.user, self.perm, self.administered_project))
+
+        self.assertFalse(owner_logic.has_perm(self.user, self.perm, self.administered_project))
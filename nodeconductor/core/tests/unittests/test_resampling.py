@@ -0,0 +1,45 @@
+from __future__ import unicode_literals
+
+import unittest
+
+from nodeconductor.core.resampling import Aggregations, resample
+
+
+class ResampleTest(unittest.TestCase):
+
+    def setUp(self):
+        # segments: [0, 10), [10, 20), [20, 30)
+        self.time_and_value_list = [(12, 4), (1, 1), (5, 3), (29, 6), (30, 100)]
+
+    def get_values(self, aggregation, **kwargs):
+        segments = resample(self.time_and_value_list, 3, 0, 30, aggregation, **kwargs)
+        return [segment['value'] for segment in segments]
+
+    def test_segments_cover_range(self):
+        segments = resample([], 3, 0, 30)
+
+        self.assertEqual([(s['from'], s['to']) for s in segments], [(0, 10), (10, 20), (20, 30)])
+
+    def test_sum(self):
+        self.assertEqual(self.get_values(Aggregations.SUM), [4, 4, 6])
+
+    def test_avg(self):
+        self.assertEqual(self.get_values(Aggregations.AVG), [2, 4, 6])
+
+    def test_max(self):
+        self.assertEqual(self.get_values(Aggregations.MAX), [3, 4, 6])
+
+    def test_last_value_is_carried_over_empty_segments(self):
+        self.time_and_value_list = [(-5, 7), (15, 2), (12, 1)]
+
+        self.assertEqual(self.get_values(Aggregations.LAST), [7, 2, 2])
+
+    def test_segments_without_values_get_default(self):
+        self.time_and_value_list = [(15, 2)]
+
+        self.assertEqual(self.get_values(Aggregations.AVG, default=None), [None, 2, None])
+        self.assertEqual(self.get_values(Aggregations.LAST, default='0.0000'), ['0.0000', 2, 2])
+
+    def test_unknown_aggregation_is_rejected(self):
+        with self.assertRaises(ValueError):
+            resample([], 3, 0, 30, 'median')
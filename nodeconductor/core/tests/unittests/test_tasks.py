@@ -0,0 +1,62 @@
+from __future__ import unicode_literals
+
+import unittest
+
+from celery.exceptions import Retry
+from mock import ANY, Mock, patch
+
+from nodeconductor.core.tasks import Throttle
+
+
+@patch('nodeconductor.core.tasks.current_app')
+@patch('nodeconductor.core.tasks.current_task')
+class ThrottleTest(unittest.TestCase):
+
+    def setUp(self):
+        self.acquire = Mock(return_value=[1, 0])
+
+    def given_task(self, mocked_task, mocked_app):
+        mocked_task.name = 'task'
+        mocked_task.request.id = 'task-id'
+        mocked_task.retry.side_effect = Retry()
+        mocked_app.backend.client.register_script.return_value = self.acquire
+
+    def test_lock_is_acquired_atomically_with_task_id_as_token(self, mocked_task, mocked_app):
+        self.given_task(mocked_task, mocked_app)
+
+        with Throttle(key='cloud', concurrency=2, timeout=60):
+            pass
+
+        self.acquire.assert_called_once_with(
+            keys=['nc:task:cloud:holders', 'nc:task:cloud:queue', 'nc:task:cloud:seen'],
+            args=['task-id', ANY, 60.0, 2, 90.0])
+
+    def test_lock_is_released_by_removing_own_token(self, mocked_task, mocked_app):
+        self.given_task(mocked_task, mocked_app)
+
+        with Throttle(key='cloud'):
+            pass
+
+        mocked_app.backend.client.zrem.assert_called_once_with('nc:task:cloud:holders', 'task-id')
+
+    def test_task_next_in_queue_is_retried_sooner(self, mocked_task, mocked_app):
+        self.given_task(mocked_task, mocked_app)
+        self.acquire.return_value = [0, 1]
+
+        with self.assertRaises(Retry):
+            with Throttle(key='cloud', concurrency=2, retry_delay=30, poll_delay=5):
+                pass
+
+        mocked_task.retry.assert_called_once_with(countdown=5, max_retries=10000)
+        self.assertFalse(mocked_app.backend.client.zrem.called)
+
+    def test_task_far_in_queue_is_retried_later(self, mocked_task, mocked_app):
+        self.given_task(mocked_task, mocked_app)
+        self.acquire.return_value = [0, 4]
+
+        with self.assertRaises(Retry):
+            with Throttle(key='cloud', concurrency=2, retry_delay=30, poll_delay=5):
+                pass
+
+        mocked_task.retry.assert_called_once_with(countdown=30, max_retries=10000)
+
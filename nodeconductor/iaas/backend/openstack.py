@@ -2,20 +2,24 @@ from __future__ import unicode_literals
 
 import re
 import time
+import functools
 import uuid
 import logging
 import datetime
+import threading
 import pkg_resources
 import dateutil.parser
 
+from collections import OrderedDict, defaultdict
+from multiprocessing.pool import ThreadPool
 from itertools import groupby
 
+from celery import current_app
 from cinderclient import exceptions as cinder_exceptions
 from cinderclient.v1 import client as cinder_client
 from django.conf import settings
 from django.contrib.auth import get_user_model
 from django.db import transaction
-from django.db.models import ProtectedError
 from django.utils import dateparse
 from django.utils import six
 from django.utils import timezone
@@ -31,8 +35,10 @@ from neutronclient.client import exceptions as neutron_exceptions
 from neutronclient.v2_0 import client as neutron_client
 from novaclient import exceptions as nova_exceptions
 from novaclient.v1_1 import client as nova_client
+from redis import exceptions as redis_exceptions
 
 from nodeconductor.core.log import EventLoggerAdapter
+from nodeconductor.core.reconciliation import reconcile
 from nodeconductor.iaas.backend import CloudBackendError, CloudBackendInternalError
 from nodeconductor.iaas.backend import dummy as dummy_clients
 from nodeconductor.iaas import models
@@ -65,6 +71,345 @@ def _get_nova_version():
         return '00000002', '00000017', '00000000', '*final'
 
 
+class SessionCache(object):
+    """ Process-wide LRU cache of signed in Keystone sessions.
+
+        Sessions are keyed by (auth_url, username, tenant) and reused until their
+        token gets close to the point where Session.validate() would reject it.
+        Hit and miss counters are exposed via stats() to monitor Keystone load.
+
+        Cache size and reuse margin can be set via django settings:
+
+        .. code-block:: python
+            NODECONDUCTOR = {
+                'OPENSTACK_SESSION_CACHE': {
+                    'size': 512,
+                    'expiration_margin': 300,  # seconds
+                },
+            }
+    """
+
+    DEFAULT_OPTIONS = {
+        'size': 256,
+        'expiration_margin': 5 * 60,
+    }
+
+    def __init__(self, **options):
+        self._options = options
+        self._sessions = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def opt(self, opt_name):
+        if opt_name in self._options:
+            return self._options[opt_name]
+        conf = getattr(settings, 'NODECONDUCTOR', {}).get('OPENSTACK_SESSION_CACHE', {})
+        return conf.get(opt_name, self.DEFAULT_OPTIONS[opt_name])
+
+    @staticmethod
+    def get_key(credentials):
+        # Admin sessions are scoped by tenant name rather than by tenant id
+        tenant = credentials.get('tenant_id') or credentials.get('tenant_name')
+        return credentials.get('auth_url'), credentials.get('username'), tenant
+
+    def get_or_create(self, credentials, dummy, factory):
+        """ Return cached session for given credentials or sign in using factory """
+        key = self.get_key(credentials)
+        margin = datetime.timedelta(seconds=self.opt('expiration_margin'))
+
+        with self._lock:
+            session = self._sessions.pop(key, None)
+            if session is not None:
+                if (session.dummy == dummy and
+                        session.get('password') == credentials.get('password') and
+                        session.is_valid(margin=margin)):
+                    # Re-insert to mark as most recently used
+                    self._sessions[key] = session
+                    self.hits += 1
+                    return session
+
+                logger.debug('Dropped stale OpenStack session for %s', key[0])
+
+            self.misses += 1
+
+        # Sign in outside of the lock, Keystone might be slow to respond
+        session = factory()
+
+        with self._lock:
+            self._sessions[key] = session
+            while len(self._sessions) > self.opt('size'):
+                self._sessions.popitem(last=False)
+                self.evictions += 1
+
+        return session
+
+    def invalidate(self, credentials):
+        with self._lock:
+            self._sessions.pop(self.get_key(credentials), None)
+
+    def clear(self):
+        with self._lock:
+            self._sessions.clear()
+            self.hits = self.misses = self.evictions = 0
+
+    def stats(self):
+        with self._lock:
+            return {
+                'size': len(self._sessions),
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+            }
+
+
+class FlavorCache(object):
+    """ Process-wide cache of OpenStack flavors keyed by cloud auth_url and flavor id.
+
+        Both found and missing flavors are cached for 'ttl' seconds, so that
+        servers of deleted private flavors do not cause a lookup on every sync.
+        Flavors of a cloud are refreshed by pull_flavors.
+
+        .. code-block:: python
+            NODECONDUCTOR = {
+                'OPENSTACK_FLAVOR_CACHE': {
+                    'ttl': 3600,  # seconds
+                },
+            }
+    """
+
+    DEFAULT_OPTIONS = {
+        'ttl': 60 * 60,
+    }
+
+    # Marker of a flavor known to be missing on backend
+    MISSING = object()
+
+    def __init__(self, **options):
+        self._options = options
+        self._flavors = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def opt(self, opt_name):
+        if opt_name in self._options:
+            return self._options[opt_name]
+        conf = getattr(settings, 'NODECONDUCTOR', {}).get('OPENSTACK_FLAVOR_CACHE', {})
+        return conf.get(opt_name, self.DEFAULT_OPTIONS[opt_name])
+
+    def get(self, auth_url, flavor_id, nova):
+        """ Return flavor with given id or None if it does not exist on backend """
+        now = time.time()
+        with self._lock:
+            flavor, expires_at = self._flavors.get((auth_url, flavor_id), (None, 0))
+            if expires_at > now:
+                self.hits += 1
+                return None if flavor is self.MISSING else flavor
+            self.misses += 1
+
+        try:
+            flavor = nova.flavors.get(flavor_id)
+        except nova_exceptions.NotFound:
+            logger.warning('Cannot find flavor with id %s', flavor_id)
+            flavor = self.MISSING
+
+        with self._lock:
+            self._flavors[(auth_url, flavor_id)] = (flavor, now + self.opt('ttl'))
+
+        return None if flavor is self.MISSING else flavor
+
+    def update(self, auth_url, flavors):
+        """ Store flavors fetched with a list call """
+        expires_at = time.time() + self.opt('ttl')
+        with self._lock:
+            for flavor in flavors:
+                self._flavors[(auth_url, flavor.id)] = (flavor, expires_at)
+
+    def invalidate(self, auth_url):
+        with self._lock:
+            for key in [key for key in self._flavors if key[0] == auth_url]:
+                del self._flavors[key]
+
+    def clear(self):
+        with self._lock:
+            self._flavors.clear()
+            self.hits = self.misses = 0
+
+    def stats(self):
+        with self._lock:
+            return {
+                'size': len(self._flavors),
+                'hits': self.hits,
+                'misses': self.misses,
+            }
+
+
+class TenantSnapshot(object):
+    """ Immutable view of OpenStack tenant resources fetched with one list call per resource type.
+
+        Resources are exposed as tuples in backend order, resources that were not
+        requested are None. Lookups by id go through get_* methods.
+        fetched_at is the time right before the first request was issued.
+    """
+
+    RESOURCES = (
+        'servers', 'volumes', 'snapshots', 'flavors', 'floating_ips',
+        'security_groups', 'nova_quotas', 'cinder_quotas',
+    )
+
+    def __init__(self, fetched_at=None, **resources):
+        object.__setattr__(self, 'fetched_at', fetched_at)
+        for name in self.RESOURCES:
+            value = resources.get(name)
+            if isinstance(value, list):
+                value = tuple(value)
+            object.__setattr__(self, name, value)
+
+        server_volumes = defaultdict(list)
+        for volume in self.volumes or ():
+            for attachment in getattr(volume, 'attachments', None) or ():
+                server_volumes[attachment['server_id']].append(volume)
+
+        object.__setattr__(self, '_servers', dict((s.id, s) for s in self.servers or ()))
+        object.__setattr__(self, '_volumes', dict((v.id, v) for v in self.volumes or ()))
+        object.__setattr__(self, '_flavors', dict((f.id, f) for f in self.flavors or ()))
+        object.__setattr__(self, '_server_volumes', dict((k, tuple(v)) for k, v in server_volumes.items()))
+
+    def __setattr__(self, name, value):
+        raise AttributeError('%s is immutable' % self.__class__.__name__)
+
+    @property
+    def instances(self):
+        """ Servers booted from volumes, the only ones managed by NodeConductor """
+        return tuple(s for s in self.servers if s.image == '')
+
+    def get_server(self, server_id):
+        return self._servers.get(server_id)
+
+    def get_volume(self, volume_id):
+        return self._volumes.get(volume_id)
+
+    def get_flavor(self, flavor_id):
+        return self._flavors.get(flavor_id)
+
+    def get_server_volumes(self, server_id):
+        return self._server_volumes.get(server_id, ())
+
+
+class RateLimiter(object):
+    """ Token buckets limiting rate of OpenStack API calls per cloud auth_url.
+
+        Buckets are kept in Redis and shared by all workers. Read (GET and HEAD)
+        and write calls have separate budgets: 'rate' is a number of calls per second
+        and 'burst' is a number of calls allowed at once after a period of inactivity.
+        Time spent waiting for a token is exposed via stats(). Calls are not limited
+        if celery result backend is not Redis or Redis is not available.
+
+        .. code-block:: python
+            NODECONDUCTOR = {
+                'OPENSTACK_RATE_LIMIT': {
+                    'read': {'rate': 10, 'burst': 50},
+                    'write': {'rate': 2, 'burst': 10},
+                },
+            }
+    """
+
+    DEFAULT_OPTIONS = {
+        'read': {'rate': 10, 'burst': 50},
+        'write': {'rate': 2, 'burst': 10},
+    }
+
+    READ_METHODS = ('GET', 'HEAD', 'OPTIONS')
+
+    # KEYS: bucket
+    # ARGV: now, rate, burst
+    # Takes a token, possibly in advance, and returns a number of seconds to wait for it.
+    # Result is a string since Redis truncates Lua numbers to integers.
+    ACQUIRE_SCRIPT = """
+        local bucket = KEYS[1]
+        local now = tonumber(ARGV[1])
+        local rate = tonumber(ARGV[2])
+        local burst = tonumber(ARGV[3])
+
+        local state = redis.call('HMGET', bucket, 'tokens', 'timestamp')
+        local tokens = tonumber(state[1]) or burst
+        local timestamp = tonumber(state[2]) or now
+
+        tokens = math.min(burst, tokens + math.max(0, now - timestamp) * rate) - 1
+        redis.call('HMSET', bucket, 'tokens', tokens, 'timestamp', math.max(now, timestamp))
+        redis.call('EXPIRE', bucket, math.ceil((burst - tokens) / rate) + 1)
+
+        if tokens >= 0 then
+            return '0'
+        end
+        return tostring(-tokens / rate)
+    """
+
+    def __init__(self, **options):
+        self._options = options
+        self._stats = {}
+        self._lock = threading.Lock()
+
+    def opt(self, opt_name):
+        if opt_name in self._options:
+            return self._options[opt_name]
+        conf = getattr(settings, 'NODECONDUCTOR', {}).get('OPENSTACK_RATE_LIMIT', {})
+        return dict(self.DEFAULT_OPTIONS[opt_name], **conf.get(opt_name, {}))
+
+    @property
+    def redis(self):
+        """ Redis client of celery result backend or None if results are not stored in Redis """
+        return getattr(current_app.backend, 'client', None)
+
+    @staticmethod
+    def get_key(auth_url, kind):
+        return 'nc:openstack-rate-limit:{}:{}'.format(auth_url, kind)
+
+    def wait(self, auth_url, method):
+        """ Block until a call with given HTTP method is allowed for the cloud """
+        kind = 'read' if method.upper() in self.READ_METHODS else 'write'
+        options = self.opt(kind)
+
+        redis = self.redis
+        if redis is None:
+            logger.debug('OpenStack API calls are not rate limited, celery result backend is not Redis')
+            return 0
+
+        try:
+            acquire = redis.register_script(self.ACQUIRE_SCRIPT)
+            delay = float(acquire(
+                keys=[self.get_key(auth_url, kind)],
+                args=[time.time(), options['rate'], options['burst']]))
+        except redis_exceptions.RedisError:
+            # Calls are not limited rather than failed if Redis is not available
+            logger.warning('Failed to check OpenStack API rate limit for %s', auth_url, exc_info=1)
+            delay = 0
+
+        if delay > 0:
+            logger.debug('Waiting %.2f seconds for OpenStack API %s rate limit of %s', delay, kind, auth_url)
+            time.sleep(delay)
+
+        with self._lock:
+            stats = self._stats.setdefault((auth_url, kind), {'calls': 0, 'delayed': 0, 'wait_time': 0.0})
+            stats['calls'] += 1
+            if delay > 0:
+                stats['delayed'] += 1
+                stats['wait_time'] += delay
+
+        return delay
+
+    def clear(self):
+        with self._lock:
+            self._stats.clear()
+
+    def stats(self):
+        """ Return {(auth_url, 'read' or 'write'): {'calls', 'delayed', 'wait_time'}} """
+        with self._lock:
+            return dict((key, dict(value)) for key, value in self._stats.items())
+
+
 class OpenStackClient(object):
     """ Generic OpenStack client with dummy mode support """
 
@@ -77,6 +422,9 @@ class OpenStackClient(object):
         'GlanceClient': (glance_client.Client, dummy_clients.GlanceClient),
     }
 
+    session_cache = SessionCache()
+    rate_limiter = RateLimiter()
+
     def __init__(self, dummy=False):
         self.dummy = dummy
 
@@ -93,6 +441,9 @@ class OpenStackClient(object):
         # TODO: Switch to token auth on libraries upgrade.
         OPTIONS = ('auth_ref', 'auth_url', 'username', 'password', 'tenant_id', 'tenant_name')
 
+        # Sessions expiring sooner than that are considered invalid
+        VALIDITY_THRESHOLD = datetime.timedelta(minutes=10)
+
         def __init__(self, backend, ks_session=None, **credentials):
             self.dummy = self['dummy'] = backend.dummy
             self.backend = backend.__class__(dummy=backend.dummy)
@@ -121,9 +472,15 @@ class OpenStackClient(object):
                 'KeystoneSession', backend.dummy)(auth=auth_plugin)
             return cls(backend, ks_session=ks_session)
 
+        @property
+        def expires_at(self):
+            return dateutil.parser.parse(self.auth.auth_ref['token']['expires'])
+
+        def is_valid(self, margin=datetime.timedelta(0)):
+            return self.expires_at > timezone.now() + self.VALIDITY_THRESHOLD + margin
+
         def validate(self):
-            expiresat = dateutil.parser.parse(self.auth.auth_ref['token']['expires'])
-            if expiresat > timezone.now() + datetime.timedelta(minutes=10):
+            if self.is_valid():
                 return True
 
             raise CloudBackendError('Invalid OpenStack session')
@@ -136,13 +493,17 @@ class OpenStackClient(object):
             logger.exception('Failed to find OpenStack credentials for Keystone URL %s', keystone_url)
             six.reraise(CloudBackendError, e)
 
-        self.session = self.Session(self, **credentials)
+        self.session = self._get_cached_session(credentials)
         return self.session
 
     def create_tenant_session(self, credentials):
-        self.session = self.Session(self, **credentials)
+        self.session = self._get_cached_session(credentials)
         return self.session
 
+    def _get_cached_session(self, credentials):
+        return self.session_cache.get_or_create(
+            credentials, self.dummy, lambda: self.Session(self, **credentials))
+
     @classmethod
     def recover_session(cls, session):
         """ Recover OpenStack session from serialized object """
@@ -173,7 +534,10 @@ class OpenStackClient(object):
                 'project_id': auth_plugin.tenant_name,
             }
 
-        return cls.get_openstack_class('NovaClient', session.dummy)(**kwargs)
+        client = cls.get_openstack_class('NovaClient', session.dummy)(**kwargs)
+        if not session.dummy:
+            cls._limit_rate(client.client, 'request', session.auth.auth_url)
+        return client
 
     @classmethod
     def create_neutron_client(cls, session):
@@ -191,7 +555,10 @@ class OpenStackClient(object):
                 'tenant_name': auth_plugin.tenant_name,
             }
 
-        return cls.get_openstack_class('NeutronClient', session.dummy)(**kwargs)
+        client = cls.get_openstack_class('NeutronClient', session.dummy)(**kwargs)
+        if not session.dummy:
+            cls._limit_rate(client.httpclient, 'request', session.auth.auth_url)
+        return client
 
     @classmethod
     def create_cinder_client(cls, session):
@@ -209,7 +576,10 @@ class OpenStackClient(object):
                 'project_id': auth_plugin.tenant_name,
             }
 
-        return cls.get_openstack_class('CinderClient', session.dummy)(**kwargs)
+        client = cls.get_openstack_class('CinderClient', session.dummy)(**kwargs)
+        if not session.dummy:
+            cls._limit_rate(client.client, 'request', session.auth.auth_url)
+        return client
 
     @classmethod
     def create_glance_client(cls, session):
@@ -223,7 +593,22 @@ class OpenStackClient(object):
             'ssl_compression': True,
         }
 
-        return cls.get_openstack_class('GlanceClient', session.dummy)(endpoint, **kwargs)
+        client = cls.get_openstack_class('GlanceClient', session.dummy)(endpoint, **kwargs)
+        if not session.dummy:
+            cls._limit_rate(client, '_http_request', session.auth.auth_url)
+        return client
+
+    @classmethod
+    def _limit_rate(cls, http_client, request_method_name, auth_url):
+        """ Make every request of a client HTTP layer wait for the cloud rate limiter """
+        request = getattr(http_client, request_method_name)
+
+        @functools.wraps(request)
+        def limited_request(url, method='GET', *args, **kwargs):
+            cls.rate_limiter.wait(auth_url, method)
+            return request(url, method, *args, **kwargs)
+
+        setattr(http_client, request_method_name, limited_request)
 
 
 class OpenStackBackend(OpenStackClient):
@@ -231,6 +616,13 @@ class OpenStackBackend(OpenStackClient):
         Test mode implies by creating an instance as OpenStackBackend(dummy=True)
     """
 
+    flavor_cache = FlavorCache()
+
+    # Servers reported by Nova changes-since query after their deletion
+    DELETED_SERVER_STATUSES = ('DELETED', 'SOFT_DELETED')
+    # Tolerated clock skew between NodeConductor and Nova
+    INSTANCES_CHANGES_OVERLAP = datetime.timedelta(minutes=1)
+
     @classmethod
     def create_session(cls, keystone_url=None, instance_uuid=None, check_tenant=True, membership=None, **kwargs):
         """ Create OpenStack session using NodeConductor credentials """
@@ -282,52 +674,28 @@ class OpenStackBackend(OpenStackClient):
         nova = self.create_nova_client(session)
 
         backend_flavors = nova.flavors.findall(is_public=True)
-        backend_flavors = dict(((f.id, f) for f in backend_flavors))
+        self.flavor_cache.invalidate(cloud_account.auth_url)
+        self.flavor_cache.update(cloud_account.auth_url, backend_flavors)
+
+        backend_flavors = dict((
+            (f.id, {
+                'name': f.name,
+                'cores': f.vcpus,
+                'ram': self.get_core_ram_size(f.ram),
+                'disk': self.get_core_disk_size(f.disk),
+            })
+            for f in backend_flavors
+        ))
 
         with transaction.atomic():
             nc_flavors = cloud_account.flavors.all()
             nc_flavors = dict(((f.backend_id, f) for f in nc_flavors))
 
-            backend_ids = set(backend_flavors.keys())
-            nc_ids = set(nc_flavors.keys())
-
-            # Remove stale flavors, the ones that are not on backend anymore
-            for flavor_id in nc_ids - backend_ids:
-                nc_flavor = nc_flavors[flavor_id]
-                # Delete the flavor that has instances after NC-178 gets implemented.
-                logger.debug('About to delete flavor %s in database', nc_flavor.uuid)
-                try:
-                    nc_flavor.delete()
-                except ProtectedError:
-                    logger.info('Skipped deletion of stale flavor %s due to linked instances',
-                                nc_flavor.uuid)
-                else:
-                    logger.info('Deleted stale flavor %s in database', nc_flavor.uuid)
-
-            # Add new flavors, the ones that are not yet in the database
-            for flavor_id in backend_ids - nc_ids:
-                backend_flavor = backend_flavors[flavor_id]
-
-                nc_flavor = cloud_account.flavors.create(
-                    name=backend_flavor.name,
-                    cores=backend_flavor.vcpus,
-                    ram=self.get_core_ram_size(backend_flavor.ram),
-                    disk=self.get_core_disk_size(backend_flavor.disk),
-                    backend_id=backend_flavor.id,
-                )
-                logger.info('Created new flavor %s in database', nc_flavor.uuid)
-
-            # Update matching flavors, the ones that exist in both places
-            for flavor_id in nc_ids & backend_ids:
-                nc_flavor = nc_flavors[flavor_id]
-                backend_flavor = backend_flavors[flavor_id]
+            # Delete the flavor that has instances after NC-178 gets implemented.
+            result = reconcile(models.Flavor, backend_flavors, nc_flavors, defaults={'cloud': cloud_account})
 
-                nc_flavor.name = backend_flavor.name
-                nc_flavor.cores = backend_flavor.vcpus
-                nc_flavor.ram = self.get_core_ram_size(backend_flavor.ram)
-                nc_flavor.disk = self.get_core_disk_size(backend_flavor.disk)
-                nc_flavor.save()
-                logger.info('Updated existing flavor %s in database', nc_flavor.uuid)
+        logger.info('Pulled flavors of cloud %s: %d created, %d updated, %d deleted',
+                    cloud_account.uuid, result.created, result.updated, result.deleted)
 
     def pull_images(self, cloud_account):
         session = self.create_session(keystone_url=cloud_account.auth_url, dummy=self.dummy)
@@ -343,19 +711,20 @@ class OpenStackBackend(OpenStackClient):
         from nodeconductor.iaas.models import TemplateMapping
 
         with transaction.atomic():
-            # Add missing images
-            current_image_ids = set()
+            # Images are identified by templates, one image per template in a cloud
+            template_images = {}
 
             # itertools.groupby requires the iterable to be sorted by key
             mapping_queryset = (
                 TemplateMapping.objects
                 .filter(backend_image_id__in=backend_images.keys())
+                .select_related('template')
                 .order_by('template__pk')
             )
 
-            mappings_grouped = groupby(mapping_queryset.iterator(), lambda m: m.template.pk)
+            mappings_grouped = groupby(mapping_queryset.iterator(), lambda m: m.template_id)
 
-            for _, mapping_iterator in mappings_grouped:
+            for template_pk, mapping_iterator in mappings_grouped:
                 # itertools.groupby shares the iterable,
                 # store mappings in own list
                 mappings = list(mapping_iterator)
@@ -370,37 +739,19 @@ class OpenStackBackend(OpenStackClient):
                     )
                 else:
                     backend_image = backend_images[mapping.backend_image_id]
-                    # XXX: This might fail in READ REPEATED isolation level,
-                    # which is default on MySQL
-                    # see https://docs.djangoproject.com/en/1.6/ref/models/querysets/#django.db.models.query.QuerySet.get_or_create
-                    image, created = cloud_account.images.get_or_create(
-                        template=mapping.template,
-                        min_disk=self.get_core_disk_size(backend_image.min_disk),
-                        min_ram=self.get_core_ram_size(backend_image.min_ram),
-                        defaults={'backend_id': mapping.backend_image_id},
-                    )
-
-                    if created:
-                        logger.info('Created image %s pointing to %s in database', image, image.backend_id)
-                    elif (image.backend_id != mapping.backend_image_id or
-                            image.min_disk != backend_image.min_disk or
-                            image.min_ram != backend_image.min_ram):
-                        image.backend_id = mapping.backend_image_id
-                        image.min_ram = self.get_core_ram_size(backend_image.min_ram)
-                        image.min_disk = self.get_core_disk_size(backend_image.min_disk)
-                        image.save()
-                        logger.info('Updated existing image %s to point to %s in database', image, image.backend_id)
-                    else:
-                        logger.info('Image %s pointing to %s is already up to date', image, image.backend_id)
+                    template_images[template_pk] = {
+                        'backend_id': mapping.backend_image_id,
+                        'min_disk': self.get_core_disk_size(backend_image.min_disk),
+                        'min_ram': self.get_core_ram_size(backend_image.min_ram),
+                    }
 
-                    current_image_ids.add(image.backend_id)
+            # Stale images are the ones that don't have any template mappings defined for them
+            nc_images = dict((image.template_id, image) for image in cloud_account.images.all())
+            result = reconcile(models.Image, template_images, nc_images,
+                               key_field='template_id', defaults={'cloud': cloud_account})
 
-            # Remove stale images,
-            # the ones that don't have any template mappings defined for them
-
-            for image in cloud_account.images.exclude(backend_id__in=current_image_ids):
-                image.delete()
-                logger.info('Removed stale image %s, was pointing to %s in database', image, image.backend_id)
+        logger.info('Pulled images of cloud %s: %d created, %d updated, %d deleted',
+                    cloud_account.uuid, result.created, result.updated, result.deleted)
 
     # CloudProjectMembership related methods
     def push_membership(self, membership):
@@ -582,87 +933,187 @@ class OpenStackBackend(OpenStackClient):
             else:
                 logger.info('Security group %s successfully created in backend', nc_group.uuid)
 
-    def pull_security_groups(self, membership):
+    def pull_membership(self, membership):
+        """ Fetch all tenant resources concurrently and reconcile them within a single transaction """
+        snapshot = self.get_tenant_snapshot(membership)
+
+        with transaction.atomic():
+            self.pull_security_groups(membership, snapshot)
+            self.pull_instances(membership, snapshot)
+            self.pull_resource_quota(membership, snapshot)
+            self.pull_resource_quota_usage(membership, snapshot)
+            self.pull_floating_ips(membership, snapshot)
+
+    def get_tenant_snapshot(self, membership, resources=TenantSnapshot.RESOURCES, changes_since=None):
+        """ Fetch tenant resources from OpenStack using a bounded pool of threads.
+            Returns TenantSnapshot populated with requested resources.
+
+            If changes_since is given only servers modified after it are fetched,
+            including the deleted ones.
+        """
+        fetched_at = timezone.now()
+        servers_kwargs = {}
+        if changes_since is not None:
+            servers_kwargs['search_opts'] = {'changes-since': changes_since.isoformat()}
+
         try:
             session = self.create_session(membership=membership, dummy=self.dummy)
-            nova = self.create_nova_client(session)
         except keystone_exceptions.ClientException as e:
-            logger.exception('Failed to create nova client')
+            logger.exception('Failed to create OpenStack session for membership %s', membership.id)
+            six.reraise(CloudBackendError, e)
+
+        tenant_id = membership.tenant_id
+        fetchers = {
+            'servers': lambda: self.create_nova_client(session).servers.list(**servers_kwargs),
+            'flavors': lambda: self.create_nova_client(session).flavors.list(),
+            'security_groups': lambda: self.create_nova_client(session).security_groups.list(),
+            'nova_quotas': lambda: self.create_nova_client(session).quotas.get(tenant_id=tenant_id),
+            'volumes': lambda: self.create_cinder_client(session).volumes.list(),
+            'snapshots': lambda: self.create_cinder_client(session).volume_snapshots.list(),
+            'cinder_quotas': lambda: self.create_cinder_client(session).quotas.get(tenant_id=tenant_id),
+            'floating_ips': lambda: self.get_floating_ips(tenant_id, self.create_neutron_client(session)),
+        }
+
+        def fetch(name):
+            try:
+                return fetchers[name]()
+            except (nova_exceptions.ClientException,
+                    cinder_exceptions.ClientException,
+                    neutron_exceptions.NeutronClientException) as e:
+                logger.exception('Failed to get %s for tenant %s', name.replace('_', ' '), tenant_id)
+                six.reraise(CloudBackendError, e)
+
+        resources = list(resources)
+        logger.debug('About to get %s for tenant %s', ', '.join(resources), tenant_id)
+        if len(resources) == 1:
+            results = [fetch(resources[0])]
+        else:
+            concurrency = getattr(settings, 'NODECONDUCTOR', {}).get('OPENSTACK_FETCH_CONCURRENCY', 4)
+            pool = ThreadPool(min(len(resources), concurrency))
+            try:
+                results = pool.map(fetch, resources)
+            finally:
+                pool.close()
+        logger.info('Successfully got %s for tenant %s', ', '.join(resources), tenant_id)
+
+        snapshot = TenantSnapshot(fetched_at=fetched_at, **dict(zip(resources, results)))
+        if snapshot.flavors is not None:
+            self.flavor_cache.update(membership.cloud.auth_url, snapshot.flavors)
+
+        return snapshot
+
+    def get_server_snapshot(self, membership, server_id):
+        """ Fetch a single server and volumes attached to it by their ids.
+            Returns TenantSnapshot with the server and its volumes or None if the server does not exist.
+        """
+        fetched_at = timezone.now()
+        try:
+            session = self.create_session(membership=membership, dummy=self.dummy)
+            nova = self.create_nova_client(session)
+            cinder = self.create_cinder_client(session)
+        except (keystone_exceptions.ClientException, cinder_exceptions.ClientException) as e:
+            logger.exception('Failed to create OpenStack clients for membership %s', membership.id)
             six.reraise(CloudBackendError, e)
 
         try:
-            backend_security_groups = nova.security_groups.list()
+            server = nova.servers.get(server_id)
+        except nova_exceptions.NotFound:
+            return None
         except nova_exceptions.ClientException as e:
-            logger.exception('Failed to get openstack security groups for membership %s', membership.id)
+            logger.exception('Failed to get server %s', server_id)
             six.reraise(CloudBackendError, e)
 
-        # list of openstack security groups that do not exist in nc
-        nonexistent_groups = []
-        # list of openstack security groups that have wrong parameters in in nc
-        unsynchronized_groups = []
-        # list of nc security groups that do not exist in openstack
+        try:
+            volumes = [cinder.volumes.get(attachment.volumeId)
+                       for attachment in nova.volumes.get_server_volumes(server_id)]
+        except (nova_exceptions.ClientException, cinder_exceptions.ClientException) as e:
+            logger.exception('Failed to get volumes of server %s', server_id)
+            six.reraise(CloudBackendError, e)
 
-        from nodeconductor.iaas.models import SecurityGroup
+        return TenantSnapshot(fetched_at=fetched_at, servers=[server], volumes=volumes)
 
-        extra_groups = SecurityGroup.objects.filter(
-            cloud_project_membership=membership,
-        ).exclude(
-            backend_id__in=[g.id for g in backend_security_groups],
-        )
+    def pull_security_groups(self, membership, snapshot=None):
+        if snapshot is None:
+            snapshot = self.get_tenant_snapshot(membership, ['security_groups'])
+        backend_security_groups = snapshot.security_groups
+
+        # Rules are already included into the list payload, no need to fetch groups one by one
+        backend_groups = {}
+        backend_group_rules = {}
+        for backend_group in backend_security_groups:
+            group_id = six.text_type(backend_group.id)
+            backend_groups[group_id] = {'name': backend_group.name}
+            backend_group_rules[group_id] = [
+                self._normalize_security_group_rule(rule) for rule in backend_group.rules]
 
         with transaction.atomic():
-            for backend_group in backend_security_groups:
-                try:
-                    nc_group = SecurityGroup.objects.get(
-                        backend_id=backend_group.id,
+            # Groups and rules created in NodeConductor but not saved with backend ids can not be matched
+            # with backend ones, they are replaced by the pulled ones
+            models.SecurityGroup.objects.filter(cloud_project_membership=membership, backend_id='').delete()
+            models.SecurityGroupRule.objects.filter(
+                group__cloud_project_membership=membership, backend_id='').delete()
+
+            nc_groups = dict(
+                (group.backend_id, group)
+                for group in models.SecurityGroup.objects.filter(cloud_project_membership=membership)
+            )
+            result = reconcile(models.SecurityGroup, backend_groups, nc_groups,
+                               defaults={'cloud_project_membership': membership})
+            logger.info('Pulled security groups of membership %s: %d created, %d updated, %d deleted',
+                        membership.id, result.created, result.updated, result.deleted)
+
+            if result.created:
+                # bulk_create does not set primary keys, reread created groups
+                nc_groups.update(
+                    (group.backend_id, group)
+                    for group in models.SecurityGroup.objects.filter(
                         cloud_project_membership=membership,
+                        backend_id__in=set(backend_groups) - set(nc_groups),
                     )
-                    if not self._are_security_groups_equal(backend_group, nc_group):
-                        unsynchronized_groups.append(backend_group)
-                except SecurityGroup.DoesNotExist:
-                    nonexistent_groups.append(backend_group)
-
-            # deleting extra security groups
-            extra_groups.delete()
-            logger.info('Deleted stale security groups in database')
-
-            # synchronizing unsynchronized security groups
-            for backend_group in unsynchronized_groups:
-                nc_security_group = SecurityGroup.objects.get(
-                    backend_id=backend_group.id,
-                    cloud_project_membership=membership,
                 )
-                if backend_group.name != nc_security_group.name:
-                    nc_security_group.name = backend_group.name
-                    nc_security_group.save()
-                self.pull_security_group_rules(nc_security_group, nova)
-            logger.info('Updated existing security groups in database')
-
-            # creating non-existed security groups
-            for backend_group in nonexistent_groups:
-                nc_security_group = SecurityGroup.objects.create(
-                    backend_id=backend_group.id,
-                    name=backend_group.name,
-                    cloud_project_membership=membership,
-                )
-                self.pull_security_group_rules(nc_security_group, nova)
-                logger.info('Created new security group %s in database', nc_security_group.uuid)
 
-    def pull_instances(self, membership):
-        try:
-            session = self.create_session(membership=membership, dummy=self.dummy)
-            nova = self.create_nova_client(session)
-            cinder = self.create_cinder_client(session)
-        except keystone_exceptions.ClientException as e:
-            logger.exception('Failed to create nova client')
-            six.reraise(CloudBackendError, e)
-        except cinder_exceptions.ClientException as e:
-            logger.exception('Failed to create cinder client')
-            six.reraise(CloudBackendError, e)
+            backend_rules = {}
+            for group_id, rules in backend_group_rules.items():
+                for rule in rules:
+                    backend_rules[six.text_type(rule['id'])] = {
+                        'group_id': nc_groups[group_id].pk,
+                        'from_port': rule['from_port'],
+                        'to_port': rule['to_port'],
+                        'protocol': rule['ip_protocol'],
+                        'cidr': rule['ip_range']['cidr'],
+                    }
+
+            nc_rules = dict(
+                (rule.backend_id, rule)
+                for rule in models.SecurityGroupRule.objects.filter(group__cloud_project_membership=membership)
+            )
+            result = reconcile(models.SecurityGroupRule, backend_rules, nc_rules)
+            logger.info('Pulled security group rules of membership %s: %d created, %d updated, %d deleted',
+                        membership.id, result.created, result.updated, result.deleted)
+
+    def pull_instances(self, membership, snapshot=None):
+        if snapshot is None:
+            snapshot = self.get_tenant_snapshot(membership, ['servers'])
+        self._pull_instances(membership, snapshot)
 
-        # Exclude instances that are booted from images
-        backend_instances = nova.servers.findall(image='')
-        backend_instances = dict(((f.id, f) for f in backend_instances))
+    def pull_instances_changes(self, membership):
+        """ Pull only instances changed since the last synchronization of the membership.
+
+            Falls back to full pull if membership instances were never synchronized.
+            Instances deleted on backend are detected only while Nova still reports them,
+            the rest is handled by the periodic full pull.
+        """
+        if membership.instances_synced_at is None:
+            self.pull_instances(membership)
+            return
+
+        changes_since = membership.instances_synced_at - self.INSTANCES_CHANGES_OVERLAP
+        snapshot = self.get_tenant_snapshot(membership, ['servers'], changes_since=changes_since)
+        self._pull_instances(membership, snapshot, incremental=True)
+
+    def _pull_instances(self, membership, snapshot, incremental=False):
+        backend_instances = dict(
+            (f.id, f) for f in snapshot.instances if f.status not in self.DELETED_SERVER_STATUSES)
 
         with transaction.atomic():
             states = (
@@ -673,50 +1124,48 @@ class OpenStackBackend(OpenStackClient):
                 state__in=states,
                 cloud_project_membership=membership,
             )
+            if incremental:
+                # Only reported servers are compared, the deleted ones become stale
+                nc_instances = nc_instances.filter(backend_id__in=[f.id for f in snapshot.instances])
             nc_instances = dict(((i.backend_id, i) for i in nc_instances))
 
-            backend_ids = set(backend_instances.keys())
-            nc_ids = set(nc_instances.keys())
-
-            # Mark stale instances as erred. Can happen if instances are removed from the backend explicitly
-            for instance_id in nc_ids - backend_ids:
-                nc_instance = nc_instances[instance_id]
-                nc_instance.set_erred()
-                nc_instance.save()
-
-            # update matching instances
-            for instance_id in nc_ids & backend_ids:
+            # Only instances known to the database are updated, new ones are brought in via import
+            instances_values = {}
+            for instance_id in set(nc_instances.keys()) & set(backend_instances.keys()):
                 backend_instance = backend_instances[instance_id]
                 nc_instance = nc_instances[instance_id]
-                nc_instance.state = self._get_instance_state(backend_instance)
+
+                values = {'state': self._get_instance_state(backend_instance)}
                 if nc_instance.key_name != backend_instance.key_name:
-                    if backend_instance.key_name is None:
-                        nc_instance.key_name = ""
-                    else:
-                        nc_instance.key_name = backend_instance.key_name
+                    values['key_name'] = backend_instance.key_name or ''
                     # note that fingerprint is not present in the request
-                    nc_instance.key_fingerprint = ""
-                nc_instance.save()
+                    values['key_fingerprint'] = ''
+                instances_values[instance_id] = values
                 # TODO: synchronize also volume sizes
 
-    def pull_resource_quota(self, membership):
-        try:
-            session = self.create_session(membership=membership, dummy=self.dummy)
-            nova = self.create_nova_client(session)
-            cinder = self.create_cinder_client(session)
-        except keystone_exceptions.ClientException as e:
-            logger.exception('Failed to create nova client or cinder client')
-            six.reraise(CloudBackendError, e)
+            result = reconcile(models.Instance, instances_values, nc_instances, delete_stale=False)
 
-        logger.debug('About to get quotas for tenant %s', membership.tenant_id)
-        try:
-            nova_quotas = nova.quotas.get(tenant_id=membership.tenant_id)
-            cinder_quotas = cinder.quotas.get(tenant_id=membership.tenant_id)
-        except (nova_exceptions.ClientException, cinder_exceptions.ClientException) as e:
-            logger.exception('Failed to get quotas for tenant %s', membership.tenant_id)
-            six.reraise(CloudBackendError, e)
-        else:
-            logger.info('Successfully got quotas for tenant %s', membership.tenant_id)
+            # Mark stale instances as erred. Can happen if instances are removed from the backend explicitly
+            models.Instance.objects.filter(
+                pk__in=[i.pk for i in result.stale],
+            ).exclude(
+                state=models.Instance.States.ERRED,
+            ).update(state=models.Instance.States.ERRED)
+
+            if snapshot.fetched_at is not None:
+                models.CloudProjectMembership.objects.filter(
+                    pk=membership.pk,
+                ).update(instances_synced_at=snapshot.fetched_at)
+                membership.instances_synced_at = snapshot.fetched_at
+
+        logger.info('Pulled %s instances of membership %s: %d updated, %d missing on backend',
+                    'changed' if incremental else 'all', membership.pk, result.updated, len(result.stale))
+
+    def pull_resource_quota(self, membership, snapshot=None):
+        if snapshot is None:
+            snapshot = self.get_tenant_snapshot(membership, ['nova_quotas', 'cinder_quotas'])
+        nova_quotas = snapshot.nova_quotas
+        cinder_quotas = snapshot.cinder_quotas
 
         membership.set_quota_limit('ram', self.get_core_ram_size(nova_quotas.ram))
         membership.set_quota_limit('vcpu', nova_quotas.cores)
@@ -729,39 +1178,36 @@ class OpenStackBackend(OpenStackClient):
         membership.project.set_quota_limit('max_instances', nova_quotas.instances)
         membership.project.set_quota_limit('storage', self.get_core_disk_size(cinder_quotas.gigabytes))
 
-    def pull_resource_quota_usage(self, membership):
-        try:
-            session = self.create_session(membership=membership, dummy=self.dummy)
-            nova = self.create_nova_client(session)
-            cinder = self.create_cinder_client(session)
-        except keystone_exceptions.ClientException as e:
-            logger.exception('Failed to create nova client or cinder client')
-            six.reraise(CloudBackendError, e)
+    def pull_resource_quota_usage(self, membership, snapshot=None):
+        if snapshot is None:
+            snapshot = self.get_tenant_snapshot(membership, ['volumes', 'snapshots', 'flavors', 'servers'])
+        volumes = snapshot.volumes
+        snapshots = snapshot.snapshots
+        instances = snapshot.servers
 
-        logger.debug('About to get volumes, snapshots, flavors and instances for tenant %s', membership.tenant_id)
-        try:
-            volumes = cinder.volumes.list()
-            snapshots = cinder.volume_snapshots.list()
-            flavors = dict((flavor.id, flavor) for flavor in nova.flavors.list())
-            instances = nova.servers.list()
-        except (nova_exceptions.ClientException, cinder_exceptions.ClientException) as e:
-            logger.exception(
-                'Failed to get volumes, snapshots, flavors or instances for tenant %s', membership.tenant_id)
-            six.reraise(CloudBackendError, e)
-        else:
-            logger.info(
-                'Successfully got volumes, snapshots, flavors and instances for tenant %s', membership.tenant_id)
+        auth_url = membership.cloud.auth_url
 
         # ram and vcpu
         instance_flavor_ids = [instance.flavor['id'] for instance in instances]
         ram = 0
         vcpu = 0
 
+        # Flavors missing in the list, e.g. deleted private ones, are looked up one by one.
+        # Session is already cached by the fetch above, so no request is issued here.
+        try:
+            session = self.create_session(membership=membership, dummy=self.dummy)
+            nova = self.create_nova_client(session)
+        except keystone_exceptions.ClientException as e:
+            logger.exception('Failed to create nova client')
+            six.reraise(CloudBackendError, e)
+
         for flavor_id in instance_flavor_ids:
             try:
-                flavor = flavors.get(flavor_id, nova.flavors.get(flavor_id))
-            except nova_exceptions.NotFound:
-                logger.warning('Cannot find flavor with id %s', flavor_id)
+                flavor = self.flavor_cache.get(auth_url, flavor_id, nova)
+            except nova_exceptions.ClientException as e:
+                logger.exception('Failed to get flavor with id %s', flavor_id)
+                six.reraise(CloudBackendError, e)
+            if flavor is None:
                 continue
 
             ram += self.get_core_ram_size(getattr(flavor, 'ram', 0))
@@ -770,58 +1216,30 @@ class OpenStackBackend(OpenStackClient):
         membership.set_quota_usage('ram', ram)
         membership.set_quota_usage('vcpu', vcpu)
         membership.set_quota_usage('max_instances', len(instances))
-        membership.set_quota_usage('storage', sum([self.get_core_disk_size(v.size) for v in volumes + snapshots]))
+        membership.set_quota_usage('storage', sum(self.get_core_disk_size(v.size) for v in volumes + snapshots))
 
-    def pull_floating_ips(self, membership):
+    def pull_floating_ips(self, membership, snapshot=None):
         logger.debug('Pulling floating ips for membership %s', membership.id)
-        try:
-            session = self.create_session(membership=membership, dummy=self.dummy)
-            neutron = self.create_neutron_client(session)
-        except keystone_exceptions.ClientException as e:
-            logger.exception('Failed to create neutron client')
-            six.reraise(CloudBackendError, e)
+        if snapshot is None:
+            snapshot = self.get_tenant_snapshot(membership, ['floating_ips'])
 
-        try:
-            backend_floating_ips = {
-                ip['id']: ip
-                for ip in self.get_floating_ips(membership.tenant_id, neutron)
-                if ip.get('floating_ip_address') and ip.get('status')
+        backend_floating_ips = {
+            ip['id']: {
+                'status': ip['status'],
+                'address': ip['floating_ip_address'],
             }
-        except neutron_exceptions.ClientException as e:
-            logger.exception('Failed to get a list of floating IPs')
-            six.reraise(CloudBackendError, e)
+            for ip in snapshot.floating_ips
+            if ip.get('floating_ip_address') and ip.get('status')
+        }
 
         nc_floating_ips = dict(
             (ip.backend_id, ip) for ip in models.FloatingIP.objects.filter(cloud_project_membership=membership))
 
-        backend_ids = set(backend_floating_ips.keys())
-        nc_ids = set(nc_floating_ips.keys())
-
-        with transaction.atomic():
-
-            for ip_id in nc_ids - backend_ids:
-                ip = nc_floating_ips[ip_id]
-                ip.delete()
-                logger.info('Deleted stale floating IP port %s in database', ip.uuid)
-
-            for ip_id in backend_ids - nc_ids:
-                ip = backend_floating_ips[ip_id]
-                created_ip = models.FloatingIP.objects.create(
-                    cloud_project_membership=membership,
-                    status=ip['status'],
-                    backend_id=ip['id'],
-                    address=ip['floating_ip_address'],
-                )
-                logger.info('Created new floating IP port %s in database', created_ip.uuid)
+        result = reconcile(models.FloatingIP, backend_floating_ips, nc_floating_ips,
+                           defaults={'cloud_project_membership': membership})
 
-            for ip_id in nc_ids & backend_ids:
-                nc_ip = nc_floating_ips[ip_id]
-                backend_ip = backend_floating_ips[ip_id]
-                if nc_ip.status != backend_ip['status'] or nc_ip.address != backend_ip['floating_ip_address']:
-                    nc_ip.status = backend_ip['status']
-                    nc_ip.address = backend_ip['floating_ip_address']
-                    nc_ip.save()
-                    logger.info('Updated existing floating IP port %s in database', nc_ip.uuid)
+        logger.info('Pulled floating IPs of membership %s: %d created, %d updated, %d deleted',
+                    membership.pk, result.created, result.updated, result.deleted)
 
     # Statistics methods
     def get_resource_stats(self, auth_url):
@@ -870,17 +1288,68 @@ class OpenStackBackend(OpenStackClient):
 
     # Instance related methods
     def provision_instance(self, instance, backend_flavor_id, system_volume_id=None, data_volume_id=None):
+        """ Provision instance synchronously, blocking until it is booted.
+            Celery flows use the same steps but wait for statuses via BackendStatusWaiter.
+        """
         logger.info('About to boot instance %s', instance.uuid)
         try:
             membership = instance.cloud_project_membership
 
+            session = self.create_session(membership=membership, dummy=self.dummy)
+
+            nova = self.create_nova_client(session)
+            cinder = self.create_cinder_client(session)
+
+            system_volume_id, data_volume_id = self.create_instance_volumes(
+                instance, system_volume_id, data_volume_id)
+
+            if not self._wait_for_volume_status(system_volume_id, cinder, 'available', 'error'):
+                logger.error(
+                    'Failed to boot instance %s: timed out waiting for system volume %s to become available',
+                    instance.uuid, system_volume_id,
+                )
+                raise CloudBackendError('Timed out waiting for instance %s to boot' % instance.uuid)
+
+            if not self._wait_for_volume_status(data_volume_id, cinder, 'available', 'error'):
+                logger.error(
+                    'Failed to boot instance %s: timed out waiting for data volume %s to become available',
+                    instance.uuid, data_volume_id,
+                )
+                raise CloudBackendError('Timed out waiting for instance %s to boot' % instance.uuid)
+
+            server_id = self.boot_instance(instance, backend_flavor_id)
+
+            if not self._wait_for_instance_status(server_id, nova, 'ACTIVE'):
+                logger.error(
+                    'Failed to boot instance %s: timed out waiting for instance to become online',
+                    instance.uuid,
+                )
+                raise CloudBackendError('Timed out waiting for instance %s to boot' % instance.uuid)
+
+            self.finalize_instance_boot(instance)
+
+        except (CloudBackendError,
+                cinder_exceptions.ClientException,
+                nova_exceptions.ClientException) as e:
+            logger.exception('Failed to boot instance %s', instance.uuid)
+            event_logger.error('Virtual machine %s creation has failed.', instance.name,
+                               extra={'instance': instance, 'event_type': 'iaas_instance_creation_failed'})
+            six.reraise(CloudBackendError, e)
+
+    def create_instance_volumes(self, instance, system_volume_id=None, data_volume_id=None):
+        """ Create missing system and data volumes of instance.
+            Volumes are not waited for, returns a tuple of their backend ids.
+        """
+        logger.info('About to create volumes for instance %s', instance.uuid)
+        try:
+            membership = instance.cloud_project_membership
+
             image = membership.cloud.images.get(
                 template=instance.template,
             )
 
             session = self.create_session(membership=membership, dummy=self.dummy)
 
-            nova = self.create_nova_client(session)
             cinder = self.create_cinder_client(session)
             glance = self.create_glance_client(session)
             neutron = self.create_neutron_client(session)
@@ -893,6 +1362,58 @@ class OpenStackBackend(OpenStackClient):
                                  membership.internal_network_id)
                 raise CloudBackendError('Unable to find network to attach instance to')
 
+            backend_image = glance.images.get(image.backend_id)
+
+            if not system_volume_id:
+                system_volume_name = '{0}-system'.format(instance.name)
+                logger.info('Creating volume %s for instance %s', system_volume_name, instance.uuid)
+                # TODO: need to update system_volume_size as well for the data to be precise
+                size = self.get_backend_disk_size(instance.system_volume_size)
+                system_volume = cinder.volumes.create(
+                    size=size,
+                    display_name=system_volume_name,
+                    display_description='',
+                    imageRef=backend_image.id,
+                )
+                system_volume_id = system_volume.id
+                membership.add_quota_usage('storage', self.get_core_disk_size(size))
+
+            if not data_volume_id:
+                data_volume_name = '{0}-data'.format(instance.name)
+                logger.info('Creating volume %s for instance %s', data_volume_name, instance.uuid)
+                # TODO: need to update data_volume_size as well for the data to be precise
+                size = self.get_backend_disk_size(instance.data_volume_size)
+                data_volume = cinder.volumes.create(
+                    size=size,
+                    display_name=data_volume_name,
+                    display_description='',
+                )
+                data_volume_id = data_volume.id
+                membership.add_quota_usage('storage', self.get_core_disk_size(size))
+
+            instance.system_volume_id = system_volume_id
+            instance.data_volume_id = data_volume_id
+            instance.save()
+
+        except (glance_exceptions.ClientException,
+                cinder_exceptions.ClientException) as e:
+            logger.exception('Failed to create volumes for instance %s', instance.uuid)
+            six.reraise(CloudBackendError, e)
+
+        return system_volume_id, data_volume_id
+
+    def boot_instance(self, instance, backend_flavor_id):
+        """ Boot server from already available instance volumes.
+            Server is not waited for, returns its backend id.
+        """
+        logger.info('About to boot server for instance %s', instance.uuid)
+        try:
+            membership = instance.cloud_project_membership
+
+            session = self.create_session(membership=membership, dummy=self.dummy)
+
+            nova = self.create_nova_client(session)
+
             # instance key name and fingerprint are optional
             if instance.key_name:
                 safe_key_name = self.sanitize_key_name(instance.key_name)
@@ -927,48 +1448,6 @@ class OpenStackBackend(OpenStackClient):
                 backend_public_key = None
 
             backend_flavor = nova.flavors.get(backend_flavor_id)
-            backend_image = glance.images.get(image.backend_id)
-
-            if not system_volume_id:
-                system_volume_name = '{0}-system'.format(instance.name)
-                logger.info('Creating volume %s for instance %s', system_volume_name, instance.uuid)
-                # TODO: need to update system_volume_size as well for the data to be precise
-                size = self.get_backend_disk_size(instance.system_volume_size)
-                system_volume = cinder.volumes.create(
-                    size=size,
-                    display_name=system_volume_name,
-                    display_description='',
-                    imageRef=backend_image.id,
-                )
-                system_volume_id = system_volume.id
-                membership.add_quota_usage('storage', self.get_core_disk_size(size))
-
-            if not data_volume_id:
-                data_volume_name = '{0}-data'.format(instance.name)
-                logger.info('Creating volume %s for instance %s', data_volume_name, instance.uuid)
-                # TODO: need to update data_volume_size as well for the data to be precise
-                size = self.get_backend_disk_size(instance.data_volume_size)
-                data_volume = cinder.volumes.create(
-                    size=size,
-                    display_name=data_volume_name,
-                    display_description='',
-                )
-                data_volume_id = data_volume.id
-                membership.add_quota_usage('storage', self.get_core_disk_size(size))
-
-            if not self._wait_for_volume_status(system_volume_id, cinder, 'available', 'error'):
-                logger.error(
-                    'Failed to boot instance %s: timed out waiting for system volume %s to become available',
-                    instance.uuid, system_volume_id,
-                )
-                raise CloudBackendError('Timed out waiting for instance %s to boot' % instance.uuid)
-
-            if not self._wait_for_volume_status(data_volume_id, cinder, 'available', 'error'):
-                logger.error(
-                    'Failed to boot instance %s: timed out waiting for data volume %s to become available',
-                    instance.uuid, data_volume_id,
-                )
-                raise CloudBackendError('Timed out waiting for instance %s to boot' % instance.uuid)
 
             security_group_ids = instance.security_groups.values_list('security_group__backend_id', flat=True)
 
@@ -982,14 +1461,14 @@ class OpenStackBackend(OpenStackClient):
                         'destination_type': 'volume',
                         'device_type': 'disk',
                         'source_type': 'volume',
-                        'uuid': system_volume_id,
+                        'uuid': instance.system_volume_id,
                         'delete_on_termination': True,
                     },
                     {
                         'destination_type': 'volume',
                         'device_type': 'disk',
                         'source_type': 'volume',
-                        'uuid': data_volume_id,
+                        'uuid': instance.data_volume_id,
                         'delete_on_termination': True,
                     },
                     # This should have worked by creating an empty volume.
@@ -1020,28 +1499,36 @@ class OpenStackBackend(OpenStackClient):
             server = nova.servers.create(**server_create_parameters)
 
             instance.backend_id = server.id
-            instance.system_volume_id = system_volume_id
-            instance.data_volume_id = data_volume_id
             instance.save()
 
             membership.add_quota_usage('max_instances', 1)
             membership.add_quota_usage('ram', self.get_core_ram_size(backend_flavor.ram))
             membership.add_quota_usage('vcpu', backend_flavor.vcpus)
 
-            if not self._wait_for_instance_status(server.id, nova, 'ACTIVE'):
-                logger.error(
-                    'Failed to boot instance %s: timed out waiting for instance to become online',
-                    instance.uuid,
-                )
-                raise CloudBackendError('Timed out waiting for instance %s to boot' % instance.uuid)
+        except nova_exceptions.ClientException as e:
+            logger.exception('Failed to boot server for instance %s', instance.uuid)
+            six.reraise(CloudBackendError, e)
+
+        return server.id
+
+    def finalize_instance_boot(self, instance):
+        """ Fill in runtime details of instance which server has become active """
+        try:
+            membership = instance.cloud_project_membership
+
+            session = self.create_session(membership=membership, dummy=self.dummy)
+
+            nova = self.create_nova_client(session)
+
             instance.start_time = timezone.now()
             instance.save()
 
+            server = nova.servers.get(instance.backend_id)
+
             logger.debug('About to infer internal ip addresses of instance %s', instance.uuid)
             try:
-                server = nova.servers.get(server.id)
                 fixed_address = server.addresses.values()[0][0]['addr']
-            except (nova_exceptions.ClientException, KeyError, IndexError):
+            except (KeyError, IndexError):
                 logger.exception('Failed to infer internal ip addresses of instance %s',
                                  instance.uuid)
             else:
@@ -1053,13 +1540,8 @@ class OpenStackBackend(OpenStackClient):
             # Floating ips initialization
             self.push_floating_ip_to_instance(server, instance, nova)
 
-        except (glance_exceptions.ClientException,
-                cinder_exceptions.ClientException,
-                nova_exceptions.ClientException,
-                neutron_exceptions.NeutronClientException) as e:
+        except nova_exceptions.ClientException as e:
             logger.exception('Failed to boot instance %s', instance.uuid)
-            event_logger.error('Virtual machine %s creation has failed.', instance.name,
-                               extra={'instance': instance, 'event_type': 'iaas_instance_creation_failed'})
             six.reraise(CloudBackendError, e)
         else:
             logger.info('Successfully booted instance %s', instance.uuid)
@@ -1178,61 +1660,82 @@ class OpenStackBackend(OpenStackClient):
                               extra={'instance': instance, 'event_type': 'iaas_instance_restart_succeeded'})
 
     def delete_instance(self, instance):
-        logger.info('About to delete instance %s', instance.uuid)
+        """ Delete instance synchronously, blocking until server disappears.
+            Celery flows use the same steps but wait for deletion via BackendStatusWaiter.
+        """
         try:
             membership = instance.cloud_project_membership
 
             session = self.create_session(membership=membership, dummy=self.dummy)
 
             nova = self.create_nova_client(session)
-            nova.servers.delete(instance.backend_id)
+
+            self.begin_instance_deletion(instance)
 
             if not self._wait_for_instance_deletion(instance.backend_id, nova):
                 logger.info('Failed to delete instance %s', instance.uuid)
-                event_logger.error('Virtual machine %s deletion has failed.', instance.name,
-                                   extra={'instance': instance, 'event_type': 'iaas_instance_deletion_failed'})
                 raise CloudBackendError('Timed out waiting for instance %s to get deleted' % instance.uuid)
-            else:
-                membership.add_quota_usage('max_instances', -1)
-                membership.add_quota_usage('vcpu', -instance.cores)
-                membership.add_quota_usage('ram', -instance.ram)
-                membership.add_quota_usage(
-                    'storage', -(instance.system_volume_size + instance.data_volume_size))
 
-                self.release_floating_ip_from_instance(instance)
+            self.finalize_instance_deletion(instance)
 
-        except nova_exceptions.ClientException as e:
-            logger.info('Failed to delete instance %s', instance.uuid)
+        except (CloudBackendError, nova_exceptions.ClientException) as e:
             event_logger.error('Virtual machine %s deletion has failed.', instance.name,
                                extra={'instance': instance, 'event_type': 'iaas_instance_deletion_failed'})
             six.reraise(CloudBackendError, e)
-        else:
-            logger.info('Successfully deleted instance %s', instance.uuid)
-            event_logger.info('Virtual machine %s has been deleted.', instance.name,
-                              extra={'instance': instance, 'event_type': 'iaas_instance_deletion_succeeded'})
 
-    def import_instance(self, membership, instance_id, template_id=None):
+    def begin_instance_deletion(self, instance):
+        """ Request server deletion without waiting for it to disappear """
+        logger.info('About to delete instance %s', instance.uuid)
+        try:
+            membership = instance.cloud_project_membership
+
+            session = self.create_session(membership=membership, dummy=self.dummy)
+
+            nova = self.create_nova_client(session)
+            nova.servers.delete(instance.backend_id)
+        except nova_exceptions.ClientException as e:
+            logger.info('Failed to delete instance %s', instance.uuid)
+            six.reraise(CloudBackendError, e)
+
+    def finalize_instance_deletion(self, instance):
+        """ Release quotas and floating ip of instance which server has been deleted """
+        membership = instance.cloud_project_membership
+
+        membership.add_quota_usage('max_instances', -1)
+        membership.add_quota_usage('vcpu', -instance.cores)
+        membership.add_quota_usage('ram', -instance.ram)
+        membership.add_quota_usage(
+            'storage', -(instance.system_volume_size + instance.data_volume_size))
+
+        self.release_floating_ip_from_instance(instance)
+
+        logger.info('Successfully deleted instance %s', instance.uuid)
+        event_logger.info('Virtual machine %s has been deleted.', instance.name,
+                          extra={'instance': instance, 'event_type': 'iaas_instance_deletion_succeeded'})
+
+    def import_instance(self, membership, instance_id, template_id=None, snapshot=None):
+        if snapshot is None:
+            # Listing all tenant servers and volumes is too expensive for a single instance
+            snapshot = self.get_server_snapshot(membership, instance_id)
+            if snapshot is None:
+                logger.error('Requested instance with UUID %s was not found', instance_id)
+                return
+
         try:
             session = self.create_session(membership=membership, dummy=self.dummy)
             nova = self.create_nova_client(session)
-            cinder = self.create_cinder_client(session)
         except keystone_exceptions.ClientException as e:
             logger.exception('Failed to create nova client')
             six.reraise(CloudBackendError, e)
-        except cinder_exceptions.ClientException as e:
-            logger.exception('Failed to create cinder client')
-            six.reraise(CloudBackendError, e)
 
-        # Exclude instances that are booted from images
-        try:
-            backend_instance = nova.servers.get(instance_id)
-        except nova_exceptions.NotFound:
-            logger.exception('Requested instance with UUID %s was not found', instance_id)
+        backend_instance = snapshot.get_server(instance_id)
+        if backend_instance is None:
+            logger.error('Requested instance with UUID %s was not found', instance_id)
             return
 
         with transaction.atomic():
             try:
-                system_volume, data_volume = self._get_instance_volumes(nova, cinder, instance_id)
+                system_volume, data_volume = self._get_instance_volumes(snapshot, instance_id)
                 if template_id:
                     try:
                         template = models.Template.objects.get(uuid=template_id)
@@ -1242,7 +1745,7 @@ class OpenStackBackend(OpenStackClient):
                 else:
                     # try to devise from volume image metadata
                     template = self._get_instance_template(system_volume, membership, instance_id)
-                cores, ram = self._get_flavor_info(nova, backend_instance)
+                cores, ram = self._get_flavor_info(nova, backend_instance, membership.cloud.auth_url)
                 state = self._get_instance_state(backend_instance)
             except LookupError as e:
                 logger.exception('Failed to lookup instance %s information', instance_id)
@@ -1721,54 +2224,6 @@ class OpenStackBackend(OpenStackClient):
             else:
                 logger.info('Security group rule with id %s successfully created in backend', nc_rule.id)
 
-    def pull_security_group_rules(self, security_group, nova):
-        backend_security_group = nova.security_groups.get(group_id=security_group.backend_id)
-        backend_rules = [
-            self._normalize_security_group_rule(r)
-            for r in backend_security_group.rules
-        ]
-
-        # list of openstack rules, that do not exist in nc
-        nonexistent_rules = []
-        # list of openstack rules, that have wrong parameters in in nc
-        unsynchronized_rules = []
-        # list of nc rules, that have do not exist in openstack
-        extra_rules = security_group.rules.exclude(backend_id__in=[r['id'] for r in backend_rules])
-
-        with transaction.atomic():
-            for backend_rule in backend_rules:
-                try:
-                    nc_rule = security_group.rules.get(backend_id=backend_rule['id'])
-                    if not self._are_rules_equal(backend_rule, nc_rule):
-                        unsynchronized_rules.append(backend_rule)
-                except security_group.rules.model.DoesNotExist:
-                    nonexistent_rules.append(backend_rule)
-
-            # deleting extra rules
-            extra_rules.delete()
-            logger.info('Deleted stale security group rules in database')
-
-            # synchronizing unsynchronized rules
-            for backend_rule in unsynchronized_rules:
-                security_group.rules.filter(backend_id=backend_rule['id']).update(
-                    from_port=backend_rule['from_port'],
-                    to_port=backend_rule['to_port'],
-                    protocol=backend_rule['ip_protocol'],
-                    cidr=backend_rule['ip_range']['cidr'],
-                )
-            logger.info('Updated existing security group rules in database')
-
-            # creating non-existed rules
-            for backend_rule in nonexistent_rules:
-                rule = security_group.rules.create(
-                    from_port=backend_rule['from_port'],
-                    to_port=backend_rule['to_port'],
-                    protocol=backend_rule['ip_protocol'],
-                    cidr=backend_rule['ip_range']['cidr'],
-                    backend_id=backend_rule['id'],
-                )
-                logger.info('Created new security group rule %s in database', rule.id)
-
     def get_or_create_user(self, membership, keystone):
         # Try to sign in if credentials are already stored in membership
         User = get_user_model()
@@ -1928,6 +2383,31 @@ class OpenStackBackend(OpenStackClient):
     def create_backend_name(self):
         return 'nc-{0}'.format(uuid.uuid4().hex)
 
+    def get_object_statuses(self, session, object_types):
+        """ Return statuses of all tenant objects of given types as {object_type: {backend_id: status}}.
+            Each object type is fetched with a single list call.
+        """
+        ObjectTypes = models.BackendStatusWaiter.ObjectTypes
+
+        try:
+            nova = self.create_nova_client(session)
+            cinder = self.create_cinder_client(session)
+
+            list_methods = {
+                ObjectTypes.SERVER: nova.servers.list,
+                ObjectTypes.VOLUME: cinder.volumes.list,
+                ObjectTypes.SNAPSHOT: cinder.volume_snapshots.list,
+                ObjectTypes.BACKUP: cinder.backups.list,
+            }
+
+            return {
+                object_type: {obj.id: obj.status for obj in list_methods[object_type]()}
+                for object_type in object_types
+            }
+        except (nova_exceptions.ClientException, cinder_exceptions.ClientException) as e:
+            logger.exception('Failed to fetch statuses of %s', ', '.join(object_types))
+            six.reraise(CloudBackendError, e)
+
     def _wait_for_instance_status(self, server_id, nova, complete_status,
                                   error_status=None, retries=300, poll_interval=3):
         return self._wait_for_object_status(
@@ -2310,27 +2790,19 @@ class OpenStackBackend(OpenStackClient):
                 return False
         return True
 
-    def _get_instance_volumes(self, nova, cinder, backend_instance_id):
-        try:
-            attached_volume_ids = [
-                v.volumeId
-                for v in nova.volumes.get_server_volumes(backend_instance_id)
-            ]
-
-            if len(attached_volume_ids) != 2:
-                logger.info('Skipping instance %s, only instances with 2 volumes are supported, found %d',
-                            backend_instance_id, len(attached_volume_ids))
-                raise LookupError
+    def _get_instance_volumes(self, snapshot, backend_instance_id):
+        attached_volumes = snapshot.get_server_volumes(backend_instance_id)
 
-            attached_volumes = [
-                cinder.volumes.get(volume_id)
-                for volume_id in attached_volume_ids
-            ]
+        if len(attached_volumes) != 2:
+            logger.info('Skipping instance %s, only instances with 2 volumes are supported, found %d',
+                        backend_instance_id, len(attached_volumes))
+            raise LookupError
 
+        try:
             # Blessed be OpenStack developers for returning booleans as strings
             system_volume = next(v for v in attached_volumes if v.bootable == 'true')
             data_volume = next(v for v in attached_volumes if v.bootable == 'false')
-        except (cinder_exceptions.ClientException, StopIteration) as e:
+        except StopIteration as e:
             logger.info('Skipping instance %s, failed to fetch volumes', backend_instance_id)
             six.reraise(LookupError, e)
         else:
@@ -2353,11 +2825,13 @@ class OpenStackBackend(OpenStackClient):
                         backend_instance_id)
             raise LookupError
 
-    def _get_flavor_info(self, nova, backend_instance):
+    def _get_flavor_info(self, nova, backend_instance, auth_url):
         try:
             flavor_id = backend_instance.flavor['id']
-            flavor = nova.flavors.get(flavor_id)
-        except (KeyError, AttributeError):
+            flavor = self.flavor_cache.get(auth_url, flavor_id, nova)
+            if flavor is None:
+                raise LookupError
+        except (KeyError, AttributeError, LookupError):
             logger.info('Skipping instance %s, failed to infer flavor info',
                         backend_instance.id)
             raise LookupError
@@ -0,0 +1,32 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+from django.db import models, migrations
+import jsonfield.fields
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('iaas', '0033_add_validator_to_instance_user_data'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='BackendStatusWaiter',
+            fields=[
+                ('id', models.AutoField(verbose_name='ID', serialize=False, auto_created=True, primary_key=True)),
+                ('task_id', models.CharField(max_length=255)),
+                ('conditions', jsonfield.fields.JSONField(default=[])),
+                ('callbacks', jsonfield.fields.JSONField(default=[])),
+                ('errbacks', jsonfield.fields.JSONField(default=[])),
+                ('deadline', models.DateTimeField()),
+                ('created', models.DateTimeField(auto_now_add=True)),
+                ('cloud_project_membership', models.ForeignKey(related_name='+', to='iaas.CloudProjectMembership')),
+            ],
+            options={
+                'abstract': False,
+            },
+            bases=(models.Model,),
+        ),
+    ]
@@ -0,0 +1,20 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+from django.db import models, migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('iaas', '0034_backendstatuswaiter'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='cloudprojectmembership',
+            name='instances_synced_at',
+            field=models.DateTimeField(null=True, editable=False, blank=True),
+            preserve_default=True,
+        ),
+    ]
@@ -0,0 +1,26 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+from django.db import models, migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('iaas', '0035_cloudprojectmembership_instances_synced_at'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='cloudprojectmembership',
+            name='sync_duration',
+            field=models.FloatField(null=True, editable=False, blank=True),
+            preserve_default=True,
+        ),
+        migrations.AddField(
+            model_name='cloudprojectmembership',
+            name='synced_at',
+            field=models.DateTimeField(null=True, editable=False, blank=True),
+            preserve_default=True,
+        ),
+    ]
@@ -0,0 +1,32 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+from django.db import models, migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('iaas', '0036_cloudprojectmembership_sync_statistics'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='instanceslahistory',
+            name='events_synced_until',
+            field=models.IntegerField(null=True, blank=True),
+            preserve_default=True,
+        ),
+        migrations.AddField(
+            model_name='instanceslahistory',
+            name='triggerid',
+            field=models.CharField(max_length=64, blank=True),
+            preserve_default=True,
+        ),
+        migrations.AddField(
+            model_name='instanceslahistory',
+            name='value_checked_at',
+            field=models.DateTimeField(null=True, blank=True),
+            preserve_default=True,
+        ),
+    ]
@@ -11,6 +11,7 @@ from django.utils.encoding import python_2_unicode_compatible
 from django_fsm import FSMIntegerField
 from django_fsm import transition
 from model_utils.models import TimeStampedModel
+from jsonfield import JSONField
 import yaml
 
 from nodeconductor.core import models as core_models
@@ -129,6 +130,12 @@ class CloudProjectMembership(core_models.SynchronizableMixin, quotas_models.Quot
         help_text='Optional availability group. Will be used for all instances provisioned in this tenant'
     )
 
+    # High-water mark of instances synchronization, changes made after it are pulled incrementally
+    instances_synced_at = models.DateTimeField(null=True, blank=True, editable=False)
+    # Completion time and duration in seconds of the last successful synchronization
+    synced_at = models.DateTimeField(null=True, blank=True, editable=False)
+    sync_duration = models.FloatField(null=True, blank=True, editable=False)
+
     class Meta(object):
         unique_together = ('cloud', 'project')
 
@@ -519,6 +526,12 @@ class InstanceSlaHistory(models.Model):
     period = models.CharField(max_length=10)
     instance = models.ForeignKey(Instance, related_name='slas')
     value = models.DecimalField(max_digits=11, decimal_places=4, null=True, blank=True)
+    # Trigger of the instance IT service which events have been collected
+    triggerid = models.CharField(max_length=64, blank=True)
+    # Timestamp up to which trigger events have been collected
+    events_synced_until = models.IntegerField(null=True, blank=True)
+    # Time of the last SLA value taken from Zabbix rather than calculated from events
+    value_checked_at = models.DateTimeField(null=True, blank=True)
 
     def __str__(self):
         return 'SLA for %s during %s: %s' % (self.instance, self.period, self.value)
@@ -668,4 +681,36 @@ class IpMapping(core_models.UuidMixin, models.Model):
 
     public_ip = models.IPAddressField(null=False)
     private_ip = models.IPAddressField(null=False)
-    project = models.ForeignKey(structure_models.Project, related_name='ip_mappings')
\ No newline at end of file
+    project = models.ForeignKey(structure_models.Project, related_name='ip_mappings')
+
+
+@python_2_unicode_compatible
+class BackendStatusWaiter(CloudProjectMember):
+    """
+    Suspended task chain waiting for backend objects to reach given statuses.
+
+    Waiters are checked in batches by the status waiters poller, which resumes
+    the rest of the chain once all conditions are met or runs its errbacks
+    when any object errs or the deadline passes.
+    """
+    class ObjectTypes(object):
+        SERVER = 'server'
+        VOLUME = 'volume'
+        SNAPSHOT = 'snapshot'
+        BACKUP = 'backup'
+
+        CHOICES = (SERVER, VOLUME, SNAPSHOT, BACKUP)
+
+    # Pseudo status of an object that is not found on backend anymore
+    DELETED = 'DELETED'
+
+    task_id = models.CharField(max_length=255)
+    # List of [object_type, backend_id, complete_status, error_status]
+    conditions = JSONField(default=[])
+    callbacks = JSONField(default=[])
+    errbacks = JSONField(default=[])
+    deadline = models.DateTimeField()
+    created = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return 'Waiter of task %s for %s' % (self.task_id, self.conditions)
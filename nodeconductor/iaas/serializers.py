@@ -4,6 +4,7 @@ from django.core.urlresolvers import reverse
 from django.core.validators import MaxLengthValidator
 from django.db import IntegrityError
 from django.db.models import Max
+from django.utils.functional import cached_property
 from rest_framework import serializers, status, exceptions
 
 from nodeconductor.backup import serializers as backup_serializers
@@ -769,6 +770,10 @@ class ServiceSerializer(serializers.Serializer):
             period = self.context['period']
         except (KeyError, AttributeError):
             raise AttributeError('ServiceSerializer has to be initialized with `request` in context')
+        # SLA history of the period is prefetched by the service viewset
+        if hasattr(obj, 'period_slas'):
+            return obj.period_slas[0].value if obj.period_slas else None
+
         try:
             return models.InstanceSlaHistory.objects.get(instance=obj, period=period).value
         except models.InstanceSlaHistory.DoesNotExist:
@@ -782,13 +787,15 @@ class ServiceSerializer(serializers.Serializer):
 
         # TODO: this could use something similar to backup's generic model for all resources
         view_name = 'service-detail'
-        service_instance = obj
-        hyperlinked_field = serializers.HyperlinkedRelatedField(
-            view_name=view_name,
+        return self.service_url_field.get_url(obj, view_name, request, format=None)
+
+    @cached_property
+    def service_url_field(self):
+        return serializers.HyperlinkedRelatedField(
+            view_name='service-detail',
             lookup_field='uuid',
             read_only=True,
         )
-        return hyperlinked_field.get_url(service_instance, view_name, request, format=None)
 
     # TODO: this shouldn't come from this endpoint, but UI atm depends on it
     def get_project_groups(self, obj):
@@ -798,8 +805,9 @@ class ServiceSerializer(serializers.Serializer):
             raise AttributeError('ServiceSerializer has to be initialized with `request` in context')
 
         service_instance = obj
+        # List serializer re-evaluates querysets, pass prefetched groups as a list
         groups = structure_serializers.BasicProjectGroupSerializer(
-            service_instance.cloud_project_membership.project.project_groups.all(),
+            list(service_instance.cloud_project_membership.project.project_groups.all()),
             many=True,
             read_only=True,
             context={'request': request}
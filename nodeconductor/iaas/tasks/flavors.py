@@ -9,7 +9,7 @@ from nodeconductor.core.log import EventLoggerAdapter
 from nodeconductor.core.tasks import transition
 from nodeconductor.iaas.models import Instance
 from nodeconductor.iaas.tasks.openstack import (
-    openstack_create_session, nova_wait_for_server_status,
+    openstack_create_session, openstack_wait_for_status,
     nova_server_resize, nova_server_resize_confirm)
 
 
@@ -29,9 +29,9 @@ def resize_flavor(instance_uuid, flavor_uuid, transition_entity=None):
     chain(
         openstack_create_session.s(instance_uuid=instance_uuid, dummy=cloud.dummy),
         nova_server_resize.s(server_id, flavor_id),
-        nova_wait_for_server_status.s(server_id, 'VERIFY_RESIZE'),
+        openstack_wait_for_status.s('server', server_id, 'VERIFY_RESIZE', 'ERROR'),
         nova_server_resize_confirm.s(server_id),
-        nova_wait_for_server_status.s(server_id, 'SHUTOFF'),
+        openstack_wait_for_status.s('server', server_id, 'SHUTOFF', 'ERROR'),
     ).apply_async(
         link=flavor_change_succeeded.si(instance_uuid, flavor_uuid),
         link_error=flavor_change_failed.si(instance_uuid),
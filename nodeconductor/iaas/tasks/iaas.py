@@ -2,15 +2,20 @@
 from __future__ import absolute_import, unicode_literals
 
 import logging
+import time
+import zlib
+from datetime import timedelta
 
-from celery import shared_task
+from celery import shared_task, chain
+from django.utils import timezone
 
 from nodeconductor.core import models as core_models
 from nodeconductor.core.models import SynchronizationStates
-from nodeconductor.core.tasks import tracked_processing, set_state, StateChangeError
+from nodeconductor.core.tasks import tracked_processing, set_state, StateChangeError, throttle
 from nodeconductor.core.log import EventLoggerAdapter
 from nodeconductor.iaas import models
 from nodeconductor.iaas.backend import CloudBackendError
+from nodeconductor.iaas.tasks.openstack import openstack_delete_instance, openstack_finalize_instance_deletion
 from nodeconductor.monitoring.zabbix.api_client import ZabbixApiClient
 from nodeconductor.monitoring.zabbix.errors import ZabbixError
 
@@ -77,21 +82,32 @@ def schedule_deleting(instance_uuid):
         # No logging is needed since set_state already logged everything
         return
 
-    # noinspection PyBroadException
-    try:
-        instance = models.Instance.objects.get(uuid=instance_uuid)
+    chain(
+        openstack_delete_instance.si(instance_uuid),
+        openstack_finalize_instance_deletion.si(instance_uuid),
+    ).apply_async(
+        link=deletion_succeeded.si(instance_uuid),
+        link_error=deletion_failed.si(instance_uuid),
+    )
 
-        backend = instance.cloud_project_membership.cloud.get_backend()
-        backend.delete_instance(instance)
 
-        delete_zabbix_host_and_service(instance)
-    except Exception:
-        # noinspection PyProtectedMember
-        logger.exception('Failed to begin deleting Instance with id %s', instance_uuid)
-        set_state(models.Instance, instance_uuid, 'set_erred')
-    else:
-        # Actually remove the instance from the database
-        models.Instance.objects.filter(uuid=instance_uuid).delete()
+@shared_task
+def deletion_succeeded(instance_uuid):
+    instance = models.Instance.objects.get(uuid=instance_uuid)
+    delete_zabbix_host_and_service(instance)
+
+    # Actually remove the instance from the database
+    instance.delete()
+
+
+@shared_task
+def deletion_failed(instance_uuid):
+    logger.error('Failed to delete Instance with id %s', instance_uuid)
+    set_state(models.Instance, instance_uuid, 'set_erred')
+
+    instance = models.Instance.objects.get(uuid=instance_uuid)
+    event_logger.error('Virtual machine %s deletion has failed.', instance.name,
+                       extra={'instance': instance, 'event_type': 'iaas_instance_deletion_failed'})
 
 
 @shared_task
@@ -171,32 +187,114 @@ def pull_service_statistics():
 
 
 @shared_task
+def pull_cloud_membership(membership_pk):
+    membership = models.CloudProjectMembership.objects.select_related('cloud').get(pk=membership_pk)
+
+    # Limit number of memberships of one cloud synchronized at once
+    with throttle(key=membership.cloud.auth_url):
+        _pull_cloud_membership(membership_pk)
+
+
 @tracked_processing(
     models.CloudProjectMembership,
     processing_state='begin_syncing',
     desired_state='set_in_sync',
 )
-def pull_cloud_membership(membership_pk):
+def _pull_cloud_membership(membership_pk):
     membership = models.CloudProjectMembership.objects.get(pk=membership_pk)
 
+    started = time.time()
     backend = membership.cloud.get_backend()
-    backend.pull_security_groups(membership)
-    backend.pull_instances(membership)
-    backend.pull_resource_quota(membership)
-    backend.pull_resource_quota_usage(membership)
-    backend.pull_floating_ips(membership)
+    backend.pull_membership(membership)
+    duration = time.time() - started
+
+    models.CloudProjectMembership.objects.filter(pk=membership_pk).update(
+        synced_at=timezone.now(), sync_duration=duration)
+    logger.info('Pulled cloud project membership %s in %.2f seconds', membership_pk, duration)
 
 
 @shared_task
-def pull_cloud_memberships():
-    # TODO: Extract to a service
-    queryset = models.CloudProjectMembership.objects.filter(state=SynchronizationStates.IN_SYNC)
+def schedule_cloud_membership_pull(membership_pk):
+    membership = models.CloudProjectMembership.objects.get(pk=membership_pk)
+
+    if membership.state == SynchronizationStates.ERRED:
+        transition = 'schedule_recovery'
+    else:
+        transition = 'schedule_syncing'
 
+    try:
+        set_state(models.CloudProjectMembership, membership_pk, transition)
+    except StateChangeError:
+        # Membership is being processed already
+        return
+
+    pull_cloud_membership.delay(membership_pk)
+
+
+def get_cloud_membership_pull_slot(membership, interval):
+    """ Return delay in seconds of membership pull within the interval.
+        Slots are stable across runs and spread memberships evenly over the interval.
+    """
+    return (zlib.crc32(str(membership.pk)) & 0xffffffff) % int(interval)
+
+
+@shared_task
+def pull_cloud_memberships(interval=30 * 60):
+    """ Spread pulls of cloud project memberships over the interval in seconds.
+
+        Erred memberships and the ones that have not been pulled for two intervals
+        are scheduled right away, the oldest ones first. Others are delayed
+        till their slot in the interval.
+    """
+    queryset = models.CloudProjectMembership.objects.filter(
+        state__in=(SynchronizationStates.IN_SYNC, SynchronizationStates.ERRED),
+    ).exclude(tenant_id='')
+
+    overdue_threshold = timezone.now() - timedelta(seconds=2 * interval)
+    overdue, regular = [], []
     for membership in queryset.iterator():
-        membership.schedule_syncing()
-        membership.save()
+        if (membership.state == SynchronizationStates.ERRED or membership.synced_at is None or
+                membership.synced_at < overdue_threshold):
+            overdue.append(membership)
+        else:
+            regular.append(membership)
+
+    overdue.sort(key=lambda m: (m.state != SynchronizationStates.ERRED, m.synced_at is not None, m.synced_at))
+    for membership in overdue:
+        schedule_cloud_membership_pull.delay(membership.pk)
+
+    for membership in regular:
+        schedule_cloud_membership_pull.apply_async(
+            args=(membership.pk,),
+            countdown=get_cloud_membership_pull_slot(membership, interval),
+        )
 
-        pull_cloud_membership.delay(membership.pk)
+    logger.info('Scheduled pull of %d overdue and %d regular cloud project memberships',
+                len(overdue), len(regular))
+
+
+@shared_task
+def pull_cloud_membership_instances(membership_pk):
+    membership = models.CloudProjectMembership.objects.select_related('cloud').get(pk=membership_pk)
+
+    # Limit number of memberships of one cloud synchronized at once
+    with throttle(key=membership.cloud.auth_url):
+        try:
+            backend = membership.cloud.get_backend()
+            backend.pull_instances_changes(membership)
+        except CloudBackendError:
+            logger.warn('Failed to pull instances of cloud membership %s', membership_pk, exc_info=1)
+
+
+@shared_task
+def pull_cloud_memberships_instances():
+    # Memberships being fully synchronized at the moment are skipped
+    queryset = models.CloudProjectMembership.objects.filter(
+        state=SynchronizationStates.IN_SYNC,
+    ).exclude(tenant_id='')
+
+    for membership_pk in queryset.values_list('pk', flat=True):
+        pull_cloud_membership_instances.delay(membership_pk)
 
 
 @shared_task
@@ -356,13 +454,17 @@ def check_cloud_memberships_quotas():
 
 @shared_task
 def sync_instances_with_zabbix():
-    instances = models.Instance.objects.exclude(backend_id='').values_list('uuid', flat=True)
-    for instance_uuid in instances:
-        sync_instance_with_zabbix.delay(instance_uuid)
-
+    instances = models.Instance.objects.exclude(backend_id='').only('uuid', 'backend_id', 'name')
+    try:
+        changes = ZabbixApiClient().sync_instances(instances)
+    except ZabbixError as e:
+        logger.warning('Failed to synchronize instances with Zabbix. Reason: %s', e)
+        return
 
-@shared_task
-def sync_instance_with_zabbix(instance_uuid):
-    instance = models.Instance.objects.get(uuid=instance_uuid)
-    logger.debug('Synchronizing instance %s with zabbix', instance.uuid, exc_info=1)
-    create_zabbix_host_and_service(instance, warn_if_exists=False)
+    if changes is not None:
+        logger.info(
+            'Instances have been synchronized with Zabbix. Hosts created: %s, deleted: %s. '
+            'IT services created: %s, deleted: %s.',
+            len(changes['created_hosts']), len(changes['deleted_hosts']),
+            len(changes['created_services']), len(changes['deleted_services']))
+    return changes
@@ -1,21 +1,30 @@
 # -*- coding: utf-8 -*-
 from __future__ import absolute_import
 
+import logging
+
 from celery import shared_task, chain
 
+from nodeconductor.core.log import EventLoggerAdapter
 from nodeconductor.core.tasks import transition
 from nodeconductor.iaas.tasks.zabbix import zabbix_create_host_and_service
-from nodeconductor.iaas.tasks.openstack import openstack_provision_instance
+from nodeconductor.iaas.tasks.openstack import (
+    openstack_create_instance_volumes, openstack_boot_instance, openstack_finalize_instance_boot)
 from nodeconductor.iaas.models import Instance
 
 
+logger = logging.getLogger(__name__)
+event_logger = EventLoggerAdapter(logger)
+
+
 @shared_task(name='nodeconductor.iaas.provision_instance')
 @transition(Instance, 'begin_provisioning')
 def provision_instance(instance_uuid, backend_flavor_id,
                        system_volume_id=None, data_volume_id=None, transition_entity=None):
     chain(
-        openstack_provision_instance.si(
-            instance_uuid, backend_flavor_id, system_volume_id, data_volume_id),
+        openstack_create_instance_volumes.si(instance_uuid, system_volume_id, data_volume_id),
+        openstack_boot_instance.si(instance_uuid, backend_flavor_id),
+        openstack_finalize_instance_boot.si(instance_uuid),
         zabbix_create_host_and_service.si(instance_uuid),
     ).apply_async(
         link=provision_succeeded.si(instance_uuid),
@@ -32,4 +41,6 @@ def provision_succeeded(instance_uuid, transition_entity=None):
 @shared_task
 @transition(Instance, 'set_erred')
 def provision_failed(instance_uuid, transition_entity=None):
-    pass
+    instance = transition_entity
+    event_logger.error('Virtual machine %s creation has failed.', instance.name,
+                       extra={'instance': instance, 'event_type': 'iaas_instance_creation_failed'})
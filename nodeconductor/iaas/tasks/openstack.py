@@ -1,13 +1,25 @@
 # -*- coding: utf-8 -*-
 from __future__ import absolute_import
 
+import datetime
 import functools
+import itertools
+import logging
 
-from celery import shared_task
+from celery import current_app, shared_task, signature
+from django.db import transaction
+from django.utils import timezone
 
-from nodeconductor.iaas.models import Instance
+from nodeconductor.iaas.models import Instance, CloudProjectMembership, BackendStatusWaiter
+from nodeconductor.iaas.backend import CloudBackendError
 from nodeconductor.iaas.backend.openstack import OpenStackBackend
-from nodeconductor.core.tasks import throttle, retry_if_false
+from nodeconductor.core.tasks import throttle
+
+
+logger = logging.getLogger(__name__)
+
+# Default time to wait for backend objects to reach desired statuses
+STATUS_WAITER_TIMEOUT = datetime.timedelta(minutes=15)
 
 
 def track_openstack_session(task_fn):
@@ -37,22 +49,161 @@ def nova_server_resize_confirm(session, server_id):
     OpenStackBackend.create_nova_client(session).servers.confirm_resize(server_id)
 
 
-@shared_task(max_retries=300, default_retry_delay=3)
-@track_openstack_session
-@retry_if_false
-def nova_wait_for_server_status(session, server_id, status):
-    server = OpenStackBackend.create_nova_client(session).servers.get(server_id)
-    return server.status == status
+def suspend_until(task, membership, conditions, timeout=STATUS_WAITER_TIMEOUT):
+    """ Pause the chain of a bound task until backend objects reach desired statuses.
+
+        Conditions are (object_type, backend_id, complete_status, error_status) tuples,
+        complete_status may be BackendStatusWaiter.DELETED to wait for object removal.
+        The rest of the chain is resumed by openstack_poll_status_waiters with a fresh
+        session, so that no worker is blocked while backend is busy.
+    """
+    BackendStatusWaiter.objects.create(
+        cloud_project_membership=membership,
+        task_id=task.request.id,
+        conditions=[list(condition) for condition in conditions],
+        callbacks=task.request.callbacks or [],
+        errbacks=task.request.errbacks or [],
+        deadline=timezone.now() + timeout,
+    )
+    # Celery reads callbacks after the task returns, so clearing them suspends the chain
+    task.request.callbacks = None
+
+
+@shared_task(bind=True)
+def openstack_wait_for_status(self, tracked_session, object_type, backend_id,
+                              complete_status, error_status=None):
+    membership = CloudProjectMembership.objects.get(
+        cloud__auth_url=tracked_session['auth_url'], tenant_id=tracked_session['tenant_id'])
+    suspend_until(self, membership, [(object_type, backend_id, complete_status, error_status)])
+    return tracked_session
+
+
+@shared_task(bind=True, is_heavy_task=True)
+def openstack_create_instance_volumes(self, instance_uuid, system_volume_id=None, data_volume_id=None):
+    instance = Instance.objects.get(uuid=instance_uuid)
+    membership = instance.cloud_project_membership
+
+    with throttle(key=membership.cloud.auth_url):
+        backend = membership.cloud.get_backend()
+        volume_ids = backend.create_instance_volumes(instance, system_volume_id, data_volume_id)
 
+    suspend_until(self, membership, [
+        (BackendStatusWaiter.ObjectTypes.VOLUME, volume_id, 'available', 'error')
+        for volume_id in volume_ids
+    ])
 
-@shared_task(is_heavy_task=True)
-def openstack_provision_instance(instance_uuid, backend_flavor_id,
-                                 system_volume_id=None, data_volume_id=None):
+
+@shared_task(bind=True, is_heavy_task=True)
+def openstack_boot_instance(self, instance_uuid, backend_flavor_id):
     instance = Instance.objects.get(uuid=instance_uuid)
-    cloud = instance.cloud_project_membership.cloud
+    membership = instance.cloud_project_membership
+
+    with throttle(key=membership.cloud.auth_url):
+        backend = membership.cloud.get_backend()
+        server_id = backend.boot_instance(instance, backend_flavor_id)
+
+    suspend_until(self, membership, [
+        (BackendStatusWaiter.ObjectTypes.SERVER, server_id, 'ACTIVE', 'ERROR'),
+    ])
 
-    with throttle(key=cloud.auth_url):
-        # TODO: split it into a series of smaller tasks
-        backend = cloud.get_backend()
-        backend.provision_instance(
-            instance, backend_flavor_id, system_volume_id, data_volume_id)
+
+@shared_task
+def openstack_finalize_instance_boot(instance_uuid):
+    instance = Instance.objects.get(uuid=instance_uuid)
+    backend = instance.cloud_project_membership.cloud.get_backend()
+    backend.finalize_instance_boot(instance)
+
+
+@shared_task(bind=True)
+def openstack_delete_instance(self, instance_uuid):
+    instance = Instance.objects.get(uuid=instance_uuid)
+    membership = instance.cloud_project_membership
+
+    backend = membership.cloud.get_backend()
+    backend.begin_instance_deletion(instance)
+
+    suspend_until(self, membership, [
+        (BackendStatusWaiter.ObjectTypes.SERVER, instance.backend_id, BackendStatusWaiter.DELETED, 'ERROR'),
+    ])
+
+
+@shared_task
+def openstack_finalize_instance_deletion(instance_uuid):
+    instance = Instance.objects.get(uuid=instance_uuid)
+    backend = instance.cloud_project_membership.cloud.get_backend()
+    backend.finalize_instance_deletion(instance)
+
+
+def check_status_waiter(waiter, statuses):
+    """ Return True if all conditions of the waiter are met, None if it should keep waiting.
+        Raise CloudBackendError if any object has failed or the waiter has timed out.
+    """
+    pending = False
+    for object_type, backend_id, complete_status, error_status in waiter.conditions:
+        status = statuses[object_type].get(backend_id, BackendStatusWaiter.DELETED)
+        if status == complete_status:
+            continue
+        if status in (error_status, BackendStatusWaiter.DELETED):
+            raise CloudBackendError(
+                'OpenStack %s %s got status %s while waiting for %s' % (
+                    object_type, backend_id, status, complete_status))
+        pending = True
+
+    if not pending:
+        return True
+
+    if waiter.deadline < timezone.now():
+        raise CloudBackendError('Timed out waiting for %s' % waiter.conditions)
+
+
+def claim_status_waiter(waiter):
+    """ Remove the waiter unless another poller has already done it """
+    with transaction.atomic():
+        waiters = BackendStatusWaiter.objects.select_for_update().filter(pk=waiter.pk)
+        if not waiters.exists():
+            return False
+        waiters.delete()
+        return True
+
+
+@shared_task(name='nodeconductor.iaas.poll_status_waiters')
+def openstack_poll_status_waiters():
+    """ Check all suspended chains and resume those whose backend objects are ready.
+        Objects are fetched with one list call per object type per tenant.
+    """
+    waiters = (BackendStatusWaiter.objects
+               .select_related('cloud_project_membership__cloud')
+               .order_by('cloud_project_membership', 'created'))
+
+    for membership, membership_waiters in itertools.groupby(waiters, key=lambda w: w.cloud_project_membership):
+        membership_waiters = list(membership_waiters)
+        object_types = set(c[0] for waiter in membership_waiters for c in waiter.conditions)
+
+        try:
+            session = OpenStackBackend.create_session(membership=membership, dummy=membership.cloud.dummy)
+            statuses = membership.cloud.get_backend().get_object_statuses(session, object_types)
+        except CloudBackendError:
+            logger.exception('Failed to poll status waiters of cloud project membership %s', membership.pk)
+            session, statuses = None, {object_type: {} for object_type in object_types}
+
+        for waiter in membership_waiters:
+            try:
+                if session is None:
+                    # Backend is unreachable, only expire overdue waiters
+                    if waiter.deadline >= timezone.now():
+                        continue
+                    raise CloudBackendError('Timed out waiting for %s' % waiter.conditions)
+
+                if not check_status_waiter(waiter, statuses):
+                    continue
+            except CloudBackendError as e:
+                if claim_status_waiter(waiter):
+                    logger.error('Status waiter of task %s has failed: %s', waiter.task_id, e)
+                    current_app.backend.mark_as_failure(waiter.task_id, e)
+                    for errback in waiter.errbacks:
+                        signature(errback, app=current_app).apply_async((waiter.task_id,))
+            else:
+                if claim_status_waiter(waiter):
+                    logger.debug('Resuming chain of task %s', waiter.task_id)
+                    for callback in waiter.callbacks:
+                        signature(callback, app=current_app).delay(session)
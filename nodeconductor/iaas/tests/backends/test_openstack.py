@@ -1,15 +1,23 @@
 from __future__ import unicode_literals
 
 import collections
+import datetime
 import unittest
 
+from django.db import connection
 from django.test import TransactionTestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from cinderclient import exceptions as cinder_exceptions
 from keystoneclient import exceptions as keystone_exceptions
+from novaclient import exceptions as nova_exceptions
+from redis import exceptions as redis_exceptions
 import mock
 
 from nodeconductor.iaas.backend import dummy, CloudBackendError
-from nodeconductor.iaas.backend.openstack import OpenStackBackend
-from nodeconductor.iaas.models import Flavor, Instance, Image, FloatingIP
+from nodeconductor.iaas.backend.openstack import (
+    OpenStackBackend, SessionCache, FlavorCache, TenantSnapshot, RateLimiter)
+from nodeconductor.iaas.models import CloudProjectMembership, Flavor, Instance, Image, FloatingIP, SecurityGroup, SecurityGroupRule
 from nodeconductor.iaas.tests import factories
 
 NovaFlavor = collections.namedtuple(
@@ -72,6 +80,176 @@ class OpenStackBackendConversionTest(unittest.TestCase):
         self.assertEqual(core_disk, 4096)
 
 
+class FakeSession(dict):
+    def __init__(self, expires_in=datetime.timedelta(hours=1), dummy=False, **credentials):
+        super(FakeSession, self).__init__(**credentials)
+        self.expires_at = timezone.now() + expires_in
+        self.dummy = dummy
+
+    def is_valid(self, margin=datetime.timedelta(0)):
+        return self.expires_at > timezone.now() + OpenStackBackend.Session.VALIDITY_THRESHOLD + margin
+
+
+class SessionCacheTest(unittest.TestCase):
+    def setUp(self):
+        self.cache = SessionCache(size=2, expiration_margin=60)
+        self.credentials = {
+            'auth_url': 'http://keystone.example.com:5000/v2.0',
+            'username': 'test_user',
+            'password': 'test_password',
+            'tenant_id': 'test_tenant_id',
+        }
+
+    def create_session(self, **kwargs):
+        return FakeSession(**dict(self.credentials, **kwargs))
+
+    def test_session_is_reused_for_the_same_credentials(self):
+        factory = mock.Mock(return_value=self.create_session())
+
+        first = self.cache.get_or_create(self.credentials, False, factory)
+        second = self.cache.get_or_create(dict(self.credentials), False, factory)
+
+        self.assertIs(first, second)
+        self.assertEqual(factory.call_count, 1)
+        self.assertEqual(self.cache.stats()['hits'], 1)
+        self.assertEqual(self.cache.stats()['misses'], 1)
+
+    def test_session_close_to_expiration_is_not_reused(self):
+        factory = mock.Mock(side_effect=[
+            FakeSession(expires_in=datetime.timedelta(minutes=10, seconds=30), **self.credentials),
+            FakeSession(**self.credentials),
+        ])
+
+        first = self.cache.get_or_create(self.credentials, False, factory)
+        second = self.cache.get_or_create(self.credentials, False, factory)
+
+        self.assertIsNot(first, second)
+        self.assertEqual(self.cache.stats()['misses'], 2)
+
+    def test_session_is_not_reused_if_password_has_changed(self):
+        self.cache.get_or_create(self.credentials, False, self.create_session)
+
+        credentials = dict(self.credentials, password='new_password')
+        factory = mock.Mock(return_value=self.create_session(password='new_password'))
+        self.cache.get_or_create(credentials, False, factory)
+
+        self.assertEqual(factory.call_count, 1)
+
+    def test_least_recently_used_session_is_evicted(self):
+        factory = mock.Mock(side_effect=self.create_session)
+        tenants = [dict(self.credentials, tenant_id='tenant%s' % i) for i in range(3)]
+
+        self.cache.get_or_create(tenants[0], False, factory)
+        self.cache.get_or_create(tenants[1], False, factory)
+        self.cache.get_or_create(tenants[0], False, factory)
+        self.cache.get_or_create(tenants[2], False, factory)
+
+        stats = self.cache.stats()
+        self.assertEqual(stats['size'], 2)
+        self.assertEqual(stats['evictions'], 1)
+
+        # tenant1 was evicted, tenant0 is still cached
+        self.cache.get_or_create(tenants[0], False, factory)
+        self.assertEqual(factory.call_count, 3)
+        self.cache.get_or_create(tenants[1], False, factory)
+        self.assertEqual(factory.call_count, 4)
+
+
+@mock.patch('nodeconductor.iaas.backend.openstack.time.sleep')
+@mock.patch('nodeconductor.iaas.backend.openstack.current_app')
+class RateLimiterTest(unittest.TestCase):
+    def setUp(self):
+        self.limiter = RateLimiter(read={'rate': 10, 'burst': 50}, write={'rate': 2, 'burst': 5})
+        self.auth_url = 'http://keystone.example.com:5000/v2.0'
+        self.acquire = mock.Mock(return_value='0')
+
+    def given_redis(self, mocked_app):
+        mocked_app.backend.client.register_script.return_value = self.acquire
+
+    def test_reads_and_writes_have_separate_budgets(self, mocked_app, mocked_sleep):
+        self.given_redis(mocked_app)
+
+        self.limiter.wait(self.auth_url, 'GET')
+        self.limiter.wait(self.auth_url, 'POST')
+
+        self.assertEqual(self.acquire.call_args_list, [
+            mock.call(keys=[RateLimiter.get_key(self.auth_url, 'read')], args=[mock.ANY, 10, 50]),
+            mock.call(keys=[RateLimiter.get_key(self.auth_url, 'write')], args=[mock.ANY, 2, 5]),
+        ])
+        self.assertFalse(mocked_sleep.called)
+
+    def test_call_waits_for_token_and_wait_time_is_counted(self, mocked_app, mocked_sleep):
+        self.given_redis(mocked_app)
+        self.acquire.return_value = '0.5'
+
+        self.limiter.wait(self.auth_url, 'DELETE')
+
+        mocked_sleep.assert_called_once_with(0.5)
+        self.assertEqual(self.limiter.stats()[(self.auth_url, 'write')],
+                         {'calls': 1, 'delayed': 1, 'wait_time': 0.5})
+
+    def test_calls_are_not_limited_if_redis_is_unavailable(self, mocked_app, mocked_sleep):
+        self.given_redis(mocked_app)
+        self.acquire.side_effect = redis_exceptions.ConnectionError()
+
+        self.assertEqual(self.limiter.wait(self.auth_url, 'GET'), 0)
+        self.assertFalse(mocked_sleep.called)
+
+    def test_calls_are_not_limited_if_result_backend_is_not_redis(self, mocked_app, mocked_sleep):
+        mocked_app.backend = object()
+
+        self.assertEqual(self.limiter.wait(self.auth_url, 'GET'), 0)
+        self.assertFalse(mocked_sleep.called)
+
+    def test_client_requests_go_through_limiter(self, mocked_app, mocked_sleep):
+        class HTTPClient(object):
+            def request(self, url, method, **kwargs):
+                return url, method
+
+        http_client = HTTPClient()
+        with mock.patch.object(OpenStackBackend, 'rate_limiter') as mocked_limiter:
+            OpenStackBackend._limit_rate(http_client, 'request', self.auth_url)
+            response = http_client.request('http://nova.example.com/servers', 'GET', body=None)
+
+        mocked_limiter.wait.assert_called_once_with(self.auth_url, 'GET')
+        self.assertEqual(response, ('http://nova.example.com/servers', 'GET'))
+
+
+class FlavorCacheTest(unittest.TestCase):
+    def setUp(self):
+        self.cache = FlavorCache(ttl=60)
+        self.auth_url = 'http://keystone.example.com:5000/v2.0'
+        self.nova = mock.Mock()
+
+    def test_listed_flavors_are_not_requested_again(self):
+        flavor = NovaFlavor('flavor-id', 'flavor', 1, 512, 10)
+        self.cache.update(self.auth_url, [flavor])
+
+        self.assertIs(self.cache.get(self.auth_url, 'flavor-id', self.nova), flavor)
+        self.assertFalse(self.nova.flavors.get.called)
+
+    def test_missing_flavor_is_requested_only_once(self):
+        self.nova.flavors.get.side_effect = nova_exceptions.NotFound(code=404)
+
+        self.assertIsNone(self.cache.get(self.auth_url, 'deleted-id', self.nova))
+        self.assertIsNone(self.cache.get(self.auth_url, 'deleted-id', self.nova))
+        self.assertEqual(self.nova.flavors.get.call_count, 1)
+
+    def test_invalidated_flavors_are_requested_again(self):
+        self.cache.update(self.auth_url, [NovaFlavor('flavor-id', 'flavor', 1, 512, 10)])
+        self.cache.invalidate(self.auth_url)
+
+        self.cache.get(self.auth_url, 'flavor-id', self.nova)
+        self.nova.flavors.get.assert_called_once_with('flavor-id')
+
+    def test_flavors_of_other_clouds_are_kept_on_invalidation(self):
+        flavor = NovaFlavor('flavor-id', 'flavor', 1, 512, 10)
+        self.cache.update('http://other.example.com:5000/v2.0', [flavor])
+        self.cache.invalidate(self.auth_url)
+
+        self.assertIs(self.cache.get('http://other.example.com:5000/v2.0', 'flavor-id', self.nova), flavor)
+
+
 class OpenStackBackendCloudAccountApiTest(unittest.TestCase):
 
     def setUp(self):
@@ -110,7 +288,7 @@ class OpenStackBackendMembershipApiTest(unittest.TestCase):
         self.nova_client.quotas.get = mock.Mock(return_value=self.nova_quota)
         self.cinder_quota = mock.Mock(gigabytes=1000)
         self.cinder_client.quotas.get = mock.Mock(return_value=self.cinder_quota)
-        self.volumes = [mock.Mock(size=10 * i, id=i) for i in range(5)]
+        self.volumes = [mock.Mock(size=10 * i, id=i, attachments=[]) for i in range(5)]
         self.snapshots = [mock.Mock(size=10 * i, id=i) for i in range(5)]
         self.flavors = [mock.Mock(ram=i, id=i, vcpus=i) for i in range(4)]
         self.instances = [mock.Mock(flavor={'id': i}) for i in range(2)]
@@ -286,6 +464,81 @@ class OpenStackBackendSecurityGroupsTest(TransactionTestCase):
         # then
         self.backend.delete_security_group.assert_any_call(str(group1.id), self.nova_client)
 
+    def test_pull_security_groups_creates_groups_and_rules_from_list_payload(self):
+        backend_group = self._get_backend_security_group('group-id', 'group1', [
+            {'id': 'rule-id', 'from_port': 22, 'to_port': 22, 'ip_protocol': 'tcp', 'ip_range': {'cidr': '10.0.0.0/8'}},
+        ])
+        self.nova_client.security_groups.list.return_value = [backend_group]
+        # when
+        self.backend.pull_security_groups(self.membership)
+        # then
+        group = SecurityGroup.objects.get(cloud_project_membership=self.membership, backend_id='group-id')
+        self.assertEqual(group.name, 'group1')
+        rule = group.rules.get()
+        self.assertEqual((rule.backend_id, rule.from_port, rule.to_port, rule.protocol, rule.cidr),
+                         ('rule-id', 22, 22, 'tcp', '10.0.0.0/8'))
+        self.assertFalse(self.nova_client.security_groups.get.called)
+
+    def test_pull_security_groups_updates_changed_rules_and_deletes_stale_ones(self):
+        group = factories.SecurityGroupFactory(cloud_project_membership=self.membership, backend_id='group-id')
+        changed_rule = group.rules.create(backend_id='rule1', protocol='tcp', from_port=80, to_port=80, cidr='0.0.0.0/0')
+        stale_rule = group.rules.create(backend_id='rule2', protocol='tcp', from_port=22, to_port=22, cidr='0.0.0.0/0')
+        stale_group = factories.SecurityGroupFactory(cloud_project_membership=self.membership, backend_id='stale')
+        self.nova_client.security_groups.list.return_value = [
+            self._get_backend_security_group('group-id', group.name, [
+                {'id': 'rule1', 'from_port': 443, 'to_port': 443, 'ip_protocol': 'tcp', 'ip_range': {}},
+            ]),
+        ]
+        # when
+        self.backend.pull_security_groups(self.membership)
+        # then
+        changed_rule = SecurityGroupRule.objects.get(pk=changed_rule.pk)
+        self.assertEqual((changed_rule.from_port, changed_rule.to_port), (443, 443))
+        self.assertFalse(SecurityGroupRule.objects.filter(pk=stale_rule.pk).exists())
+        self.assertFalse(SecurityGroup.objects.filter(pk=stale_group.pk).exists())
+
+    def test_pull_security_groups_replaces_groups_and_rules_without_backend_id(self):
+        group = factories.SecurityGroupFactory(cloud_project_membership=self.membership, backend_id='group-id')
+        for port in (22, 80, 443):
+            group.rules.create(backend_id='', protocol='tcp', from_port=port, to_port=port, cidr='0.0.0.0/0')
+        blank_groups = factories.SecurityGroupFactory.create_batch(
+            2, cloud_project_membership=self.membership, backend_id='')
+        self.nova_client.security_groups.list.return_value = [
+            self._get_backend_security_group('group-id', group.name, [
+                {'id': 'r%s' % port, 'from_port': port, 'to_port': port, 'ip_protocol': 'tcp', 'ip_range': {}}
+                for port in (22, 80, 443)
+            ]),
+        ]
+        # when
+        self.backend.pull_security_groups(self.membership)
+        # then
+        self.assertEqual(
+            sorted(group.rules.values_list('backend_id', 'from_port')),
+            [('r22', 22), ('r443', 443), ('r80', 80)])
+        self.assertFalse(SecurityGroup.objects.filter(pk__in=[g.pk for g in blank_groups]).exists())
+
+    def test_pull_security_groups_number_of_queries_does_not_depend_on_number_of_groups(self):
+        def get_query_count(groups_count):
+            self.nova_client.security_groups.list.return_value = [
+                self._get_backend_security_group('group%s' % i, 'group%s' % i, [
+                    {'id': 'rule%s' % i, 'from_port': i, 'to_port': i, 'ip_protocol': 'tcp', 'ip_range': {}},
+                ])
+                for i in range(groups_count)
+            ]
+            with CaptureQueriesContext(connection) as context:
+                self.backend.pull_security_groups(self.membership)
+            return len(context.captured_queries)
+
+        # Initial pull of different number of groups
+        self.assertEqual(get_query_count(2), get_query_count(10))
+        # Repeated pull of unchanged groups
+        self.assertEqual(get_query_count(10), get_query_count(10))
+
+    def _get_backend_security_group(self, group_id, name, rules):
+        backend_group = mock.Mock(id=group_id, rules=rules)
+        backend_group.name = name
+        return backend_group
+
     def test_push_membership_security_groups_raises_cloud_backed_error_on_keystone_error(self):
         self.backend.create_session.side_effect = keystone_exceptions.AuthorizationFailure()
         with self.assertRaises(CloudBackendError):
@@ -381,6 +634,22 @@ class OpenStackBackendFlavorApiTest(TransactionTestCase):
 
         self.assertFalse(is_present, 'Flavor should have been deleted from the database')
 
+    def test_pull_flavors_does_not_write_unchanged_flavors(self):
+        # Given
+        self.nova_client.flavors.findall.return_value = [
+            nc_flavor_to_nova_flavor(self.flavors[0]),
+            nc_flavor_to_nova_flavor(self.flavors[1]),
+        ]
+
+        # When
+        with CaptureQueriesContext(connection) as context:
+            self.backend.pull_flavors(self.cloud_account)
+
+        # Then
+        writes = [q['sql'] for q in context.captured_queries
+                  if any(statement in q['sql'] for statement in ('INSERT INTO', 'UPDATE ', 'DELETE FROM'))]
+        self.assertEqual(writes, [], 'Unchanged flavors should not be written to the database')
+
 
 class OpenStackBackendFloatingIPTest(TransactionTestCase):
 
@@ -438,6 +707,15 @@ class OpenStackBackendFloatingIPTest(TransactionTestCase):
         self.assertEqual(reread_ip.status, backend_ip['status'])
         self.assertEqual(reread_ip.backend_id, backend_ip['id'])
 
+    def test_pull_floating_ips_creates_new_ips_with_single_query(self):
+        # when
+        with CaptureQueriesContext(connection) as context:
+            self.backend.pull_floating_ips(self.membership)
+        # then
+        inserts = [q for q in context.captured_queries if 'INSERT INTO' in q['sql']]
+        self.assertEqual(len(inserts), 1)
+        self.assertEqual(FloatingIP.objects.filter(cloud_project_membership=self.membership).count(), 3)
+
 
 class OpenStackBackendImageApiTest(TransactionTestCase):
     def setUp(self):
@@ -656,7 +934,6 @@ class OpenStackBackendInstanceApiTest(TransactionTestCase):
     def setUp(self):
         self.nova_client = mock.Mock()
         self.nova_client.servers.list.return_value = []
-        self.nova_client.servers.findall.return_value = []
 
         self.membership = factories.CloudProjectMembershipFactory()
 
@@ -669,11 +946,12 @@ class OpenStackBackendInstanceApiTest(TransactionTestCase):
 
     # Backend query tests
     def test_pull_instances_filters_out_instances_booted_from_image(self):
+        self.nova_client.servers.list.return_value = [mock.Mock(id='booted-from-image', image={'id': 'image'})]
+
         self.when()
 
-        self.nova_client.servers.findall.assert_called_once_with(
-            image='',
-        )
+        self.nova_client.servers.list.assert_called_once_with()
+        self.assertFalse(Instance.objects.filter(backend_id='booted-from-image').exists())
 
     # Deletion tests
     def test_pull_instances_errs_stable_instances_missing_in_backend(self):
@@ -708,6 +986,50 @@ class OpenStackBackendInstanceApiTest(TransactionTestCase):
         self.assertEqual(expected_instance_count, actual_instance_count,
                          'No instances should have been deleted from the database')
 
+    # Incremental synchronization tests
+    def test_pull_instances_stores_synchronization_watermark(self):
+        self.when()
+
+        membership = CloudProjectMembership.objects.get(pk=self.membership.pk)
+        self.assertIsNotNone(membership.instances_synced_at)
+
+    def test_pull_instances_changes_pulls_all_instances_on_first_run(self):
+        self.backend.pull_instances_changes(self.membership)
+
+        self.nova_client.servers.list.assert_called_once_with()
+        self.assertIsNotNone(self.membership.instances_synced_at)
+
+    def test_pull_instances_changes_requests_servers_changed_since_watermark(self):
+        self.membership.instances_synced_at = timezone.now()
+        changes_since = self.membership.instances_synced_at - OpenStackBackend.INSTANCES_CHANGES_OVERLAP
+
+        self.backend.pull_instances_changes(self.membership)
+
+        self.nova_client.servers.list.assert_called_once_with(
+            search_opts={'changes-since': changes_since.isoformat()})
+
+    def test_pull_instances_changes_keeps_instances_not_reported_by_backend(self):
+        instance = factories.InstanceFactory(state=Instance.States.ONLINE, **self._get_membership_params())
+        self.membership.instances_synced_at = timezone.now()
+
+        self.backend.pull_instances_changes(self.membership)
+
+        self.assertEqual(Instance.objects.get(pk=instance.pk).state, Instance.States.ONLINE)
+
+    def test_pull_instances_changes_updates_changed_and_errs_deleted_instances(self):
+        changed = factories.InstanceFactory(state=Instance.States.ONLINE, **self._get_membership_params())
+        deleted = factories.InstanceFactory(state=Instance.States.ONLINE, **self._get_membership_params())
+        self.nova_client.servers.list.return_value = [
+            mock.Mock(id=changed.backend_id, image='', status='SHUTOFF', key_name=changed.key_name),
+            mock.Mock(id=deleted.backend_id, image='', status='DELETED', key_name=deleted.key_name),
+        ]
+        self.membership.instances_synced_at = timezone.now()
+
+        self.backend.pull_instances_changes(self.membership)
+
+        self.assertEqual(Instance.objects.get(pk=changed.pk).state, Instance.States.OFFLINE)
+        self.assertEqual(Instance.objects.get(pk=deleted.pk).state, Instance.States.ERRED)
+
     def test_floating_ip_is_released_after_instance_deletion(self):
         instance = factories.InstanceFactory(state=Instance.States.OFFLINE)
         factories.FloatingIPFactory(
@@ -749,7 +1071,7 @@ class OpenStackBackendInstanceApiTest(TransactionTestCase):
         # Mock volume fetches
         # Mock flavor fetches
         # Mock server fetches
-        self.nova_client.servers.findall.return_value = [server]
+        self.nova_client.servers.list.return_value = [server]
         self.nova_client.servers.find.return_value = server
 
     def when(self):
@@ -762,6 +1084,105 @@ class OpenStackBackendInstanceApiTest(TransactionTestCase):
         )
 
 
+class OpenStackBackendTenantSnapshotTest(unittest.TestCase):
+    def setUp(self):
+        self.nova_client = mock.Mock()
+        self.cinder_client = mock.Mock()
+        self.neutron_client = mock.Mock()
+        self.membership = mock.Mock(tenant_id='tenant-id')
+
+        self.backend = OpenStackBackend()
+        self.backend.create_session = mock.Mock()
+        self.backend.create_nova_client = mock.Mock(return_value=self.nova_client)
+        self.backend.create_cinder_client = mock.Mock(return_value=self.cinder_client)
+        self.backend.create_neutron_client = mock.Mock(return_value=self.neutron_client)
+        self.backend.get_floating_ips = mock.Mock(return_value=['floating-ip'])
+
+    def test_get_tenant_snapshot_fetches_requested_resources_only(self):
+        server = mock.Mock(id='server')
+        volume = mock.Mock(id='volume', attachments=[])
+        self.nova_client.servers.list.return_value = [server]
+        self.cinder_client.volumes.list.return_value = [volume]
+
+        snapshot = self.backend.get_tenant_snapshot(self.membership, ['servers', 'volumes', 'floating_ips'])
+
+        self.assertEqual(snapshot.servers, (server,))
+        self.assertEqual(snapshot.volumes, (volume,))
+        self.assertEqual(snapshot.floating_ips, ('floating-ip',))
+        self.assertIsNone(snapshot.flavors)
+        self.assertFalse(self.nova_client.flavors.list.called)
+        self.backend.get_floating_ips.assert_called_once_with('tenant-id', self.neutron_client)
+
+    def test_get_server_snapshot_fetches_server_and_its_volumes_by_ids(self):
+        server = mock.Mock(id='server')
+        volume = mock.Mock(id='volume', attachments=[{'server_id': 'server'}])
+        self.nova_client.servers.get.return_value = server
+        self.nova_client.volumes.get_server_volumes.return_value = [mock.Mock(volumeId='volume')]
+        self.cinder_client.volumes.get.return_value = volume
+
+        snapshot = self.backend.get_server_snapshot(self.membership, 'server')
+
+        self.assertEqual(snapshot.get_server('server'), server)
+        self.assertEqual(snapshot.get_server_volumes('server'), (volume,))
+        self.nova_client.servers.get.assert_called_once_with('server')
+        self.cinder_client.volumes.get.assert_called_once_with('volume')
+        self.assertFalse(self.nova_client.servers.list.called)
+        self.assertFalse(self.cinder_client.volumes.list.called)
+
+    def test_get_server_snapshot_returns_none_for_missing_server(self):
+        self.nova_client.servers.get.side_effect = nova_exceptions.NotFound(404)
+
+        self.assertIsNone(self.backend.get_server_snapshot(self.membership, 'server'))
+
+    def test_get_tenant_snapshot_fetches_all_tenant_resources(self):
+        for resource_list in (self.nova_client.servers.list, self.nova_client.flavors.list,
+                              self.nova_client.security_groups.list, self.cinder_client.volumes.list,
+                              self.cinder_client.volume_snapshots.list):
+            resource_list.return_value = []
+
+        snapshot = self.backend.get_tenant_snapshot(self.membership)
+
+        for resource in TenantSnapshot.RESOURCES:
+            self.assertIsNotNone(getattr(snapshot, resource))
+        self.nova_client.quotas.get.assert_called_once_with(tenant_id='tenant-id')
+        self.cinder_client.quotas.get.assert_called_once_with(tenant_id='tenant-id')
+
+    def test_get_tenant_snapshot_raises_cloud_backend_error_on_client_error(self):
+        self.cinder_client.volumes.list.side_effect = cinder_exceptions.ClientException(code=500)
+
+        with self.assertRaises(CloudBackendError):
+            self.backend.get_tenant_snapshot(self.membership, ['servers', 'volumes'])
+
+
+class TenantSnapshotTest(unittest.TestCase):
+    def setUp(self):
+        self.server = mock.Mock(id='server', image='')
+        self.volume = mock.Mock(id='volume', attachments=[{'server_id': 'server'}])
+        self.snapshot = TenantSnapshot(
+            servers=[self.server, mock.Mock(id='booted-from-image', image={'id': 'image'})],
+            volumes=[self.volume, mock.Mock(id='detached', attachments=[])],
+        )
+
+    def test_snapshot_is_immutable(self):
+        with self.assertRaises(AttributeError):
+            self.snapshot.servers = ()
+
+    def test_resources_that_were_not_fetched_are_none(self):
+        self.assertIsNone(self.snapshot.flavors)
+
+    def test_instances_exclude_servers_booted_from_image(self):
+        self.assertEqual(self.snapshot.instances, (self.server,))
+
+    def test_objects_are_looked_up_by_id(self):
+        self.assertIs(self.snapshot.get_server('server'), self.server)
+        self.assertIs(self.snapshot.get_volume('volume'), self.volume)
+        self.assertIsNone(self.snapshot.get_server('missing'))
+
+    def test_server_volumes_are_indexed_by_attachment(self):
+        self.assertEqual(self.snapshot.get_server_volumes('server'), (self.volume,))
+        self.assertEqual(self.snapshot.get_server_volumes('booted-from-image'), ())
+
+
 class OpenStackBackendHelperApiTest(unittest.TestCase):
     def setUp(self):
         self.keystone_client = mock.Mock()
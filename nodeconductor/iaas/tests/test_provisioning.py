@@ -3,6 +3,8 @@ from __future__ import unicode_literals
 from decimal import Decimal
 
 from django.core.urlresolvers import reverse
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 from mock import patch, Mock
 from rest_framework import status
 from rest_framework import test
@@ -11,6 +13,7 @@ import yaml
 from nodeconductor.backup import models as backup_models
 from nodeconductor.backup.tests import factories as backup_factories
 from nodeconductor.core.fields import comma_separated_string_list_re as ips_regex
+from nodeconductor.core.tests import helpers
 from nodeconductor.iaas.models import Instance, CloudProjectMembership, FloatingIP
 from nodeconductor.iaas.tests import factories
 from nodeconductor.structure.models import ProjectRole, ProjectGroupRole
@@ -991,6 +994,29 @@ class InstanceListRetrieveTest(test.APITransactionTestCase):
         self.assertEqual(len(response.data['backups']), 1)
         self.assertEqual(response.data['backups'][0]['url'], backup_factories.BackupFactory.get_url(backup))
 
+    def test_user_receives_only_requested_fields_of_instances(self):
+        self.client.force_authenticate(self.staff)
+
+        response = self.client.get(factories.InstanceFactory.get_list_url(), {'field': ['uuid', 'name', 'state']})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data, [{
+            'uuid': self.instance.uuid.hex,
+            'name': self.instance.name,
+            'state': self.instance.get_state_display(),
+        }])
+
+    def test_related_objects_of_omitted_fields_are_not_fetched(self):
+        self.client.force_authenticate(self.staff)
+        backup_factories.BackupFactory(backup_source=self.instance)
+
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(factories.InstanceFactory.get_list_url(), {'field': ['uuid', 'name']})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        for query in context.captured_queries:
+            self.assertNotIn('backup', query['sql'])
+            self.assertNotIn('iaas_template', query['sql'])
+
     def test_ascending_sort_by_start_time_puts_instances_with_null_value_first(self):
         self.client.force_authenticate(self.staff)
 
@@ -1022,6 +1048,26 @@ class InstanceListRetrieveTest(test.APITransactionTestCase):
             self.assertEqual(response.data[i]['start_time'], None)
 
 
+class InstanceListQueriesCountTest(helpers.ListQueriesCountTest):
+    url = factories.InstanceFactory.get_list_url()
+
+    def get_user(self):
+        return structure_factories.UserFactory(is_staff=True)
+
+    def create_object(self):
+        project = structure_factories.ProjectFactory()
+        project.project_groups.add(structure_factories.ProjectGroupFactory())
+        instance = factories.InstanceFactory(cloud_project_membership__project=project)
+
+        security_group = factories.SecurityGroupFactory(cloud_project_membership=instance.cloud_project_membership)
+        factories.SecurityGroupRuleFactory(group=security_group)
+        factories.InstanceSecurityGroupFactory(instance=instance, security_group=security_group)
+        factories.InstanceLicenseFactory(instance=instance)
+
+        schedule = backup_factories.BackupScheduleFactory(backup_source=instance)
+        backup_factories.BackupFactory(backup_source=instance, backup_schedule=schedule)
+
+
 class InstanceUsageTest(test.APITransactionTestCase):
 
     def setUp(self):
@@ -118,6 +118,20 @@ class ServicesListRetrieveTest(test.APISimpleTestCase):
             'Service api returns more(or less) fields than expected')
 
 
+class ServicesListQueriesCountTest(helpers.ListQueriesCountTest):
+    url = _get_service_list_url()
+    query_params = {'period': '2015'}
+
+    def get_user(self):
+        return structure_factories.UserFactory(is_staff=True)
+
+    def create_object(self):
+        project = structure_factories.ProjectFactory()
+        project.project_groups.add(structure_factories.ProjectGroupFactory())
+        instance = factories.InstanceFactory(cloud_project_membership__project=project)
+        factories.InstanceSlaHistoryFactory(instance=instance, period='2015')
+
+
 class PermissionsTest(helpers.PermissionsTest):
 
     def setUp(self):
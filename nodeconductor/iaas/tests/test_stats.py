@@ -113,6 +113,24 @@ class CustomerStatsTest(test.APITransactionTestCase):
         ]
         self.assertItemsEqual(response.data, expected_result)
 
+    def test_number_of_queries_does_not_depend_on_number_of_customers(self):
+        self.client.force_authenticate(self.staff)
+        structure_factories.ProjectFactory.create_batch(3)
+
+        # page count, page of customers and one grouped count per counted model
+        with self.assertNumQueries(5):
+            response = self.client.get(self.url)
+        self.assertEqual(len(response.data), 5)
+
+    def test_statistics_are_paginated(self):
+        self.client.force_authenticate(self.staff)
+
+        response = self.client.get(self.url, {'page_size': 1, 'page': 2})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response['X-Result-Count'], '2')
+        self.assertEqual(len(response.data), 1)
+        self.assertIn(response.data[0]['name'], (self.customer.name, self.other_customer.name))
+
 
 class UsageStatsTest(test.APITransactionTestCase):
 
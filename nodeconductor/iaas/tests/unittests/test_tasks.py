@@ -0,0 +1,259 @@
+from datetime import timedelta
+
+from django.test import TestCase
+from django.utils import timezone
+from mock import MagicMock, Mock, patch
+
+from nodeconductor.core.models import SynchronizationStates
+from nodeconductor.iaas.backend import CloudBackendError
+from nodeconductor.iaas.models import BackendStatusWaiter, CloudProjectMembership
+from nodeconductor.iaas.tasks import iaas, openstack
+from nodeconductor.iaas.tests import factories
+
+
+class SuspendUntilTest(TestCase):
+
+    def test_chain_callbacks_are_moved_to_waiter(self):
+        membership = factories.CloudProjectMembershipFactory()
+        task = Mock()
+        task.request.id = 'task-id'
+        task.request.callbacks = [{'task': 'next'}]
+        task.request.errbacks = [{'task': 'failed'}]
+
+        openstack.suspend_until(task, membership, [('volume', 'volume-id', 'available', 'error')])
+
+        waiter = BackendStatusWaiter.objects.get(task_id='task-id')
+        self.assertEqual(waiter.callbacks, [{'task': 'next'}])
+        self.assertEqual(waiter.errbacks, [{'task': 'failed'}])
+        self.assertEqual(waiter.conditions, [['volume', 'volume-id', 'available', 'error']])
+        self.assertIsNone(task.request.callbacks)
+
+
+@patch('nodeconductor.iaas.tasks.openstack.signature')
+@patch('nodeconductor.iaas.tasks.openstack.current_app')
+@patch('nodeconductor.iaas.backend.openstack.OpenStackBackend.get_object_statuses')
+@patch('nodeconductor.iaas.backend.openstack.OpenStackBackend.create_session')
+class PollStatusWaitersTest(TestCase):
+
+    def setUp(self):
+        self.membership = factories.CloudProjectMembershipFactory()
+
+    def create_waiter(self, conditions, deadline=None):
+        return BackendStatusWaiter.objects.create(
+            cloud_project_membership=self.membership,
+            task_id='task-id',
+            conditions=conditions,
+            callbacks=[{'task': 'next'}],
+            errbacks=[{'task': 'failed'}],
+            deadline=deadline or timezone.now() + timedelta(minutes=5),
+        )
+
+    def test_chain_is_resumed_when_all_conditions_are_met(
+            self, mocked_session, mocked_statuses, mocked_app, mocked_signature):
+        self.create_waiter([['volume', 'v1', 'available', 'error'], ['volume', 'v2', 'available', 'error']])
+        mocked_statuses.return_value = {'volume': {'v1': 'available', 'v2': 'available'}}
+
+        openstack.openstack_poll_status_waiters()
+
+        mocked_signature.assert_called_once_with({'task': 'next'}, app=mocked_app)
+        mocked_signature.return_value.delay.assert_called_once_with(mocked_session.return_value)
+        self.assertFalse(BackendStatusWaiter.objects.exists())
+
+    def test_objects_of_one_tenant_are_fetched_with_single_call(
+            self, mocked_session, mocked_statuses, mocked_app, mocked_signature):
+        self.create_waiter([['volume', 'v1', 'available', 'error']])
+        self.create_waiter([['server', 's1', 'ACTIVE', 'ERROR']])
+        mocked_statuses.return_value = {'volume': {'v1': 'creating'}, 'server': {'s1': 'BUILD'}}
+
+        openstack.openstack_poll_status_waiters()
+
+        self.assertEqual(mocked_statuses.call_count, 1)
+        self.assertEqual(set(mocked_statuses.call_args[0][1]), {'volume', 'server'})
+
+    def test_waiter_is_kept_until_conditions_are_met(
+            self, mocked_session, mocked_statuses, mocked_app, mocked_signature):
+        self.create_waiter([['server', 's1', 'ACTIVE', 'ERROR']])
+        mocked_statuses.return_value = {'server': {'s1': 'BUILD'}}
+
+        openstack.openstack_poll_status_waiters()
+
+        self.assertFalse(mocked_signature.called)
+        self.assertTrue(BackendStatusWaiter.objects.exists())
+
+    def test_chain_is_resumed_when_object_is_deleted(
+            self, mocked_session, mocked_statuses, mocked_app, mocked_signature):
+        self.create_waiter([['server', 's1', BackendStatusWaiter.DELETED, 'ERROR']])
+        mocked_statuses.return_value = {'server': {}}
+
+        openstack.openstack_poll_status_waiters()
+
+        mocked_signature.return_value.delay.assert_called_once_with(mocked_session.return_value)
+
+    def test_errbacks_are_called_when_object_errs(
+            self, mocked_session, mocked_statuses, mocked_app, mocked_signature):
+        self.create_waiter([['server', 's1', 'ACTIVE', 'ERROR']])
+        mocked_statuses.return_value = {'server': {'s1': 'ERROR'}}
+
+        openstack.openstack_poll_status_waiters()
+
+        mocked_signature.assert_called_once_with({'task': 'failed'}, app=mocked_app)
+        mocked_signature.return_value.apply_async.assert_called_once_with(('task-id',))
+        self.assertTrue(mocked_app.backend.mark_as_failure.called)
+        self.assertFalse(BackendStatusWaiter.objects.exists())
+
+    def test_errbacks_are_called_when_waiter_times_out(
+            self, mocked_session, mocked_statuses, mocked_app, mocked_signature):
+        self.create_waiter([['server', 's1', 'ACTIVE', 'ERROR']], deadline=timezone.now() - timedelta(minutes=1))
+        mocked_statuses.return_value = {'server': {'s1': 'BUILD'}}
+
+        openstack.openstack_poll_status_waiters()
+
+        mocked_signature.return_value.apply_async.assert_called_once_with(('task-id',))
+        self.assertFalse(BackendStatusWaiter.objects.exists())
+
+    def test_waiter_is_kept_when_backend_is_unreachable(
+            self, mocked_session, mocked_statuses, mocked_app, mocked_signature):
+        self.create_waiter([['server', 's1', 'ACTIVE', 'ERROR']])
+        mocked_statuses.side_effect = CloudBackendError()
+
+        openstack.openstack_poll_status_waiters()
+
+        self.assertFalse(mocked_signature.called)
+        self.assertTrue(BackendStatusWaiter.objects.exists())
+
+
+@patch('nodeconductor.iaas.tasks.iaas.schedule_cloud_membership_pull')
+class PullCloudMembershipsTest(TestCase):
+
+    def create_membership(self, **kwargs):
+        kwargs.setdefault('state', SynchronizationStates.IN_SYNC)
+        kwargs.setdefault('synced_at', timezone.now())
+        return factories.CloudProjectMembershipFactory(tenant_id='tenant-id', **kwargs)
+
+    def test_recently_synced_memberships_are_spread_over_interval(self, mocked_schedule):
+        memberships = [self.create_membership() for _ in range(3)]
+
+        iaas.pull_cloud_memberships(interval=600)
+
+        self.assertFalse(mocked_schedule.delay.called)
+        countdowns = {}
+        for call in mocked_schedule.apply_async.call_args_list:
+            countdowns[call[1]['args'][0]] = call[1]['countdown']
+        for membership in memberships:
+            self.assertEqual(countdowns[membership.pk], iaas.get_cloud_membership_pull_slot(membership, 600))
+            self.assertTrue(0 <= countdowns[membership.pk] < 600)
+
+    def test_erred_and_outdated_memberships_are_scheduled_first(self, mocked_schedule):
+        outdated = self.create_membership(synced_at=timezone.now() - timedelta(hours=3))
+        never_synced = self.create_membership(synced_at=None)
+        erred = self.create_membership(state=SynchronizationStates.ERRED)
+
+        iaas.pull_cloud_memberships(interval=600)
+
+        scheduled = [call[0][0] for call in mocked_schedule.delay.call_args_list]
+        self.assertEqual(scheduled, [erred.pk, never_synced.pk, outdated.pk])
+        self.assertFalse(mocked_schedule.apply_async.called)
+
+    def test_memberships_without_tenant_or_being_synced_are_skipped(self, mocked_schedule):
+        factories.CloudProjectMembershipFactory(tenant_id='', state=SynchronizationStates.IN_SYNC)
+        self.create_membership(state=SynchronizationStates.SYNCING)
+
+        iaas.pull_cloud_memberships()
+
+        self.assertFalse(mocked_schedule.delay.called)
+        self.assertFalse(mocked_schedule.apply_async.called)
+
+
+@patch('nodeconductor.iaas.tasks.iaas.pull_cloud_membership')
+class ScheduleCloudMembershipPullTest(TestCase):
+
+    def test_erred_membership_is_scheduled_for_recovery(self, mocked_pull):
+        membership = factories.CloudProjectMembershipFactory(state=SynchronizationStates.ERRED)
+
+        iaas.schedule_cloud_membership_pull(membership.pk)
+
+        membership = CloudProjectMembership.objects.get(pk=membership.pk)
+        self.assertEqual(membership.state, SynchronizationStates.SYNCING_SCHEDULED)
+        mocked_pull.delay.assert_called_once_with(membership.pk)
+
+    def test_membership_being_synced_is_not_scheduled_again(self, mocked_pull):
+        membership = factories.CloudProjectMembershipFactory(state=SynchronizationStates.SYNCING)
+
+        iaas.schedule_cloud_membership_pull(membership.pk)
+
+        self.assertFalse(mocked_pull.delay.called)
+
+
+@patch('nodeconductor.iaas.tasks.iaas.throttle', MagicMock())
+@patch('nodeconductor.iaas.backend.openstack.OpenStackBackend.pull_membership')
+class PullCloudMembershipTest(TestCase):
+
+    def test_sync_duration_is_recorded(self, mocked_pull_membership):
+        membership = factories.CloudProjectMembershipFactory(state=SynchronizationStates.SYNCING_SCHEDULED)
+
+        iaas.pull_cloud_membership(membership.pk)
+
+        membership = CloudProjectMembership.objects.get(pk=membership.pk)
+        self.assertEqual(membership.state, SynchronizationStates.IN_SYNC)
+        self.assertIsNotNone(membership.synced_at)
+        self.assertGreaterEqual(membership.sync_duration, 0)
+
+    def test_failed_sync_is_not_recorded(self, mocked_pull_membership):
+        mocked_pull_membership.side_effect = CloudBackendError()
+        membership = factories.CloudProjectMembershipFactory(state=SynchronizationStates.SYNCING_SCHEDULED)
+
+        iaas.pull_cloud_membership(membership.pk)
+
+        membership = CloudProjectMembership.objects.get(pk=membership.pk)
+        self.assertEqual(membership.state, SynchronizationStates.ERRED)
+        self.assertIsNone(membership.synced_at)
+
+
+@patch('nodeconductor.iaas.tasks.iaas.pull_cloud_membership_instances')
+class PullCloudMembershipsInstancesTest(TestCase):
+
+    def test_memberships_without_tenant_or_being_synced_are_skipped(self, mocked_pull):
+        membership = factories.CloudProjectMembershipFactory(
+            tenant_id='tenant-id', state=SynchronizationStates.IN_SYNC)
+        factories.CloudProjectMembershipFactory(tenant_id='', state=SynchronizationStates.IN_SYNC)
+        factories.CloudProjectMembershipFactory(tenant_id='tenant-id', state=SynchronizationStates.SYNCING)
+
+        iaas.pull_cloud_memberships_instances()
+
+        mocked_pull.delay.assert_called_once_with(membership.pk)
+
+
+@patch('nodeconductor.iaas.tasks.iaas.throttle')
+@patch('nodeconductor.iaas.backend.openstack.OpenStackBackend.pull_instances_changes')
+class PullCloudMembershipInstancesTest(TestCase):
+
+    def test_instances_are_pulled_within_cloud_throttle(self, mocked_pull_changes, mocked_throttle):
+        membership = factories.CloudProjectMembershipFactory(tenant_id='tenant-id')
+
+        iaas.pull_cloud_membership_instances(membership.pk)
+
+        mocked_throttle.assert_called_once_with(key=membership.cloud.auth_url)
+        mocked_pull_changes.assert_called_once_with(membership)
+
+    def test_backend_errors_are_not_raised(self, mocked_pull_changes, mocked_throttle):
+        mocked_pull_changes.side_effect = CloudBackendError()
+        membership = factories.CloudProjectMembershipFactory(tenant_id='tenant-id')
+
+        iaas.pull_cloud_membership_instances(membership.pk)
+
+        self.assertEqual(mocked_pull_changes.call_count, 1)
+
+
+@patch('nodeconductor.iaas.tasks.iaas.ZabbixApiClient')
+class SyncInstancesWithZabbixTest(TestCase):
+
+    def test_instances_with_backend_id_are_reconciled_at_once(self, mocked_client):
+        instance = factories.InstanceFactory(backend_id='backend-id')
+        factories.InstanceFactory(backend_id='')
+        changes = {'created_hosts': [], 'deleted_hosts': [], 'created_services': [], 'deleted_services': []}
+        mocked_client().sync_instances.return_value = changes
+
+        self.assertEqual(iaas.sync_instances_with_zabbix(), changes)
+
+        instances = mocked_client().sync_instances.call_args[0][0]
+        self.assertEqual(list(instances), [instance])
@@ -13,6 +13,7 @@ from django_fsm import TransitionNotAllowed
 import django_filters
 from rest_framework import exceptions
 from rest_framework import filters
+from rest_framework import generics
 from rest_framework import mixins
 from rest_framework import permissions, status
 from rest_framework import serializers as rf_serializers
@@ -20,6 +21,7 @@ from rest_framework import viewsets, views
 from rest_framework.response import Response
 from rest_framework.decorators import detail_route, list_route
 
+from nodeconductor.backup import models as backup_models
 from nodeconductor.core import mixins as core_mixins
 from nodeconductor.core import models as core_models
 from nodeconductor.core import exceptions as core_exceptions
@@ -239,7 +241,8 @@ class InstanceFilter(django_filters.FilterSet):
         }
 
 
-class InstanceViewSet(mixins.CreateModelMixin,
+class InstanceViewSet(core_mixins.EagerLoadingMixin,
+                      mixins.CreateModelMixin,
                       mixins.RetrieveModelMixin,
                       mixins.UpdateModelMixin,
                       mixins.ListModelMixin,
@@ -254,6 +257,33 @@ class InstanceViewSet(mixins.CreateModelMixin,
     filter_backends = (structure_filters.GenericRoleFilter, DjangoMappingFilterBackend)
     permission_classes = (permissions.IsAuthenticated, permissions.DjangoObjectPermissions)
     filter_class = InstanceFilter
+    # Everything InstanceSerializer renders is fetched with a constant number of queries
+    select_related_fields = (
+        ('template', ('template', 'template_name', 'template_os')),
+        ('cloud_project_membership__cloud', ('cloud', 'cloud_name', 'cloud_uuid')),
+        ('cloud_project_membership__project', ('project', 'project_name', 'project_uuid')),
+        ('cloud_project_membership__project__customer', (
+            'customer', 'customer_name', 'customer_native_name', 'customer_abbreviation')),
+    )
+    prefetch_related_fields = (
+        ('cloud_project_membership__project__project_groups', ('project_groups',)),
+        (django_models.Prefetch(
+            'security_groups',
+            queryset=models.InstanceSecurityGroup.objects.select_related('security_group'),
+        ), ('security_groups',)),
+        ('security_groups__security_group__rules', ('security_groups',)),
+        (django_models.Prefetch(
+            'instance_licenses',
+            queryset=models.InstanceLicense.objects.select_related('template_license'),
+        ), ('instance_licenses',)),
+        (django_models.Prefetch(
+            'backups',
+            queryset=backup_models.Backup.objects.select_related('backup_schedule'),
+        ), ('backups',)),
+        ('backups__backup_source', ('backups',)),
+        ('backup_schedules__backups', ('backup_schedules',)),
+        ('backup_schedules__backup_source', ('backup_schedules',)),
+    )
 
     def get_queryset(self):
         queryset = super(InstanceViewSet, self).get_queryset()
@@ -751,6 +781,20 @@ class ServiceViewSet(viewsets.ReadOnlyModelViewSet):
     filter_backends = (structure_filters.GenericRoleFilter, DjangoMappingFilterBackend)
     filter_class = ServiceFilter
 
+    def get_queryset(self):
+        queryset = super(ServiceViewSet, self).get_queryset()
+        return queryset.select_related(
+            'template',
+            'cloud_project_membership__project__customer',
+        ).prefetch_related(
+            'cloud_project_membership__project__project_groups',
+            django_models.Prefetch(
+                'slas',
+                queryset=models.InstanceSlaHistory.objects.filter(period=self._get_period()),
+                to_attr='period_slas',
+            ),
+        )
+
     def _get_period(self):
         period = self.request.query_params.get('period')
         if period is None:
@@ -823,27 +867,53 @@ class ResourceStatsView(views.APIView):
         return Response(sort_dict(stats), status=status.HTTP_200_OK)
 
 
-class CustomerStatsView(views.APIView):
+class CustomerStatsView(generics.GenericAPIView):
+    """
+    Counts of projects, project groups and instances per customer visible to the user.
 
-    def get(self, request, format=None):
-        customer_statistics = []
-        customer_queryset = structure_filters.filter_queryset_for_user(Customer.objects.all(), request.user)
-        for customer in customer_queryset:
-            projects_count = structure_filters.filter_queryset_for_user(
-                Project.objects.filter(customer=customer), request.user).count()
-            project_groups_count = structure_filters.filter_queryset_for_user(
-                ProjectGroup.objects.filter(customer=customer), request.user).count()
-            instances_count = structure_filters.filter_queryset_for_user(
-                models.Instance.objects.filter(cloud_project_membership__project__customer=customer),
-                request.user).count()
-            customer_statistics.append({
-                'name': customer.name,
-                'abbreviation': customer.abbreviation,
-                'projects': projects_count,
-                'project_groups': project_groups_count,
-                'instances': instances_count,
-            })
+    Each of the counts is calculated with a single grouped query for a page of customers.
+    """
 
+    # Counted models and paths from them to the customer they are accounted to
+    counted_models = (
+        ('projects', Project, 'customer'),
+        ('project_groups', ProjectGroup, 'customer'),
+        ('instances', models.Instance, 'cloud_project_membership__project__customer'),
+    )
+
+    def get_queryset(self):
+        customers = Customer.objects.order_by('name', 'pk')
+        return structure_filters.filter_queryset_for_user(customers, self.request.user)
+
+    def get_counts(self, customers):
+        counts = {}
+        customer_ids = [customer.pk for customer in customers]
+
+        for name, model, customer_path in self.counted_models:
+            queryset = structure_filters.filter_queryset_for_user(
+                model.objects.filter(**{customer_path + '__in': customer_ids}), self.request.user)
+            counts[name] = dict(
+                queryset.order_by().values_list(customer_path).annotate(count=django_models.Count('pk')))
+
+        return counts
+
+    def get(self, request, format=None):
+        customers = self.get_queryset()
+        page = self.paginate_queryset(customers)
+        if page is not None:
+            customers = page
+
+        counts = self.get_counts(customers)
+        customer_statistics = [{
+            'name': customer.name,
+            'abbreviation': customer.abbreviation,
+            'projects': counts['projects'].get(customer.pk, 0),
+            'project_groups': counts['project_groups'].get(customer.pk, 0),
+            'instances': counts['instances'].get(customer.pk, 0),
+        } for customer in customers]
+
+        if page is not None:
+            return self.get_paginated_response(customer_statistics)
         return Response(customer_statistics, status=status.HTTP_200_OK)
 
 
@@ -0,0 +1,19 @@
+from __future__ import unicode_literals
+
+from django.db import models
+from django.utils.encoding import python_2_unicode_compatible
+
+
+@python_2_unicode_compatible
+class ZabbixHost(models.Model):
+    """
+    Persistent mapping of instance backend ids to ids of their Zabbix hosts.
+
+    Hosts are named after backend ids of instances, mapping is filled in on demand
+    and refreshed from Zabbix host group during instances synchronization.
+    """
+    backend_id = models.CharField(max_length=255, unique=True)
+    hostid = models.CharField(max_length=64)
+
+    def __str__(self):
+        return '%s: %s' % (self.backend_id, self.hostid)
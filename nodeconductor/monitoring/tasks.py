@@ -2,15 +2,25 @@ import calendar
 from decimal import Decimal
 import logging
 import datetime
+import time
 
 from celery import shared_task
+from django.utils import timezone
 
-from nodeconductor.iaas.models import Instance, InstanceSlaHistory
-from nodeconductor.monitoring.zabbix.api_client import ZabbixApiClient
+from nodeconductor.core.reconciliation import reconcile
+from nodeconductor.iaas.models import Instance, InstanceSlaHistory, InstanceSlaHistoryEvents
+from nodeconductor.monitoring.zabbix.api_client import ZABBIX_SETTINGS, ZabbixApiClient
 from nodeconductor.monitoring.zabbix.errors import ZabbixError
 
 logger = logging.getLogger(__name__)
 
+# Number of decimal places of stored SLA values
+SLA_PRECISION = Decimal('0.0001')
+# Interval of taking SLA values from Zabbix instead of calculating them from collected events
+SLA_CHECK_INTERVAL = ZABBIX_SETTINGS.get('sla_check_interval', 60 * 60)
+# Events are requested with an overlap in case they were registered by Zabbix with a delay
+EVENTS_OVERLAP = 60
+
 
 def add_months(source_date, months):
     month = source_date.month - 1 + months
@@ -43,29 +53,131 @@ def update_instance_sla(sla_type):
         Instance.States.DELETING,
         Instance.States.PROVISIONING_SCHEDULED,
         Instance.States.PROVISIONING,
-    ])
+    ]).exclude(backend_id='')
+
+    logger.debug('Updating %s SLAs for instances. Period: %s, start_time: %s, end_time: %s' % (
+        sla_type, period, start_time, end_time
+    ))
     zabbix_client = ZabbixApiClient()
-    for instance in instances:
-        try:
-            logger.debug('Updating %s SLAs for instance %s. Period: %s, start_time: %s, end_time: %s' % (
-                sla_type, instance, period, start_time, end_time
-            ))
-            current_sla, events = zabbix_client.get_current_service_sla(instance, start_time=start_time, end_time=end_time)
-            entry, _ = InstanceSlaHistory.objects.get_or_create(
-                instance=instance,
-                period=period
-            )
-            entry.value = Decimal(current_sla)
-            entry.save()
-
-            # update connected events
-            for event in events:
-                event_state = 'U' if int(event['value']) == 0 else 'D'
-                entry.events.get_or_create(
-                    timestamp=int(event['timestamp']),
-                    state=event_state
-                )
-        except ZabbixError as e:
-            logger.warning('Zabbix error when updating current SLA values for %s. Reason: %s' % (instance, e))
-        except Exception as e:
-            logger.warning('Failed to update current SLA values for %s. Reason: %s' % (instance, e))
+    try:
+        services = zabbix_client.get_instances_services(instances)
+        if not services:
+            return
+
+        history = dict((entry.instance_id, entry) for entry in InstanceSlaHistory.objects.filter(
+            period=period, instance_id__in=[instance.pk for instance in services]))
+        synced_until = min(int(time.time()), end_time)
+
+        # Request only events newer than the ones collected by previous runs
+        time_from_by_trigger = {}
+        checked_service_ids = []
+        for instance, service in services.items():
+            entry = history.get(instance.pk)
+            if entry is not None and entry.triggerid == service['triggerid'] and entry.events_synced_until:
+                time_from = max(start_time, entry.events_synced_until - EVENTS_OVERLAP)
+            else:
+                time_from = start_time
+            time_from_by_trigger[service['triggerid']] = time_from
+
+            if is_sla_check_due(entry, service):
+                checked_service_ids.append(service['serviceid'])
+
+        events = zabbix_client.get_triggers_events(time_from_by_trigger, synced_until)
+        if events is None:
+            # Error was suppressed by the client, events of the window have to be requested again by the next run
+            logger.warning('Zabbix trigger events were not received, SLA values of period %s are not updated', period)
+            return
+        slas = zabbix_client.get_services_sla_values(checked_service_ids, start_time, end_time) or {}
+    except ZabbixError as e:
+        logger.warning('Zabbix error when updating current SLA values. Reason: %s' % e)
+        return
+
+    save_instance_slas(period, start_time, end_time, synced_until, services, history, events, slas)
+
+
+def is_sla_check_due(entry, service):
+    """ Whether SLA value has to be taken from Zabbix as it cannot be calculated from collected events """
+    if entry is None or entry.value is None or entry.value_checked_at is None:
+        return True
+    if entry.triggerid != service['triggerid']:
+        return True
+    return timezone.now() - entry.value_checked_at >= datetime.timedelta(seconds=SLA_CHECK_INTERVAL)
+
+
+def calculate_sla(events, start_time, end_time, now):
+    """
+    Percentage of the period instance has been up according to its trigger events.
+
+    :param events: [(timestamp, state), ...] where state is 'U' for up and 'D' for down
+    Like Zabbix does, the rest of the period is considered to be up. State before the first
+    event is unknown, instance is considered to be down only if the first event is a recovery.
+    """
+    events = sorted((timestamp, state) for timestamp, state in events if start_time <= timestamp < now)
+    state = 'D' if events and events[0][1] == 'U' else 'U'
+    state_since = start_time
+
+    downtime = 0
+    for timestamp, next_state in events:
+        if state == 'D':
+            downtime += timestamp - state_since
+        state, state_since = next_state, timestamp
+    if state == 'D':
+        downtime += now - state_since
+
+    return 100 * (1 - Decimal(downtime) / (end_time - start_time))
+
+
+def save_instance_slas(period, start_time, end_time, synced_until, services, history, events, slas):
+    """
+    Store SLA values and new events of instances for a period with bulk writes.
+
+    SLA values are taken from Zabbix for services present in slas,
+    for the rest they are calculated from all collected events of the period.
+    """
+    services = dict((instance.pk, service) for instance, service in services.items())
+
+    # Events collected for a previous trigger of an instance are not relevant anymore
+    reset_history_ids = [entry.pk for instance_id, entry in history.items()
+                         if entry.triggerid != services[instance_id]['triggerid']]
+    if reset_history_ids:
+        InstanceSlaHistoryEvents.objects.filter(instance_id__in=reset_history_ids).delete()
+
+    known_events = {}
+    for history_id, timestamp, state in InstanceSlaHistoryEvents.objects.filter(
+            instance_id__in=[entry.pk for entry in history.values()]).values_list('instance_id', 'timestamp', 'state'):
+        known_events.setdefault(history_id, set()).add((timestamp, state))
+
+    backend_values = {}
+    new_events = {}
+    for instance_id, service in services.items():
+        entry = history.get(instance_id)
+        instance_events = known_events.get(entry.pk, set()) if entry is not None else set()
+        new_events[instance_id] = set(
+            (int(event['timestamp']), 'U' if int(event['value']) == 0 else 'D')
+            for event in events.get(service['triggerid'], [])
+        ) - instance_events
+
+        values = {'triggerid': service['triggerid'], 'events_synced_until': synced_until}
+        if service['serviceid'] in slas:
+            values['value'] = Decimal(slas[service['serviceid']]).quantize(SLA_PRECISION)
+            values['value_checked_at'] = timezone.now()
+        else:
+            sla = calculate_sla(instance_events | new_events[instance_id], start_time, end_time, synced_until)
+            values['value'] = sla.quantize(SLA_PRECISION)
+        backend_values[instance_id] = values
+
+    reconcile(
+        InstanceSlaHistory,
+        backend_values=backend_values,
+        db_objects=history,
+        key_field='instance_id',
+        defaults={'period': period},
+        delete_stale=False,
+    )
+
+    history_ids = dict(InstanceSlaHistory.objects.filter(
+        period=period, instance_id__in=services.keys()).values_list('instance_id', 'pk'))
+    InstanceSlaHistoryEvents.objects.bulk_create(
+        InstanceSlaHistoryEvents(instance_id=history_ids[instance_id], timestamp=timestamp, state=state)
+        for instance_id, instance_events in new_events.items()
+        for timestamp, state in instance_events)
@@ -0,0 +1,115 @@
+from __future__ import unicode_literals
+
+from datetime import timedelta
+from decimal import Decimal
+
+from django.test import TestCase
+from django.utils import timezone
+from mock import patch
+
+from nodeconductor.iaas.models import InstanceSlaHistory, InstanceSlaHistoryEvents
+from nodeconductor.iaas.tests import factories
+from nodeconductor.monitoring import tasks
+
+
+@patch('nodeconductor.monitoring.tasks.ZabbixApiClient')
+class UpdateInstanceSlaTest(TestCase):
+
+    def setUp(self):
+        self.instances = factories.InstanceFactory.create_batch(3)
+        self.events = [{'timestamp': '100', 'value': '1'}, {'timestamp': '200', 'value': '0'}]
+
+    def given_zabbix(self, mocked_client):
+        client = mocked_client()
+        client.get_instances_services.return_value = dict(
+            (instance, {'serviceid': str(instance.pk), 'triggerid': 't%s' % instance.pk, 'name': 'service'})
+            for instance in self.instances)
+        client.get_triggers_events.side_effect = lambda time_from_by_trigger, time_till: dict(
+            (trigger_id, self.events) for trigger_id in time_from_by_trigger)
+        client.get_services_sla_values.side_effect = lambda service_ids, start, end: dict(
+            (service_id, 99.5) for service_id in service_ids)
+        return client
+
+    def test_slas_are_fetched_in_bulk_and_stored_with_constant_number_of_queries(self, mocked_client):
+        client = self.given_zabbix(mocked_client)
+
+        # history lookup, history insert within a savepoint, history ids and events insert
+        with self.assertNumQueries(6):
+            tasks.update_instance_sla('monthly')
+
+        self.assertEqual(client.get_services_sla_values.call_count, 1)
+        for instance in self.instances:
+            entry = InstanceSlaHistory.objects.get(instance=instance)
+            self.assertEqual(entry.value, Decimal('99.5'))
+            self.assertEqual(entry.triggerid, 't%s' % instance.pk)
+            self.assertIsNotNone(entry.value_checked_at)
+            self.assertItemsEqual(entry.events.values_list('timestamp', 'state'), [(100, 'D'), (200, 'U')])
+
+    def test_only_events_newer_than_watermark_are_requested(self, mocked_client):
+        client = self.given_zabbix(mocked_client)
+        tasks.update_instance_sla('yearly')
+        synced_until = InstanceSlaHistory.objects.first().events_synced_until
+
+        tasks.update_instance_sla('yearly')
+
+        time_from_by_trigger = client.get_triggers_events.call_args[0][0]
+        self.assertEqual(set(time_from_by_trigger.values()), {synced_until - tasks.EVENTS_OVERLAP})
+        self.assertEqual(InstanceSlaHistory.objects.count(), 3)
+        self.assertEqual(InstanceSlaHistoryEvents.objects.count(), 6)
+
+    def test_watermark_is_kept_if_events_are_not_received(self, mocked_client):
+        client = self.given_zabbix(mocked_client)
+        tasks.update_instance_sla('yearly')
+        synced_until = InstanceSlaHistory.objects.first().events_synced_until - 1000
+        InstanceSlaHistory.objects.update(events_synced_until=synced_until, value=Decimal('50'))
+
+        # Zabbix client returns None on errors if it is configured to fail silently
+        client.get_triggers_events.side_effect = None
+        client.get_triggers_events.return_value = None
+        tasks.update_instance_sla('yearly')
+
+        for entry in InstanceSlaHistory.objects.all():
+            self.assertEqual(entry.events_synced_until, synced_until)
+            self.assertEqual(entry.value, Decimal('50'))
+
+        client = self.given_zabbix(mocked_client)
+        tasks.update_instance_sla('yearly')
+
+        time_from_by_trigger = client.get_triggers_events.call_args[0][0]
+        self.assertEqual(set(time_from_by_trigger.values()), {synced_until - tasks.EVENTS_OVERLAP})
+
+    def test_sla_is_calculated_from_events_between_checks(self, mocked_client):
+        client = self.given_zabbix(mocked_client)
+        tasks.update_instance_sla('monthly')
+        client.get_services_sla_values.reset_mock()
+
+        tasks.update_instance_sla('monthly')
+
+        client.get_services_sla_values.assert_called_once_with([], *client.get_services_sla_values.call_args[0][1:])
+        self.assertNotEqual(InstanceSlaHistory.objects.first().value, Decimal('99.5'))
+
+    def test_sla_is_checked_in_zabbix_once_check_interval_passes(self, mocked_client):
+        client = self.given_zabbix(mocked_client)
+        tasks.update_instance_sla('monthly')
+        InstanceSlaHistory.objects.update(
+            value_checked_at=timezone.now() - timedelta(seconds=tasks.SLA_CHECK_INTERVAL))
+
+        tasks.update_instance_sla('monthly')
+
+        checked_service_ids = client.get_services_sla_values.call_args[0][0]
+        self.assertEqual(len(checked_service_ids), 3)
+
+
+class CalculateSlaTest(TestCase):
+
+    def test_downtime_is_subtracted_from_period(self):
+        events = [(10, 'D'), (30, 'U'), (60, 'D')]
+
+        # down during 10-30 and 60-80 out of 0-200 period
+        self.assertEqual(tasks.calculate_sla(events, 0, 200, 80), 80)
+
+    def test_instance_is_down_before_first_recovery(self):
+        self.assertEqual(tasks.calculate_sla([(50, 'U')], 0, 100, 100), 50)
+
+    def test_instance_without_events_is_up(self):
+        self.assertEqual(tasks.calculate_sla([], 0, 100, 100), 100)
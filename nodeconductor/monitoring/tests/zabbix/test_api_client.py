@@ -1,12 +1,15 @@
 from __future__ import unicode_literals
 
+import time
 import unittest
 
 from django.conf import settings
-from mock import Mock
-from pyzabbix import ZabbixAPIException
+from django.test import TestCase
+from mock import Mock, patch
+from pyzabbix import ZabbixAPI, ZabbixAPIException
 
-from nodeconductor.monitoring.zabbix.api_client import ZabbixApiClient
+from nodeconductor.monitoring.models import ZabbixHost
+from nodeconductor.monitoring.zabbix.api_client import PooledZabbixAPI, ZabbixApiClient, ZabbixApiPool
 from nodeconductor.monitoring.zabbix.errors import ZabbixError
 
 
@@ -229,3 +232,227 @@ class ZabbixPublicApiTest(unittest.TestCase):
     def test_get_host_raises_error_if_host_does_not_exist(self):
         self.api.host.get.return_value = []
         self.assertRaises(ZabbixError, lambda: self.zabbix_client.get_host(self.instance))
+
+
+class ZabbixHostIdsTest(TestCase):
+
+    def setUp(self):
+        self.api = get_mocked_zabbix_api()
+        self.zabbix_client = ZabbixApiClient()
+        self.zabbix_client.get_zabbix_api = Mock(return_value=self.api)
+
+        self.instances = [Mock(backend_id='backend-id-%s' % i) for i in range(3)]
+
+    def test_hosts_missing_from_mapping_are_resolved_with_one_call(self):
+        ZabbixHost.objects.create(backend_id='backend-id-0', hostid='10')
+        self.api.host.get.return_value = [
+            {'host': 'backend-id-1', 'hostid': '11'},
+            {'host': 'backend-id-2', 'hostid': '12'},
+        ]
+
+        host_ids = self.zabbix_client.get_host_ids(self.instances)
+
+        self.assertEqual(host_ids, {'backend-id-0': '10', 'backend-id-1': '11', 'backend-id-2': '12'})
+        self.assertEqual(self.api.host.get.call_count, 1)
+        requested_names = self.api.host.get.call_args[1]['filter']['host']
+        self.assertItemsEqual(requested_names, ['backend-id-1', 'backend-id-2'])
+        self.assertEqual(ZabbixHost.objects.count(), 3)
+
+    def test_api_is_not_called_when_all_hosts_are_mapped(self):
+        for i, instance in enumerate(self.instances):
+            ZabbixHost.objects.create(backend_id=instance.backend_id, hostid=str(i))
+
+        self.zabbix_client.get_host_ids(self.instances)
+
+        self.assertFalse(self.zabbix_client.get_zabbix_api.called)
+
+
+class ZabbixSyncInstancesTest(TestCase):
+
+    def setUp(self):
+        self.api = get_mocked_zabbix_api()
+        self.zabbix_client = ZabbixApiClient()
+        self.zabbix_client.get_zabbix_api = Mock(return_value=self.api)
+
+        self.instance = Mock(backend_id='backend-id')
+        self.instance.name = 'instance'
+        self.new_instance = Mock(backend_id='new-backend-id')
+        self.new_instance.name = 'new instance'
+
+        self.api.host.get.side_effect = [
+            [
+                {'host': 'backend-id', 'hostid': '1', 'triggers': [{'triggerid': '101'}]},
+                {'host': 'deleted-backend-id', 'hostid': '2', 'triggers': [{'triggerid': '102'}]},
+            ],
+            [],
+        ]
+        self.api.host.create.return_value = {'hostids': ['3']}
+        self.api.service.get.return_value = [
+            {'name': 'Availability of backend-id', 'serviceid': '10', 'triggerid': '101'},
+            {'name': 'Availability of deleted-backend-id', 'serviceid': '20', 'triggerid': '102'},
+            {'name': 'Unrelated service', 'serviceid': '30', 'triggerid': '103'},
+            {'name': 'Availability of other-deployment-backend-id', 'serviceid': '40', 'triggerid': '104'},
+        ]
+        self.api.trigger.get.return_value = [{'triggerid': '100', 'hosts': [{'hostid': '3'}]}]
+
+    def sync(self):
+        return self.zabbix_client.sync_instances([self.instance, self.new_instance])
+
+    def test_missing_hosts_and_services_are_created_in_batches(self):
+        changes = self.sync()
+
+        self.api.host.create.assert_called_once_with(self.zabbix_client.get_host_parameters(self.new_instance))
+        self.api.trigger.get.assert_called_once_with(
+            hostids=['3'], output=['triggerid'], selectHosts=['hostid'])
+        service_parameters = self.api.service.create.call_args[0]
+        self.assertEqual(len(service_parameters), 1)
+        self.assertEqual(service_parameters[0]['name'], 'Availability of new-backend-id')
+        self.assertEqual(service_parameters[0]['triggerid'], '100')
+        self.assertEqual(changes['created_hosts'], ['new-backend-id'])
+        self.assertEqual(changes['created_services'], ['Availability of new-backend-id'])
+
+    def test_hosts_and_services_without_instances_are_deleted(self):
+        changes = self.sync()
+
+        self.api.host.delete.assert_called_once_with('2')
+        self.api.service.delete.assert_called_once_with('20')
+        self.assertEqual(changes['deleted_hosts'], ['deleted-backend-id'])
+        self.assertEqual(changes['deleted_services'], ['Availability of deleted-backend-id'])
+
+    def test_services_of_hosts_outside_of_group_are_not_deleted(self):
+        self.sync()
+
+        deleted_service_ids = self.api.service.delete.call_args[0]
+        self.assertNotIn('40', deleted_service_ids)
+
+    def test_nothing_is_changed_for_synchronized_instances(self):
+        self.api.host.get.side_effect = [[{'host': 'backend-id', 'hostid': '1', 'triggers': [{'triggerid': '101'}]}]]
+        self.api.service.get.return_value = [
+            {'name': 'Availability of backend-id', 'serviceid': '10', 'triggerid': '101'}]
+
+        self.zabbix_client.sync_instances([self.instance])
+
+        self.assertEqual(self.api.host.get.call_count, 1)
+        self.assertFalse(self.api.host.create.called)
+        self.assertFalse(self.api.host.delete.called)
+        self.assertFalse(self.api.service.create.called)
+        self.assertFalse(self.api.service.delete.called)
+
+    def test_hosts_mapping_is_replaced_with_reconciled_hosts(self):
+        ZabbixHost.objects.create(backend_id='deleted-backend-id', hostid='2')
+
+        self.sync()
+
+        self.assertItemsEqual(
+            ZabbixHost.objects.values_list('backend_id', 'hostid'),
+            [('backend-id', '1'), ('new-backend-id', '3')])
+
+
+class ZabbixServicesSlaTest(unittest.TestCase):
+
+    def setUp(self):
+        self.api = get_mocked_zabbix_api()
+        self.zabbix_client = ZabbixApiClient()
+        self.zabbix_client.get_zabbix_api = Mock(return_value=self.api)
+        self.instances = [Mock(backend_id='backend-id-%s' % i) for i in range(3)]
+
+    def test_services_of_all_instances_are_fetched_at_once(self):
+        self.api.service.get.return_value = [
+            {'name': 'Availability of backend-id-0', 'serviceid': '10', 'triggerid': '100'},
+            {'name': 'Availability of backend-id-1', 'serviceid': '11', 'triggerid': '101'},
+        ]
+
+        services = self.zabbix_client.get_instances_services(self.instances)
+
+        self.assertEqual(services, {
+            self.instances[0]: {'name': 'Availability of backend-id-0', 'serviceid': '10', 'triggerid': '100'},
+            self.instances[1]: {'name': 'Availability of backend-id-1', 'serviceid': '11', 'triggerid': '101'},
+        })
+        self.assertEqual(self.api.service.get.call_count, 1)
+
+    def test_sla_values_of_all_services_are_fetched_at_once(self):
+        self.api.service.getsla.return_value = {
+            '10': {'sla': [{'sla': 99.0}]},
+            '11': {'sla': [{'sla': 98.0}]},
+        }
+
+        slas = self.zabbix_client.get_services_sla_values(['10', '11', '12'], 1, 10)
+
+        self.assertEqual(slas, {'10': 99.0, '11': 98.0})
+        self.assertItemsEqual(self.api.service.getsla.call_args[1]['serviceids'], ['10', '11', '12'])
+
+    def test_events_of_triggers_with_same_start_time_are_fetched_at_once(self):
+        self.api.event.get.return_value = [{'objectid': '101', 'clock': '5', 'value': '1'}]
+
+        events = self.zabbix_client.get_triggers_events({'100': 1, '101': 1}, 10)
+
+        self.assertEqual(events, {'101': [{'timestamp': '5', 'value': '1'}]})
+        self.assertItemsEqual(self.api.event.get.call_args[1]['objectids'], ['100', '101'])
+        self.assertEqual(self.api.event.get.call_count, 1)
+
+
+@patch('nodeconductor.monitoring.zabbix.api_client.PooledZabbixAPI')
+class ZabbixApiPoolTest(unittest.TestCase):
+
+    def setUp(self):
+        self.pool = ZabbixApiPool(size=2, lifetime=60)
+
+    def get_api(self):
+        return self.pool.get('http://zabbix', 'admin', 'secret')
+
+    def test_handles_are_reused_once_pool_is_full(self, mocked_api):
+        mocked_api.side_effect = lambda *args: Mock(created_at=time.time())
+
+        handles = set(self.get_api() for _ in range(5))
+
+        self.assertEqual(len(handles), 2)
+        self.assertEqual(mocked_api.call_count, 2)
+
+    def test_expired_handles_are_replaced(self, mocked_api):
+        mocked_api.side_effect = lambda *args: Mock(created_at=time.time() - 120)
+
+        handles = [self.get_api() for _ in range(3)]
+
+        self.assertEqual(mocked_api.call_count, 3)
+        for api in handles[:2]:
+            api.session.close.assert_called_once_with()
+
+    def test_handles_are_logged_in_without_holding_pool_lock(self, mocked_api):
+        def create_api(*args):
+            self.assertTrue(self.pool._lock.acquire(False), 'Pool lock is held while logging in')
+            self.pool._lock.release()
+            return Mock(created_at=time.time())
+        mocked_api.side_effect = create_api
+
+        self.get_api()
+
+        self.assertEqual(mocked_api.call_count, 1)
+
+
+@patch.object(ZabbixAPI, 'do_request')
+class PooledZabbixAPITest(unittest.TestCase):
+
+    def test_expired_session_is_reauthenticated(self, mocked_request):
+        mocked_request.side_effect = [
+            {'result': 'first-token'},
+            ZabbixAPIException('Error -32602: Invalid params., Session terminated, re-login, please.', -32602),
+            {'result': 'second-token'},
+            {'result': [{'hostid': '1'}]},
+        ]
+
+        api = PooledZabbixAPI('http://zabbix', 'admin', 'secret')
+
+        self.assertEqual(api.host.get(), [{'hostid': '1'}])
+        self.assertEqual(api.auth, 'second-token')
+
+    def test_other_errors_are_raised(self, mocked_request):
+        mocked_request.side_effect = [
+            {'result': 'token'},
+            ZabbixAPIException('Error -32500: No permissions.', -32500),
+        ]
+
+        api = PooledZabbixAPI('http://zabbix', 'admin', 'secret')
+
+        with self.assertRaises(ZabbixAPIException):
+            api.host.get()
+        self.assertEqual(mocked_request.call_count, 2)
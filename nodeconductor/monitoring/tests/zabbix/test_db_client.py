@@ -3,7 +3,7 @@ from __future__ import unicode_literals
 import unittest
 
 from django.db import DatabaseError
-from mock import Mock
+from mock import MagicMock, Mock, patch
 
 from nodeconductor.monitoring.zabbix.db_client import ZabbixDBClient
 
@@ -12,7 +12,7 @@ class ZabbixPublicApiTest(unittest.TestCase):
 
     def setUp(self):
         self.client = ZabbixDBClient()
-        self.client.zabbix_api_client.get_host = Mock(return_value={'hostid': 1})
+        self.client.zabbix_api_client.get_host_ids = Mock(return_value={'backend-id': '1'})
 
     def test_get_item_stats_returns_time_segments(self):
         self.client.get_item_time_and_value_list = Mock(
@@ -20,7 +20,7 @@ class ZabbixPublicApiTest(unittest.TestCase):
         start_timestamp = 1415912624L
         end_timestamp = 1415912630L
         segments_count = 3
-        instance = object
+        instance = Mock(backend_id='backend-id')
         item_key = 'cpu'
 
         segment_list = self.client.get_item_stats([instance], item_key, start_timestamp, end_timestamp, segments_count)
@@ -31,9 +31,40 @@ class ZabbixPublicApiTest(unittest.TestCase):
             {'from': 1415912628L, 'to': 1415912630L, 'value': 1},
         ]
         self.assertEquals(segment_list, expected_segment_list)
-        self.client.zabbix_api_client.get_host.assert_called_once_with(instance)
+        self.client.zabbix_api_client.get_host_ids.assert_called_once_with([instance])
+        self.client.get_item_time_and_value_list.assert_called_once_with(
+            [1], ['kvm.vm.cpu.util'], 'history', start_timestamp, end_timestamp, segments_count, False)
 
     def test_get_item_stats_returns_empty_list_on_db_error(self):
         self.client.get_item_time_and_value_list = Mock(side_effect=DatabaseError)
 
         self.assertEqual(self.client.get_item_stats([], 'cpu', 1, 10, 2), [])
+
+
+@patch('nodeconductor.monitoring.zabbix.db_client.connections')
+class ZabbixItemQueryTest(unittest.TestCase):
+
+    def setUp(self):
+        self.client = ZabbixDBClient()
+        self.cursor = MagicMock()
+        self.cursor.fetchall.return_value = [(0, 10), (2, 30)]
+
+    def get_executed_query(self, mocked_connections, *args):
+        mocked_connections.__getitem__().cursor().__enter__.return_value = self.cursor
+        time_and_value_list = self.client.get_item_time_and_value_list([1, 2], ['key'], 'history_uint', *args)
+        query, parameters = self.cursor.execute.call_args[0]
+        return time_and_value_list, query, parameters
+
+    def test_values_are_aggregated_into_segments_by_database(self, mocked_connections):
+        time_and_value_list, query, parameters = self.get_executed_query(mocked_connections, 1000, 1600, 3, False)
+
+        self.assertIn('zabbix.history_uint hi', query)
+        self.assertIn('GROUP BY segment', query)
+        self.assertEqual(parameters, [1000, 200, 'key', 1, 2, 1000, 1600])
+        self.assertEqual(time_and_value_list, [(1000, 10), (1400, 30)])
+
+    def test_trends_are_used_for_segments_longer_than_an_hour(self, mocked_connections):
+        _, query, _ = self.get_executed_query(mocked_connections, 0, 86400, 24, True)
+
+        self.assertIn('AVG(hi.value_avg) / (1024 * 1024)', query)
+        self.assertIn('zabbix.trends_uint hi', query)
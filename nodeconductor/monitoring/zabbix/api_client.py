@@ -1,12 +1,16 @@
 import logging
+import threading
+import time
 
 import requests
 from requests.exceptions import RequestException
 
 from django.conf import settings
+from django.db import IntegrityError, transaction
 from django.utils import six
 from pyzabbix import ZabbixAPI, ZabbixAPIException
 
+from nodeconductor.monitoring.models import ZabbixHost
 from nodeconductor.monitoring.zabbix.errors import ZabbixError
 
 
@@ -34,8 +38,105 @@ def _exception_decorator(message, fail_silently=None):
     return decorator
 
 
+class PooledZabbixAPI(ZabbixAPI):
+    """
+    Logged in Zabbix API handle which logs in again once its session has expired.
+    """
+    SESSION_EXPIRED_MESSAGES = ('Session terminated', 'Not authorised')
+
+    def __init__(self, server, username, password, **kwargs):
+        session = requests.Session()
+        session.verify = False
+
+        super(PooledZabbixAPI, self).__init__(server=server, session=session, **kwargs)
+        self.username = username
+        self.password = password
+        self.created_at = time.time()
+        self.login(username, password)
+
+    def do_request(self, method, params=None):
+        try:
+            return super(PooledZabbixAPI, self).do_request(method, params)
+        except ZabbixAPIException as e:
+            if method == 'user.login' or not any(m in str(e) for m in self.SESSION_EXPIRED_MESSAGES):
+                raise
+
+        logger.info('Zabbix API session of user %s has expired, logging in again', self.username)
+        self.login(self.username, self.password)
+        return super(PooledZabbixAPI, self).do_request(method, params)
+
+
+class ZabbixApiPool(object):
+    """
+    Process level pool of logged in Zabbix API handles.
+
+    Handles are shared rather than checked out: each API call is a single HTTP
+    request over a keep-alive connection of the handle session, so handles are
+    handed out in turn. Handles older than lifetime are closed and replaced with new ones.
+    """
+
+    def __init__(self, size=4, lifetime=3600):
+        self.size = size
+        self.lifetime = lifetime
+        self._handles = {}
+        self._counter = 0
+        self._lock = threading.Lock()
+
+    def get(self, server, username, password):
+        key = (server, username)
+
+        with self._lock:
+            api = self._get_pooled(key)
+        if api is not None:
+            return api
+
+        # Logging in is an HTTP request, it must not block threads using other handles
+        new_api = PooledZabbixAPI(server, username, password)
+
+        with self._lock:
+            api = self._get_pooled(key)
+            if api is None:
+                self._handles[key].append(new_api)
+                return new_api
+
+        # Pool has been filled by other threads meanwhile
+        new_api.session.close()
+        return api
+
+    def clear(self):
+        with self._lock:
+            for handles in self._handles.values():
+                for api in handles:
+                    api.session.close()
+            self._handles = {}
+
+    def _get_pooled(self, key):
+        """ Return one of pooled handles in turn or None if there is room for a new one, lock must be held """
+        now = time.time()
+        handles = []
+        for api in self._handles.get(key, []):
+            if now - api.created_at < self.lifetime:
+                handles.append(api)
+            else:
+                # Close keep-alive connections of the expired handle
+                api.session.close()
+        self._handles[key] = handles
+
+        if len(handles) < self.size:
+            return None
+        self._counter += 1
+        return handles[self._counter % len(handles)]
+
+
 class ZabbixApiClient(object):
 
+    service_name_template = 'Availability of %s'
+
+    api_pool = ZabbixApiPool(
+        size=ZABBIX_SETTINGS.get('api_pool_size', 4),
+        lifetime=ZABBIX_SETTINGS.get('api_session_lifetime', 3600),
+    )
+
     def __init__(self):
         self.init_config_parameters()
 
@@ -48,6 +149,105 @@ class ZabbixApiClient(object):
             raise ZabbixError('There is no host for instance %s' % instance)
         return hosts[0]
 
+    @_exception_decorator('Can not get Zabbix hosts for instances')
+    def get_host_ids(self, instances):
+        """
+        Map backend ids of instances to ids of their Zabbix hosts.
+
+        Host ids are taken from the persistent mapping, hosts missing from it are
+        looked up with a single API call and added to the mapping.
+        Instances without Zabbix host are not present in the result.
+        """
+        names = set(self.get_host_name(instance) for instance in instances)
+        host_ids = dict(ZabbixHost.objects.filter(backend_id__in=names).values_list('backend_id', 'hostid'))
+
+        missing_names = names - set(host_ids)
+        if missing_names:
+            api = self.get_zabbix_api()
+            hosts = api.host.get(filter={'host': list(missing_names)}, output=['hostid', 'host'])
+            found_host_ids = dict((host['host'], host['hostid']) for host in hosts)
+            try:
+                with transaction.atomic():
+                    ZabbixHost.objects.bulk_create(
+                        ZabbixHost(backend_id=name, hostid=hostid) for name, hostid in found_host_ids.items())
+            except IntegrityError:
+                # Hosts were added to the mapping concurrently
+                pass
+            host_ids.update(found_host_ids)
+
+        return host_ids
+
+    @_exception_decorator('Can not synchronize Zabbix hosts and IT services')
+    def sync_instances(self, instances):
+        """
+        Reconcile Zabbix hosts of configured host group and their IT services with instances.
+        IT services of hosts outside of the group are never deleted.
+
+        Hosts and services are fetched with one API call each, missing ones are created
+        and ones without instances are deleted with batched calls. Mapping of backend ids
+        to Zabbix host ids is replaced with the reconciled hosts.
+        Returns names of created and deleted hosts and services.
+        """
+        api = self.get_zabbix_api()
+        instances = dict((self.get_host_name(instance), instance) for instance in instances)
+        changes = {'created_hosts': [], 'deleted_hosts': [], 'created_services': [], 'deleted_services': []}
+
+        hosts = api.host.get(groupids=self.groupid, output=['hostid', 'host'], selectTriggers=['triggerid'])
+        host_ids = dict((host['host'], host['hostid']) for host in hosts)
+        # Only services of the group hosts are managed, other ones can belong to other deployments
+        group_trigger_ids = set(trigger['triggerid'] for host in hosts for trigger in host['triggers'])
+
+        missing_hosts = [name for name in instances if name not in host_ids]
+        if missing_hosts:
+            # Hosts could have been moved out of the group, they are left as they are
+            hosts = api.host.get(filter={'host': missing_hosts}, output=['hostid', 'host'])
+            host_ids.update((host['host'], host['hostid']) for host in hosts)
+            missing_hosts = [name for name in missing_hosts if name not in host_ids]
+
+        if missing_hosts:
+            created = api.host.create(*[self.get_host_parameters(instances[name]) for name in missing_hosts])
+            host_ids.update(zip(missing_hosts, created['hostids']))
+            changes['created_hosts'] = missing_hosts
+
+        stale_hosts = [name for name in host_ids if name not in instances]
+        if stale_hosts:
+            api.host.delete(*[host_ids.pop(name) for name in stale_hosts])
+            changes['deleted_hosts'] = stale_hosts
+
+        service_names = dict((self.get_service_name(instance), name) for name, instance in instances.items())
+        service_prefix = self.service_name_template.partition('%s')[0]
+        services = [service for service in api.service.get(output=['serviceid', 'name', 'triggerid'])
+                    if service['name'].startswith(service_prefix)]
+        service_ids = dict((service['name'], service['serviceid']) for service in services)
+
+        missing_services = [name for name in service_names if name not in service_ids]
+        if missing_services:
+            trigger_ids = self.get_hosts_triggerids(api, [host_ids[service_names[name]] for name in missing_services])
+            services_parameters = []
+            for name in missing_services:
+                hostid = host_ids[service_names[name]]
+                if hostid not in trigger_ids:
+                    logger.warn('Can not create Zabbix IT service %s. Host %s has no triggers', name, hostid)
+                    continue
+                service_parameters = dict(self.default_service_parameters, name=name, triggerid=trigger_ids[hostid])
+                services_parameters.append(service_parameters)
+                changes['created_services'].append(name)
+            if services_parameters:
+                api.service.create(*services_parameters)
+
+        stale_services = [service['name'] for service in services
+                          if service['name'] not in service_names and service['triggerid'] in group_trigger_ids]
+        if stale_services:
+            api.service.delete(*[service_ids[name] for name in stale_services])
+            changes['deleted_services'] = stale_services
+
+        with transaction.atomic():
+            ZabbixHost.objects.all().delete()
+            ZabbixHost.objects.bulk_create(
+                ZabbixHost(backend_id=name, hostid=hostid) for name, hostid in host_ids.items())
+
+        return changes
+
     @_exception_decorator('Can not create Zabbix host for instance {1}. {exception_name}: {exception}')
     def create_host(self, instance, warn_if_host_exists=True):
         api = self.get_zabbix_api()
@@ -74,6 +274,7 @@ class ZabbixApiClient(object):
         api = self.get_zabbix_api()
 
         deleted = self.delete_host_if_exists(api, instance)
+        ZabbixHost.objects.filter(backend_id=self.get_host_name(instance)).delete()
         if not deleted:
             logger.warn('Can not delete zabbix host for instance %s. It does not exist.', instance)
 
@@ -146,6 +347,69 @@ class ZabbixApiClient(object):
         events = self.get_trigger_events(api, service_trigger_id, start_time, end_time)
         return sla, events
 
+    @_exception_decorator('Can not get Zabbix IT services of instances')
+    def get_instances_services(self, instances):
+        """
+        Get IT services of many instances with a single API call.
+
+        Returns {instance: service} for instances having exactly one IT service,
+        services contain serviceid, name and triggerid.
+        """
+        api = self.get_zabbix_api()
+        instances = dict((self.get_service_name(instance), instance) for instance in instances)
+        if not instances:
+            return {}
+
+        services = api.service.get(filter={'name': list(instances)}, output=['serviceid', 'name', 'triggerid'])
+        services_by_name = {}
+        for service in services:
+            services_by_name.setdefault(service['name'], []).append(service)
+
+        result = {}
+        for name, instance in instances.items():
+            found = services_by_name.get(name, [])
+            if len(found) == 1:
+                result[instance] = found[0]
+            else:
+                logger.warn('Exactly one result is expected for service name %s, instead received %s. Instance: %s',
+                            name, len(found), instance)
+        return result
+
+    @_exception_decorator('Can not get Zabbix IT services SLA values')
+    def get_services_sla_values(self, service_ids, start_time, end_time):
+        """ Map ids of IT services to their SLA values calculated by Zabbix, using a single API call """
+        if not service_ids:
+            return {}
+
+        api = self.get_zabbix_api()
+        slas = api.service.getsla(serviceids=list(service_ids), intervals={'from': start_time, 'to': end_time})
+        result = {}
+        for service_id in service_ids:
+            try:
+                result[service_id] = slas[service_id]['sla'][0]['sla']
+            except (KeyError, IndexError):
+                logger.warning('Zabbix did not return SLA value of IT service %s', service_id)
+        return result
+
+    @_exception_decorator('Can not get Zabbix trigger events')
+    def get_triggers_events(self, time_from_by_trigger, time_till):
+        """
+        Map ids of triggers to their events ordered by time.
+
+        Events of each trigger are requested starting from its own time, triggers
+        sharing the same start time are requested with a single API call.
+        """
+        api = self.get_zabbix_api()
+        triggers_by_time_from = {}
+        for trigger_id, time_from in time_from_by_trigger.items():
+            triggers_by_time_from.setdefault(time_from, []).append(trigger_id)
+
+        events = {}
+        for time_from, trigger_ids in triggers_by_time_from.items():
+            for trigger_id, trigger_events in self.get_events(api, trigger_ids, time_from, time_till).items():
+                events[trigger_id] = trigger_events
+        return events
+
     # Helpers:
     def init_config_parameters(self):
         try:
@@ -178,12 +442,7 @@ class ZabbixApiClient(object):
                 six.reraise(ZabbixError, e)
 
     def get_zabbix_api(self):
-        unsafe_session = requests.Session()
-        unsafe_session.verify = False
-
-        api = ZabbixAPI(server=self.server, session=unsafe_session)
-        api.login(self.username, self.password)
-        return api
+        return self.api_pool.get(self.server, self.username, self.password)
 
     def get_host_name(self, instance):
         return '%s' % instance.backend_id
@@ -195,7 +454,7 @@ class ZabbixApiClient(object):
         return '%s_%s' % (project.name, project.uuid)
 
     def get_service_name(self, instance):
-        return 'Availability of %s' % instance.backend_id
+        return self.service_name_template % instance.backend_id
 
     def get_host_triggerid(self, api, hostid):
         try:
@@ -203,6 +462,24 @@ class ZabbixApiClient(object):
         except IndexError:
             raise ZabbixAPIException('No template with id: %s' % hostid)
 
+    def get_hosts_triggerids(self, api, hostids):
+        """ Map ids of hosts to ids of their first triggers """
+        triggers = api.trigger.get(hostids=hostids, output=['triggerid'], selectHosts=['hostid'])
+        triggerids = {}
+        for trigger in triggers:
+            for host in trigger['hosts']:
+                triggerids.setdefault(host['hostid'], trigger['triggerid'])
+        return triggerids
+
+    def get_host_parameters(self, instance):
+        return {
+            "host": self.get_host_name(instance),
+            "name": self.get_host_visible_name(instance),
+            "interfaces": [self.interface_parameters],
+            "groups": [{"groupid": self.groupid}],
+            "templates": [{"templateid": self.templateid}],
+        }
+
     def get_or_create_hostgroup(self, api, project):
         group_name = self.get_hostgroup_name(project)
         if not api.hostgroup.exists(name=group_name):
@@ -271,3 +548,17 @@ class ZabbixApiClient(object):
             sortfield=["clock"],
             sortorder="ASC")
         return [{'timestamp': e['clock'], 'value': e['value']} for e in event_data]
+
+    def get_events(self, api, trigger_ids, start_time, end_time):
+        """ Map ids of triggers to their events ordered by time """
+        event_data = api.event.get(
+            output='extend',
+            objectids=trigger_ids,
+            time_from=start_time,
+            time_till=end_time,
+            sortfield=["clock"],
+            sortorder="ASC")
+        events = {}
+        for e in event_data:
+            events.setdefault(e['objectid'], []).append({'timestamp': e['clock'], 'value': e['value']})
+        return events
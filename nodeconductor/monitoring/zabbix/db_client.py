@@ -4,7 +4,7 @@ import sys
 from django.db import connections, DatabaseError
 from django.utils import six
 
-from nodeconductor.core import utils as core_utils
+from nodeconductor.core import resampling
 from nodeconductor.monitoring.zabbix import errors, api_client
 from nodeconductor.monitoring.zabbix.errors import ZabbixError
 
@@ -20,6 +20,13 @@ class ZabbixDBClient(object):
         'storage': {'key': 'kvm.vm.disk.size', 'table': 'history_uint', 'convert_to_mb': True}
     }
 
+    # Zabbix keeps hourly minimum, average and maximum of history values in trends tables
+    TRENDS_PERIOD = 60 * 60
+    trends_tables = {
+        'history': 'trends',
+        'history_uint': 'trends_uint',
+    }
+
     def __init__(self):
         self.zabbix_api_client = api_client.ZabbixApiClient()
 
@@ -28,12 +35,7 @@ class ZabbixDBClient(object):
         if item == 'storage':
             return self.get_storage_stats(instances, start_timestamp, end_timestamp, segments_count)
 
-        host_ids = []
-        for instance in instances:
-            try:
-                host_ids.append(self.zabbix_api_client.get_host(instance)['hostid'])
-            except ZabbixError:
-                logger.warn('Failed to get a Zabbix host for instance %s', instance.uuid)
+        host_ids = self.get_host_ids(instances)
 
         # return an empty list if no hosts were found
         if not host_ids:
@@ -44,49 +46,72 @@ class ZabbixDBClient(object):
         convert_to_mb = self.items[item]['convert_to_mb']
         try:
             time_and_value_list = self.get_item_time_and_value_list(
-                host_ids, [item_key], item_table, start_timestamp, end_timestamp, convert_to_mb)
-            segment_list = core_utils.format_time_and_value_to_segment_list(
-                time_and_value_list, segments_count, start_timestamp, end_timestamp, average=True)
+                host_ids, [item_key], item_table, start_timestamp, end_timestamp, segments_count, convert_to_mb)
+            segment_list = resampling.resample(
+                time_and_value_list, segments_count, start_timestamp, end_timestamp, resampling.Aggregations.AVG)
             return segment_list
         except DatabaseError as e:
             logger.exception('Can not execute query the Zabbix DB.')
             six.reraise(errors.ZabbixError, e, sys.exc_info()[2])
 
+    def get_host_ids(self, instances):
+        try:
+            host_ids = self.zabbix_api_client.get_host_ids(instances) or {}
+        except ZabbixError:
+            logger.warn('Failed to get Zabbix hosts for instances')
+            return []
+
+        result = []
+        for instance in instances:
+            try:
+                result.append(int(host_ids[self.zabbix_api_client.get_host_name(instance)]))
+            except (KeyError, ValueError):
+                logger.warn('Failed to get Zabbix hostid for instance %s', instance.uuid)
+        return result
+
     def get_item_time_and_value_list(
-            self, host_ids, item_keys, item_table, start_timestamp, end_timestamp, convert_to_mb):
+            self, host_ids, item_keys, item_table, start_timestamp, end_timestamp, segments_count, convert_to_mb):
         """
-        Execute query to zabbix db to get item values from history
+        Execute query to zabbix db to get average item values per segment.
+
+        Values are aggregated into segments by the database, one row per segment
+        with values is returned as (segment start timestamp, average value).
+        Hourly trends are used instead of history if segments are at least an hour long.
         """
+        time_step = (end_timestamp - start_timestamp) / segments_count
+        if time_step <= 0:
+            return []
+
+        if time_step >= self.TRENDS_PERIOD:
+            item_table = self.trends_tables[item_table]
+            value_column = 'hi.value_avg'
+        else:
+            value_column = 'hi.value'
+
         query = (
-            'SELECT hi.clock time, (%(value_path)s) value '
-            'FROM zabbix.items it JOIN zabbix.%(item_table)s hi on hi.itemid = it.itemid '
-            'WHERE it.key_ in (%(item_keys)s) AND it.hostid in (%(host_ids)s) '
-            'AND hi.clock < %(end_timestamp)s AND hi.clock >= %(start_timestamp)s '
-            'GROUP BY hi.clock '
-            'ORDER BY hi.clock'
-        )
-        parameters = {
-            'item_keys': '"' + '", "'.join(item_keys) + '"',
-            'start_timestamp': start_timestamp,
-            'end_timestamp': end_timestamp,
-            'host_ids': ','.join(str(host_id) for host_id in host_ids),
+            'SELECT FLOOR((hi.clock - %%s) / %%s) segment, AVG(%(value_column)s)%(conversion)s value '
+            'FROM zabbix.items it JOIN zabbix.%(item_table)s hi ON hi.itemid = it.itemid '
+            'WHERE it.key_ IN (%(item_keys)s) AND it.hostid IN (%(host_ids)s) '
+            'AND hi.clock >= %%s AND hi.clock < %%s '
+            'GROUP BY segment '
+            'ORDER BY segment'
+        ) % {
+            # table names come from the items definition only, everything else is passed as parameters
             'item_table': item_table,
-            'value_path': 'hi.value' if not convert_to_mb else 'hi.value / (1024*1024)',
+            'value_column': value_column,
+            'conversion': ' / (1024 * 1024)' if convert_to_mb else '',
+            'item_keys': ', '.join(['%s'] * len(item_keys)),
+            'host_ids': ', '.join(['%s'] * len(host_ids)),
         }
-        query = query % parameters
+        parameters = [start_timestamp, time_step] + list(item_keys) + list(host_ids) + [
+            start_timestamp, start_timestamp + time_step * segments_count]
 
-        cursor = connections['zabbix'].cursor()
-        cursor.execute(query)
-        return cursor.fetchall()
+        with connections['zabbix'].cursor() as cursor:
+            cursor.execute(query, parameters)
+            return [(start_timestamp + int(segment) * time_step, value) for segment, value in cursor.fetchall()]
 
     def get_storage_stats(self, instances, start_timestamp, end_timestamp, segments_count):
-        host_ids = []
-        for instance in instances:
-            try:
-                host_data = self.zabbix_api_client.get_host(instance)
-                host_ids.append(int(host_data['hostid']))
-            except (ZabbixError, ValueError, KeyError):
-                logger.warn('Failed to get Zabbix hostid for instance %s', instance.uuid)
+        host_ids = self.get_host_ids(instances)
 
         # return an empty list if no hosts were found
         if not host_ids:
@@ -120,29 +145,7 @@ class ZabbixDBClient(object):
             cursor.execute(query, parameters)
             actual_values = cursor.fetchall()
 
-        # Poor man's resampling
-        resampled_values = []
-        sampling_step = (end_timestamp - start_timestamp) / segments_count
-
-        for i in range(segments_count):
-            segment_start_timestamp = start_timestamp + sampling_step * i
-            segment_end_timestamp = segment_start_timestamp + sampling_step
-
-            # Get the closest value that was known before the requested data point
-            # This could be written in much more efficient way.
-            preceding_values = [
-                value for time, value in actual_values
-                if time < segment_end_timestamp
-            ]
-            try:
-                value = preceding_values[-1]
-            except IndexError:
-                value = '0.0000'
-
-            resampled_values.append({
-                'from': segment_start_timestamp,
-                'to': segment_end_timestamp,
-                'value': value,
-            })
-
-        return resampled_values
+        # Storage size is the latest value known by the end of a segment
+        return resampling.resample(
+            actual_values, segments_count, start_timestamp, end_timestamp,
+            resampling.Aggregations.LAST, default='0.0000')
@@ -52,6 +52,7 @@ MIDDLEWARE_CLASSES = (
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'nodeconductor.events.middleware.CaptureUserMiddleware',
+    'nodeconductor.structure.middleware.PermissionContextMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 )
@@ -156,11 +157,21 @@ CELERYBEAT_SCHEDULE = {
         'schedule': timedelta(minutes=15),
         'args': (),
     },
+    'poll-status-waiters': {
+        'task': 'nodeconductor.iaas.poll_status_waiters',
+        'schedule': timedelta(seconds=10),
+        'args': (),
+    },
     'pull-cloud-project-memberships': {
         'task': 'nodeconductor.iaas.tasks.iaas.pull_cloud_memberships',
         'schedule': timedelta(minutes=30),
         'args': (),
     },
+    'pull-cloud-project-memberships-instances': {
+        'task': 'nodeconductor.iaas.tasks.iaas.pull_cloud_memberships_instances',
+        'schedule': timedelta(minutes=3),
+        'args': (),
+    },
 
     'check-cloud-project-memberships-quotas': {
         'task': 'nodeconductor.iaas.tasks.iaas.check_cloud_memberships_quotas',
@@ -188,10 +199,18 @@ CELERYBEAT_SCHEDULE = {
 }
 
 CELERY_TASK_THROTTLING = {
-    'nodeconductor.iaas.tasks.openstack.openstack_provision_instance': {
+    'nodeconductor.iaas.tasks.openstack.openstack_create_instance_volumes': {
         'concurrency': 1,
         'retry_delay': 30,
     },
+    'nodeconductor.iaas.tasks.openstack.openstack_boot_instance': {
+        'concurrency': 1,
+        'retry_delay': 30,
+    },
+    'nodeconductor.iaas.tasks.iaas.pull_cloud_membership': {
+        'concurrency': 2,
+        'retry_delay': 60,
+    },
 }
 
 NODECONDUCTOR = {
@@ -125,6 +125,33 @@ class StructureConfig(AppConfig):
                 dispatch_uid='nodeconductor.iaas.handlers.%s' % name,
             )
 
+        for model in structure_models_with_roles:
+            structure_signals.structure_role_granted.connect(
+                handlers.add_user_structure_role,
+                sender=model,
+                dispatch_uid='nodeconductor.structure.handlers.add_user_structure_role_%s' % model.__name__,
+            )
+
+            structure_signals.structure_role_revoked.connect(
+                handlers.remove_user_structure_role,
+                sender=model,
+                dispatch_uid='nodeconductor.structure.handlers.remove_user_structure_role_%s' % model.__name__,
+            )
+
+            structure_signals.structure_role_granted.connect(
+                handlers.invalidate_permission_context,
+                sender=model,
+                dispatch_uid='nodeconductor.structure.handlers.invalidate_permission_context_on_grant_%s' % (
+                    model.__name__),
+            )
+
+            structure_signals.structure_role_revoked.connect(
+                handlers.invalidate_permission_context,
+                sender=model,
+                dispatch_uid='nodeconductor.structure.handlers.invalidate_permission_context_on_revoke_%s' % (
+                    model.__name__),
+            )
+
         # decrease nc_user_count quota usage on removing user from customer
         for model in structure_models_with_roles:
             name = 'decrease_customer_nc_users_quota_on_adding_user_to_%s' % model.__name__
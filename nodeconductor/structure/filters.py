@@ -8,7 +8,8 @@ from django.forms.fields import ChoiceField
 from django_filters import ChoiceFilter
 from rest_framework.filters import BaseFilterBackend
 
-from nodeconductor.structure.models import CustomerRole
+from nodeconductor.structure.middleware import get_permission_context
+from nodeconductor.structure.models import CustomerRole, UserStructureRole
 
 
 def set_permissions_for_model(model, **kwargs):
@@ -20,12 +21,41 @@ def set_permissions_for_model(model, **kwargs):
     setattr(model, 'Permissions', Permissions)
 
 
+def _is_multivalued(model, path):
+    """ Whether lookup path from the model traverses one-to-many or many-to-many relation """
+    for name in path.split('__'):
+        field, _, direct, m2m = model._meta.get_field_by_name(name)
+        if m2m:
+            return True
+        if direct:
+            model = field.rel.to
+        else:
+            # Reverse relation of a foreign key, reverse one-to-one is single-valued
+            if not field.field.unique:
+                return True
+            model = field.model
+    return False
+
+
 def filter_queryset_for_user(queryset, user):
+    """
+    Filter queryset to objects connected to customers, projects or project groups
+    where user has a role. Roles are looked up in UserStructureRole index with a
+    single IN subquery per connection, so that no DISTINCT is required.
+    Within a request ids of permitted structures are looked up only once.
+    """
     filtered_relations = ('customer', 'project', 'project_group')
 
     if user.is_staff:
         return queryset
 
+    try:
+        permissions = queryset.model.Permissions
+    except AttributeError:
+        return queryset
+
+    permission_context = get_permission_context()
+
     def create_q(entity):
         try:
             path = getattr(permissions, '%s_path' % entity)
@@ -33,41 +63,31 @@ def filter_queryset_for_user(queryset, user):
             return None
 
         role = getattr(permissions, '%s_role' % entity, None)
-
-        if path == 'self':
-            prefix = ''
+        if permission_context is not None:
+            permitted_ids = permission_context.get_permitted_ids(user, entity, role)
         else:
-            prefix = path + '__'
+            permitted_ids = UserStructureRole.get_permitted_ids(user, entity, role)
 
-        kwargs = {
-            prefix + 'roles__permission_group__user': user,
-        }
+        if path == 'self':
+            return Q(pk__in=permitted_ids)
 
-        if role:
-            kwargs[prefix + 'roles__role_type'] = role
+        if _is_multivalued(queryset.model, path):
+            # Join is kept inside of the subquery, hence duplicates do not leak into the result
+            permitted_objects = queryset.model._base_manager.filter(**{path + '__in': permitted_ids})
+            return Q(pk__in=permitted_objects.values('pk'))
 
-        return Q(**kwargs)
-
-    try:
-        permissions = queryset.model.Permissions
-    except AttributeError:
-        return queryset
+        return Q(**{path + '__in': permitted_ids})
 
     q_objects = [q_object for q_object in (
         create_q(entity) for entity in filtered_relations
     ) if q_object is not None]
 
-    try:
-        # Whether both customer and project filtering requested?
-        any_of_q = reduce(or_, q_objects)
-        return queryset.filter(any_of_q).distinct()
-    except TypeError:
-        # Or any of customer and project filtering requested?
-        return queryset.filter(q_objects[0])
-    except IndexError:
+    if not q_objects:
         # Looks like no filters are there
         return queryset
 
+    return queryset.filter(reduce(or_, q_objects))
+
 
 class GenericRoleFilter(BaseFilterBackend):
     def filter_queryset(self, request, queryset, view):
@@ -8,7 +8,9 @@ from django.db import models, transaction
 from nodeconductor.core.log import EventLoggerAdapter
 from nodeconductor.quotas import handlers as quotas_handlers
 from nodeconductor.structure import signals
-from nodeconductor.structure.models import CustomerRole, Project, ProjectRole, ProjectGroupRole, Customer, ProjectGroup
+from nodeconductor.structure.middleware import get_permission_context
+from nodeconductor.structure.models import (
+    CustomerRole, Project, ProjectRole, ProjectGroupRole, Customer, ProjectGroup, UserStructureRole)
 
 
 logger = logging.getLogger(__name__)
@@ -139,3 +141,22 @@ def change_customer_nc_users_quota(sender, structure, user, role, signal, **kwar
             customer.add_quota_usage('nc_user_count', 1)
         else:
             customer.add_quota_usage('nc_user_count', -1)
+
+
+def add_user_structure_role(sender, structure, user, role, **kwargs):
+    lookup = UserStructureRole.get_structure_lookup(structure)
+    lookup.setdefault('customer', getattr(structure, 'customer', None))
+
+    UserStructureRole.objects.get_or_create(user=user, role_type=role, **lookup)
+
+
+def remove_user_structure_role(sender, structure, user, role, **kwargs):
+    lookup = UserStructureRole.get_structure_lookup(structure)
+
+    UserStructureRole.objects.filter(user=user, role_type=role, **lookup).delete()
+
+
+def invalidate_permission_context(sender, user, **kwargs):
+    context = get_permission_context()
+    if context is not None:
+        context.invalidate(user)
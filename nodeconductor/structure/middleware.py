@@ -0,0 +1,92 @@
+from __future__ import unicode_literals
+
+import threading
+
+from django.conf import settings
+
+from nodeconductor.structure.models import UserStructureRole
+
+_locals = threading.local()
+
+
+class PermissionContext(object):
+    """ Permission lookups memoized for one request.
+
+        Holds ids of customers, projects and project groups where users have roles
+        for queryset filtering, and outcomes of collaborators queries of object
+        permission checks. Outcomes are kept per permission logic, as logics of
+        the same model may have different collaborators queries.
+    """
+
+    def __init__(self):
+        self._permitted_ids = {}
+        self._collaborations = {}
+        self.lookups = 0
+        self.hits = 0
+
+    def get_permitted_ids(self, user, entity, role_type=None):
+        key = (user.pk, entity, role_type)
+        if key in self._permitted_ids:
+            self.hits += 1
+        else:
+            self.lookups += 1
+            queryset = UserStructureRole.get_permitted_ids(user, entity, role_type)
+            self._permitted_ids[key] = frozenset(queryset.values_list(entity, flat=True))
+        return self._permitted_ids[key]
+
+    def get_collaborated_pks(self, user, model, logic, pks):
+        """ Split pks of model objects into ones collaborated by user according to logic and not yet resolved ones """
+        collaborated, unknown = set(), set()
+        for pk in pks:
+            key = (user.pk, model, id(logic), pk)
+            if key in self._collaborations:
+                self.hits += 1
+                if self._collaborations[key]:
+                    collaborated.add(pk)
+            else:
+                unknown.add(pk)
+        if unknown:
+            self.lookups += 1
+        return collaborated, unknown
+
+    def set_collaborated_pks(self, user, model, logic, pks, collaborated_pks):
+        for pk in pks:
+            self._collaborations[(user.pk, model, id(logic), pk)] = pk in collaborated_pks
+
+    def invalidate(self, user):
+        for cache in (self._permitted_ids, self._collaborations):
+            for key in [key for key in cache if key[0] == user.pk]:
+                del cache[key]
+
+
+def get_permission_context():
+    return getattr(_locals, 'permission_context', None)
+
+
+def reset_permission_context():
+    try:
+        del _locals.permission_context
+    except AttributeError:
+        pass
+
+
+# noinspection PyMethodMayBeStatic
+class PermissionContextMiddleware(object):
+    """ Share permission lookups of queryset filtering and object permission checks within a request.
+
+        Users are authenticated by REST framework views after middlewares have run,
+        hence the context is bound to the request rather than to the user.
+        In debug mode number of avoided lookups is reported in a response header.
+    """
+
+    HEADER = 'X-Permission-Lookups-Avoided'
+
+    def process_request(self, request):
+        _locals.permission_context = PermissionContext()
+
+    def process_response(self, request, response):
+        context = get_permission_context()
+        if context is not None and settings.DEBUG:
+            response[self.HEADER] = context.hits
+        reset_permission_context()
+        return response
@@ -0,0 +1,53 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+from django.db import models, migrations
+from django.conf import settings
+
+
+def init_user_structure_roles(apps, schema_editor):
+    User = apps.get_model(*settings.AUTH_USER_MODEL.split('.'))
+    UserGroup = User.groups.through
+    UserStructureRole = apps.get_model('structure', 'UserStructureRole')
+
+    roles = []
+    for model_name, structure_field in (('CustomerRole', 'customer'),
+                                        ('ProjectRole', 'project'),
+                                        ('ProjectGroupRole', 'project_group')):
+        Role = apps.get_model('structure', model_name)
+        for role in Role.objects.select_related(structure_field).iterator():
+            structure = getattr(role, structure_field)
+            values = {structure_field: structure, 'role_type': role.role_type}
+            if structure_field != 'customer':
+                values['customer_id'] = structure.customer_id
+
+            user_ids = UserGroup.objects.filter(group_id=role.permission_group_id).values_list('user_id', flat=True)
+            roles.extend(UserStructureRole(user_id=user_id, **values) for user_id in user_ids)
+
+    UserStructureRole.objects.bulk_create(roles, batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('structure', '0008_add_customer_billing_fields'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='UserStructureRole',
+            fields=[
+                ('id', models.AutoField(verbose_name='ID', serialize=False, auto_created=True, primary_key=True)),
+                ('role_type', models.SmallIntegerField()),
+                ('customer', models.ForeignKey(related_name='+', to='structure.Customer')),
+                ('project', models.ForeignKey(related_name='+', to='structure.Project', null=True)),
+                ('project_group', models.ForeignKey(related_name='+', to='structure.ProjectGroup', null=True)),
+                ('user', models.ForeignKey(related_name='+', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+            },
+            bases=(models.Model,),
+        ),
+        migrations.RunPython(init_user_structure_roles),
+    ]
@@ -2,6 +2,7 @@ from __future__ import unicode_literals
 
 import logging
 
+from django.conf import settings
 from django.core.validators import MaxLengthValidator
 from django.contrib.auth import get_user_model
 from django.contrib.auth.models import Group
@@ -409,6 +410,48 @@ class ProjectGroup(core_models.UuidMixin,
         return queryset.exists()
 
 
+class UserStructureRole(models.Model):
+    """
+    Denormalized copy of user roles used for permission filtering.
+
+    A row stands for a role of a user in a customer, a project or a project group.
+    Customer is set for all of them, project and project group only for roles in those.
+    Rows are maintained by structure_role_granted and structure_role_revoked handlers.
+    """
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, related_name='+')
+    customer = models.ForeignKey(Customer, related_name='+')
+    project_group = models.ForeignKey(ProjectGroup, related_name='+', null=True)
+    project = models.ForeignKey(Project, related_name='+', null=True)
+    role_type = models.SmallIntegerField()
+
+    @classmethod
+    def get_structure_lookup(cls, structure):
+        """ Return lookup of rows standing for roles in the structure """
+        if isinstance(structure, Customer):
+            return {'customer': structure, 'project_group': None, 'project': None}
+        elif isinstance(structure, Project):
+            return {'project': structure}
+        elif isinstance(structure, ProjectGroup):
+            return {'project_group': structure}
+        raise TypeError('Unsupported structure %s' % structure.__class__.__name__)
+
+    @classmethod
+    def get_permitted_ids(cls, user, entity, role_type=None):
+        """
+        Return queryset of ids of customers, projects or project groups
+        where user has a role, to be used as an IN subquery.
+        """
+        if entity == 'customer':
+            queryset = cls.objects.filter(user=user, project_group=None, project=None)
+        else:
+            queryset = cls.objects.filter(user=user, **{entity + '__isnull': False})
+
+        if role_type is not None:
+            queryset = queryset.filter(role_type=role_type)
+
+        return queryset.values(entity)
+
+
 @python_2_unicode_compatible
 class Service(PolymorphicModel, core_models.UuidMixin,
               core_models.NameMixin, core_models.SynchronizableMixin):
@@ -5,7 +5,7 @@ from django.contrib import auth
 from django.db import models as django_models
 from rest_framework import serializers
 
-from nodeconductor.core import serializers as core_serializers, utils as core_utils
+from nodeconductor.core import resampling, serializers as core_serializers, utils as core_utils
 from nodeconductor.core.fields import MappedChoiceField
 from nodeconductor.quotas import serializers as quotas_serializers
 from nodeconductor.structure import models, filters
@@ -39,6 +39,9 @@ class PermissionFieldFilteringMixin(object):
             return fields
 
         for field_name in self.get_filtered_field_names():
+            # field can be omitted from requested sparse fieldset
+            if field_name not in fields:
+                continue
             fields[field_name].queryset = filter_queryset_for_user(
                 fields[field_name].queryset, user)
 
@@ -542,9 +545,9 @@ class CreationTimeStatsSerializer(serializers.Serializer):
         time_and_value_list = [
             (core_utils.datetime_to_timestamp(dt['created']), dt['count']) for dt in created_datetimes]
 
-        return core_utils.format_time_and_value_to_segment_list(
+        return resampling.resample(
             time_and_value_list, self.data['segments_count'],
-            self.data['start_timestamp'], self.data['end_timestamp'])
+            self.data['start_timestamp'], self.data['end_timestamp'], resampling.Aggregations.SUM)
 
 
 class PasswordSerializer(serializers.Serializer):
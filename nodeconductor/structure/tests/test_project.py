@@ -161,6 +161,25 @@ class ProjectFilterTest(test.APITransactionTestCase):
             self.assertEqual(len(response.data), 1, 'Expected project to be returned when ordering by %s' % ordering)
 
 
+class ProjectSparseFieldsetTest(test.APITransactionTestCase):
+
+    def setUp(self):
+        self.owner = factories.UserFactory()
+        self.project = factories.ProjectFactory()
+        self.project.customer.add_user(self.owner, CustomerRole.OWNER)
+
+        self.client.force_authenticate(self.owner)
+
+    def test_user_receives_only_requested_fields_of_projects(self):
+        response = self.client.get(factories.ProjectFactory.get_list_url(), {'field': ['uuid', 'customer_name']})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data, [{
+            'uuid': self.project.uuid.hex,
+            'customer_name': self.project.customer.name,
+        }])
+
+
 class ProjectCreateUpdateDeleteTest(test.APITransactionTestCase):
 
     def setUp(self):
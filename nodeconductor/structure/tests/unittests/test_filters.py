@@ -0,0 +1,51 @@
+from django.test import TestCase
+
+from nodeconductor.structure import models
+from nodeconductor.structure.filters import filter_queryset_for_user
+from nodeconductor.structure.tests import factories
+
+
+class FilterQuerysetForUserTest(TestCase):
+
+    def setUp(self):
+        self.user = factories.UserFactory()
+        self.customer = factories.CustomerFactory()
+
+    def test_object_visible_through_several_relations_is_returned_once(self):
+        for _ in range(2):
+            project = factories.ProjectFactory(customer=self.customer)
+            project.add_user(self.user, models.ProjectRole.ADMINISTRATOR)
+        self.customer.add_user(self.user, models.CustomerRole.OWNER)
+
+        queryset = filter_queryset_for_user(models.Customer.objects.all(), self.user)
+
+        self.assertEqual(list(queryset), [self.customer])
+        self.assertNotIn('DISTINCT', str(queryset.query))
+
+    def test_objects_without_user_role_are_filtered_out(self):
+        project = factories.ProjectFactory(customer=self.customer)
+        project.add_user(self.user, models.ProjectRole.MANAGER)
+        factories.ProjectFactory(customer=self.customer)
+
+        queryset = filter_queryset_for_user(models.Project.objects.all(), self.user)
+
+        self.assertEqual(list(queryset), [project])
+
+    def test_project_group_manager_sees_projects_of_the_group(self):
+        project_group = factories.ProjectGroupFactory(customer=self.customer)
+        project = factories.ProjectFactory(customer=self.customer)
+        project.project_groups.add(project_group)
+        project_group.add_user(self.user, models.ProjectGroupRole.MANAGER)
+
+        queryset = filter_queryset_for_user(models.Project.objects.all(), self.user)
+
+        self.assertEqual(list(queryset), [project])
+
+    def test_role_revoke_hides_objects(self):
+        project = factories.ProjectFactory(customer=self.customer)
+        project.add_user(self.user, models.ProjectRole.ADMINISTRATOR)
+        project.remove_user(self.user)
+
+        queryset = filter_queryset_for_user(models.Project.objects.all(), self.user)
+
+        self.assertFalse(queryset.exists())
@@ -0,0 +1,49 @@
+from django.http import HttpResponse
+from django.test import TestCase
+from django.test.utils import override_settings
+
+from nodeconductor.structure import models
+from nodeconductor.structure.filters import filter_queryset_for_user
+from nodeconductor.structure.middleware import PermissionContextMiddleware, get_permission_context
+from nodeconductor.structure.tests import factories
+
+
+class PermissionContextMiddlewareTest(TestCase):
+
+    def setUp(self):
+        self.middleware = PermissionContextMiddleware()
+        self.user = factories.UserFactory()
+        self.project = factories.ProjectFactory()
+        self.project.add_user(self.user, models.ProjectRole.ADMINISTRATOR)
+
+    def filter_projects(self):
+        return list(filter_queryset_for_user(models.Project.objects.all(), self.user))
+
+    @override_settings(DEBUG=True)
+    def test_permitted_ids_are_looked_up_once_per_request(self):
+        self.middleware.process_request(None)
+
+        self.filter_projects()
+        with self.assertNumQueries(1):
+            self.assertEqual(self.filter_projects(), [self.project])
+
+        response = self.middleware.process_response(None, HttpResponse())
+        # customer, project and project group lookups of the second call are avoided
+        self.assertEqual(response[PermissionContextMiddleware.HEADER], '3')
+        self.assertIsNone(get_permission_context())
+
+    def test_role_grant_within_request_is_taken_into_account(self):
+        other_project = factories.ProjectFactory()
+        self.middleware.process_request(None)
+
+        self.filter_projects()
+        other_project.add_user(self.user, models.ProjectRole.MANAGER)
+
+        self.assertItemsEqual(self.filter_projects(), [self.project, other_project])
+        self.middleware.process_response(None, HttpResponse())
+
+    def test_header_is_not_added_in_production(self):
+        self.middleware.process_request(None)
+        response = self.middleware.process_response(None, HttpResponse())
+
+        self.assertFalse(response.has_header(PermissionContextMiddleware.HEADER))
@@ -26,3 +26,33 @@ class ProjectGroupSignalsTest(TestCase):
     def test_group_manager_role_is_created_upon_project_group_creation(self):
         self.assertTrue(self.project_group.roles.filter(role_type=models.ProjectGroupRole.MANAGER).exists(),
                         'Group manager role should have been created')
+
+
+class UserStructureRoleSignalsTest(TestCase):
+
+    def setUp(self):
+        self.user = factories.UserFactory()
+        self.project = factories.ProjectFactory()
+
+    def test_role_is_indexed_upon_grant(self):
+        self.project.add_user(self.user, models.ProjectRole.ADMINISTRATOR)
+
+        self.assertTrue(models.UserStructureRole.objects.filter(
+            user=self.user,
+            customer=self.project.customer,
+            project=self.project,
+            project_group=None,
+            role_type=models.ProjectRole.ADMINISTRATOR,
+        ).exists())
+
+    def test_only_revoked_role_is_removed_from_index(self):
+        self.project.add_user(self.user, models.ProjectRole.ADMINISTRATOR)
+        self.project.add_user(self.user, models.ProjectRole.MANAGER)
+        self.project.customer.add_user(self.user, models.CustomerRole.OWNER)
+
+        self.project.remove_user(self.user, models.ProjectRole.ADMINISTRATOR)
+
+        roles = models.UserStructureRole.objects.filter(user=self.user)
+        self.assertItemsEqual(
+            roles.values_list('project', 'role_type'),
+            [(self.project.pk, models.ProjectRole.MANAGER), (None, models.CustomerRole.OWNER)])
@@ -17,6 +17,7 @@ from rest_framework.exceptions import PermissionDenied
 from rest_framework.response import Response
 
 from nodeconductor.core import filters as core_filters
+from nodeconductor.core import mixins as core_mixins
 from nodeconductor.core.log import EventLoggerAdapter
 from nodeconductor.quotas import views as quotas_views
 from nodeconductor.structure import filters
@@ -174,7 +175,7 @@ class ProjectFilter(quotas_views.QuotaFilterMixin, django_filters.FilterSet):
         }
 
 
-class ProjectViewSet(viewsets.ModelViewSet):
+class ProjectViewSet(core_mixins.EagerLoadingMixin, viewsets.ModelViewSet):
     """List of projects that are accessible by this user.
 
     http://nodeconductor.readthedocs.org/en/latest/api/api.html#project-management
@@ -187,6 +188,13 @@ class ProjectViewSet(viewsets.ModelViewSet):
     permission_classes = (rf_permissions.IsAuthenticated,
                           rf_permissions.DjangoObjectPermissions)
     filter_class = ProjectFilter
+    select_related_fields = (
+        ('customer', ('customer', 'customer_uuid', 'customer_name', 'customer_native_name', 'customer_abbreviation')),
+    )
+    prefetch_related_fields = (
+        ('project_groups', ('project_groups',)),
+        ('quotas__scope', ('quotas',)),
+    )
 
     def can_create_project_with(self, customer, project_groups):
         user = self.request.user